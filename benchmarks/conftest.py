@@ -0,0 +1,44 @@
+"""Fixtures for benchmarks of game state primitives"""
+import pytest
+
+from clovek_ne_jezi_se.game_state import (
+    EMPTY_SYMBOL, BoardSpace, GameState, MoveContainer
+)
+
+
+# Board of the tests and of the original game
+BOARDS = dict(
+    small=dict(section_length=4, pieces_per_player=4, number_of_dice_faces=6),
+    standard=dict(
+        section_length=10, pieces_per_player=4, number_of_dice_faces=6
+    ),
+)
+
+
+@pytest.fixture(params=list(BOARDS))
+def board(request):
+    """Keyword arguments of GameState of standard board sizes"""
+    return BOARDS[request.param]
+
+
+@pytest.fixture
+def game_state(board):
+    """Initialized game state with a piece of each player on the main board"""
+    game_state = GameState(**board)
+    game_state.initialize()
+    for player_name in game_state.player_names:
+        game_state.do(get_enter_move(game_state, player_name))
+    return game_state
+
+
+def get_enter_move(game_state, player_name):
+    """Return move of a waiting piece of player to its main board entry"""
+    return MoveContainer(
+        from_space=BoardSpace(
+            kind='waiting', idx=0, occupied_by=player_name,
+            allowed_occupants=[player_name, EMPTY_SYMBOL]
+        ),
+        to_space=game_state.get_board_space(
+            'main', game_state.get_main_entry_index(player_name)
+        )
+    )
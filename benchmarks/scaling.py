@@ -0,0 +1,72 @@
+"""
+Scaling benchmark of engine paths with board size, player count and pieces,
+see clovek_ne_jezi_se.benchmarking
+"""
+import json
+
+import click
+
+from clovek_ne_jezi_se.benchmarking import (
+    BASE_SCALING_POINT, DEFAULT_SCALING_GRIDS, format_scaling_report,
+    run_scaling_benchmark
+)
+
+
+def parse_grid(values: str):
+    return [int(value) for value in values.split(',') if value]
+
+
+@click.command()
+@click.option(
+    '--section_lengths', default=','.join(
+        map(str, DEFAULT_SCALING_GRIDS['main_board_section_length'])
+    ),
+    help='Comma-separated main board section lengths to sweep'
+)
+@click.option(
+    '--n_players', default=','.join(
+        map(str, DEFAULT_SCALING_GRIDS['n_players'])
+    ),
+    help='Comma-separated numbers of players to sweep'
+)
+@click.option(
+    '--pieces_per_player', default=','.join(
+        map(str, DEFAULT_SCALING_GRIDS['pieces_per_player'])
+    ),
+    help='Comma-separated numbers of pieces per player to sweep'
+)
+@click.option(
+    '--n_turns', default=10, type=int,
+    help='Turns played on each board before timing its game state'
+)
+@click.option('--repeats', default=3, type=int, help='Timings per path')
+@click.option(
+    '--output_path', default=None,
+    help='If given, write the benchmark result to this json file'
+)
+def main(
+    section_lengths, n_players, pieces_per_player, n_turns, repeats,
+    output_path
+):
+    """Sweep board parameters and report scaling of engine paths"""
+    result = run_scaling_benchmark(
+        dict(
+            main_board_section_length=parse_grid(section_lengths),
+            n_players=parse_grid(n_players),
+            pieces_per_player=parse_grid(pieces_per_player)
+        ),
+        BASE_SCALING_POINT, n_turns=n_turns, repeats=repeats
+    )
+    click.echo(
+        'Milliseconds per call of engine paths, per turn, and peak MiB, '
+        'with exponents k of fitted power laws ~ parameter ** k'
+    )
+    click.echo(format_scaling_report(result))
+    if output_path is not None:
+        with open(output_path, 'w') as fp:
+            json.dump(result, fp, indent=2)
+        click.echo(f'Wrote result to {output_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Benchmarks of game state primitives, see the README for running them"""
+import attr
+
+from clovek_ne_jezi_se.game_state import (
+    EMPTY_SYMBOL, GameState, MoveContainer
+)
+from clovek_ne_jezi_se.utils import GraphQueryParams, get_filtered_node_names
+
+
+def test_initialize(benchmark, board):
+    def initialize():
+        GameState(**board).initialize()
+
+    benchmark(initialize)
+
+
+def test_get_board_space(benchmark, game_state):
+    benchmark(game_state.get_board_space, 'main', 1)
+
+
+def test_get_board_space_waiting(benchmark, game_state):
+    benchmark(game_state.get_board_space, 'waiting', 1, player_name='red')
+
+
+def test_get_player_moves(benchmark, game_state):
+    benchmark(game_state.get_player_moves, 6, 'red')
+
+
+def test_do(benchmark, game_state):
+    from_space = game_state.get_board_space('main', 0)
+    to_space = game_state.get_board_space('main', 1)
+    forward = MoveContainer(from_space, to_space)
+    backward = MoveContainer(
+        attr.evolve(to_space, occupied_by=from_space.occupied_by),
+        attr.evolve(from_space, occupied_by=EMPTY_SYMBOL)
+    )
+
+    def do_and_undo():
+        game_state.do(forward)
+        game_state.do(backward)
+
+    benchmark(do_and_undo)
+
+
+def test_is_winner(benchmark, game_state):
+    benchmark(game_state.is_winner, 'red')
+
+
+def test_distance_to_end(benchmark, game_state):
+    benchmark(game_state.distance_to_end, game_state.get_board_space(
+        'main', game_state.get_main_entry_index('blue')
+    ))
+
+
+def test_get_filtered_node_names(benchmark, game_state):
+    query_paramses = [GraphQueryParams(
+        graph_component='node', query_type='equality', label='occupied_by',
+        value='red'
+    )]
+    benchmark(get_filtered_node_names, game_state._graph, query_paramses)
@@ -0,0 +1,104 @@
+"""
+End-to-end games per second benchmark, failing on regressions of the
+reproducible work per turn or of the median games per second against a
+stored baseline, see clovek_ne_jezi_se.benchmarking
+"""
+import json
+from pathlib import Path
+
+import click
+
+from clovek_ne_jezi_se.benchmarking import (
+    COUNT_TURNS, TOTAL_KEY, check_regression, get_changed_games,
+    run_throughput_benchmark
+)
+
+
+BASELINE_PATH = Path(__file__).parent / 'throughput_baseline.json'
+
+
+@click.command()
+@click.option(
+    '--baseline_path', default=str(BASELINE_PATH),
+    help='Json file of baseline benchmark result'
+)
+@click.option(
+    '--tolerance', default=0.01, type=float,
+    help='Fraction of baseline function calls per turn they may rise by'
+)
+@click.option(
+    '--throughput_tolerance', default=0.5, type=float,
+    help='Fraction of baseline games per second they may drop by'
+)
+@click.option('--n_games', default=4, type=int, help='Games per agent')
+@click.option(
+    '--repeats', default=3, type=int,
+    help='Times the games are played, for the median of their throughput'
+)
+@click.option('--seed', default=0, type=int, help='Seed of games')
+@click.option(
+    '--count_turns', default=COUNT_TURNS, type=int,
+    help='Turns per agent played with function calls counted'
+)
+@click.option(
+    '--update_baseline', is_flag=True,
+    help='Write the result as new baseline instead of checking it'
+)
+def main(
+    baseline_path, tolerance, throughput_tolerance, n_games, repeats, seed,
+    count_turns, update_baseline
+):
+    """Play seeded games of each benchmark agent and report throughput"""
+    result = run_throughput_benchmark(
+        n_games=n_games, seed=seed, count_turns=count_turns, repeats=repeats
+    )
+    for name, throughput in result['throughput'].items():
+        calls = result['work'].get(name)
+        click.echo(
+            f'{name}: {throughput["n_games"]} games, '
+            f'{throughput["games_per_second"]:.3g} games/s, '
+            f'{throughput["turns_per_second"]:.3g} turns/s'
+            + (
+                f', {calls["calls_per_turn"]:.6g} calls/turn'
+                if calls is not None else ''
+            )
+        )
+
+    if update_baseline:
+        with open(baseline_path, 'w') as fp:
+            json.dump(result, fp, indent=2)
+        click.echo(f'Wrote baseline to {baseline_path}')
+        return
+
+    with open(baseline_path, 'r') as fp:
+        baseline = json.load(fp)
+    for name in get_changed_games(result, baseline):
+        if name != TOTAL_KEY:
+            click.echo(
+                f'Warning: games of {name} differ from baseline, so '
+                'throughputs compare different games'
+            )
+    try:
+        messages = check_regression(
+            result, baseline, tolerance, throughput_tolerance
+        )
+    except ValueError as error:
+        raise click.ClickException(
+            f'{error}, record a baseline for these settings with '
+            '--update_baseline'
+        )
+    for message in messages:
+        click.echo(message)
+    if messages:
+        raise click.ClickException(
+            f'Work rose more than {tolerance:.1%} above baseline or '
+            f'throughput dropped more than {throughput_tolerance:.0%} below it'
+        )
+    click.echo(
+        f'Work within {tolerance:.1%} and throughput within '
+        f'{throughput_tolerance:.0%} of baseline'
+    )
+
+
+if __name__ == '__main__':
+    main()
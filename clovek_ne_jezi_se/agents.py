@@ -1,8 +1,11 @@
 """Player classes"""
 import abc
-from typing import Sequence
+import asyncio
+import inspect
+from typing import Sequence, Tuple
 import logging
 from random import randint
+from time import perf_counter_ns
 
 import attr
 
@@ -29,29 +32,76 @@ class Player:
     print_game_state :
         Whether or not to display graphical representation of game state.
         Use cases: set to False for unit tests, True for interactive play.
+    timer :
+        Optional TimingHistogram for recording choose_move_idx durations,
+        usually set by the Client.
+    decision_timeout :
+        Optional time in seconds the Client gives the player per move choice
+        before falling back to another agent. A player that times out is
+        abandoned, not stopped: it keeps choosing in a background thread on
+        a copy of the game state, and its choice is discarded. Players that
+        cannot be abandoned, e.g. as they read stdin, set the class
+        attribute supports_decision_timeout to False and are refused one.
+    rng :
+        Optional random.Random instance for agents making random choices,
+        usually seeded by the Client. If None, the random module is used.
 
 
     """
     name = attr.ib(type=str, validator=attr.validators.instance_of(str))
     print_game_state = attr.ib(type=bool, default=False)
+    timer = attr.ib(kw_only=True, default=None, repr=False, eq=False)
+    decision_timeout = attr.ib(kw_only=True, default=None)
+    rng = attr.ib(kw_only=True, default=None, repr=False, eq=False)
+
+    supports_decision_timeout = True
 
     def choose_move(
         self, game_state: 'GameState',
         allowed_moves: Sequence['MoveContainer']
     ) -> 'MoveContainer':
         """Choose among moves."""
-        msg = 'Allowed moves with index:\n'
+        self._log_allowed_moves(allowed_moves)
+        if self.timer is None:
+            chosen_move_idx = self.choose_move_idx(game_state, allowed_moves)
+        else:
+            start = perf_counter_ns()
+            chosen_move_idx = self.choose_move_idx(game_state, allowed_moves)
+            self.timer.lap('choose_move_idx', start)
+        res = allowed_moves[chosen_move_idx]
+        self.log(f'Chose {res}')
 
-        for move_idx, move in enumerate(allowed_moves):
-            msg += f'Index: {move_idx}, move: {move}\n'
+        return res
 
-        self.log(msg)
+    async def choose_move_async(
+        self, game_state: 'GameState',
+        allowed_moves: Sequence['MoveContainer']
+    ) -> 'MoveContainer':
+        """
+        Choose among moves, awaiting choose_move_idx if it returns an
+        awaitable, as for AsyncPlayer's.
+        """
+        self._log_allowed_moves(allowed_moves)
+        if self.timer is not None:
+            start = perf_counter_ns()
         chosen_move_idx = self.choose_move_idx(game_state, allowed_moves)
+        if inspect.isawaitable(chosen_move_idx):
+            chosen_move_idx = await chosen_move_idx
+        if self.timer is not None:
+            self.timer.lap('choose_move_idx', start)
         res = allowed_moves[chosen_move_idx]
         self.log(f'Chose {res}')
 
         return res
 
+    def _log_allowed_moves(self, allowed_moves: Sequence['MoveContainer']):
+        msg = 'Allowed moves with index:\n'
+
+        for move_idx, move in enumerate(allowed_moves):
+            msg += f'Index: {move_idx}, move: {move}\n'
+
+        self.log(msg)
+
     @abc.abstractmethod
     def choose_move_idx(
         self, game_state: 'GameState',
@@ -59,6 +109,53 @@ class Player:
     ) -> int:
         return
 
+    @classmethod
+    def choose_move_idx_batch(
+        cls, decisions: Sequence[
+            Tuple['Player', 'GameState', Sequence[Sequence['MoveContainer']]]
+        ]
+    ) -> Sequence[int]:
+        """
+        Choose move indices for a batch of (player, game state, allowed moves)
+        decisions of players of this class, e.g. from the games of a GamePool.
+        Override to amortize per-call costs across games; by default
+        choose_move_idx is called for each decision.
+        """
+        return [
+            player.choose_move_idx(game_state, allowed_moves)
+            for player, game_state, allowed_moves in decisions
+        ]
+
+    @classmethod
+    def choose_move_batch(
+        cls, decisions: Sequence[
+            Tuple['Player', 'GameState', Sequence[Sequence['MoveContainer']]]
+        ]
+    ) -> Sequence['MoveContainer']:
+        """
+        Choose moves for a batch of decisions of players of this class by one
+        call of choose_move_idx_batch, logging allowed and chosen moves as
+        choose_move does. The duration of the call is recorded once per
+        player timer as choose_move_idx_batch.
+        """
+        for player, _, allowed_moves in decisions:
+            player._log_allowed_moves(allowed_moves)
+        start = perf_counter_ns()
+        move_idxs = cls.choose_move_idx_batch(decisions)
+        timers = {
+            id(player.timer): player.timer for player, _, _ in decisions
+            if player.timer is not None
+        }
+        for timer in timers.values():
+            timer.lap('choose_move_idx_batch', start)
+
+        res = []
+        for (player, _, allowed_moves), move_idx in zip(decisions, move_idxs):
+            move = allowed_moves[move_idx]
+            player.log(f'Chose {move}')
+            res.append(move)
+        return res
+
     def log(self, message):
         res = ':'.join([self.__repr__(), message])
         logger.debug(res)
@@ -69,6 +166,9 @@ class HumanPlayer(Player):
     """Interactive human player"""
     print_game_state = attr.ib(default=True)
 
+    # An abandoned input() call would swallow the next console line
+    supports_decision_timeout = False
+
     def choose_move_idx(
         self, game_state: 'GameState',
         allowed_moves: Sequence['MoveContainer']
@@ -82,6 +182,34 @@ class HumanPlayer(Player):
         plt.show()
 
 
+@attr.s
+class AsyncPlayer(Player):
+    """
+    Base class for asynchronous agents, e.g. answering over sockets or from
+    inference queues, to be used with an AsyncClient.
+    """
+    @abc.abstractmethod
+    async def choose_move_idx(
+        self, game_state: 'GameState',
+        allowed_moves: Sequence[Sequence['MoveContainer']]
+    ) -> int:
+        return
+
+
+@attr.s
+class AsyncHumanPlayer(AsyncPlayer, HumanPlayer):
+    """Interactive human player not blocking the event loop on input"""
+    async def choose_move_idx(
+        self, game_state: 'GameState',
+        allowed_moves: Sequence['MoveContainer']
+    ) -> int:
+        loop = asyncio.get_running_loop()
+        res = await loop.run_in_executor(
+            None, input, 'Enter chosen move index: '
+        )
+        return int(res)
+
+
 @attr.s
 class RandomPlayer(Player):
     """Player that selects uniformly randomly from allowed moves"""
@@ -90,7 +218,10 @@ class RandomPlayer(Player):
         allowed_moves: Sequence[Sequence['MoveContainer']]
     ) -> int:
         """TODO: Test me???"""
-        idx = randint(0, len(allowed_moves)-1)
+        if self.rng is None:
+            idx = randint(0, len(allowed_moves)-1)
+        else:
+            idx = self.rng.randint(0, len(allowed_moves)-1)
         return idx
 
 
@@ -117,3 +248,10 @@ class FurthestAlongPlayer(Player):
         idx_furthest_along = np.argmin(distances_to_end)
 
         return idx_furthest_along
+
+
+# Concrete agents that experiment configurations may name, see
+# run_experiments.get_agent_class
+AGENTS = {
+    agent.__name__: agent for agent in (RandomPlayer, FurthestAlongPlayer)
+}
@@ -0,0 +1,457 @@
+"""
+End-to-end throughput benchmark of games with a regression gate on
+reproducible work counts and a loose one on median throughput, and scaling
+benchmark of engine paths with board size and player count
+"""
+from typing import Any, Callable, Sequence, Tuple
+from copy import deepcopy
+from statistics import median
+from time import perf_counter
+import cProfile
+import platform
+import pstats
+import tracemalloc
+
+import numpy as np
+
+from clovek_ne_jezi_se.game_state import GameState
+from clovek_ne_jezi_se.run_experiments import (
+    initialize_client, set_config_defaults
+)
+from clovek_ne_jezi_se.seeding import derive_seeds
+from clovek_ne_jezi_se.tournament import get_lineup_config
+
+
+# Board of the generate-experiment-configs-example notebook
+DEFAULT_BOARD = dict(
+    main_board_section_length=4, pieces_per_player=4, number_of_dice_faces=6
+)
+
+BENCHMARK_AGENTS = ('RandomPlayer', 'FurthestAlongPlayer')
+
+# Settings that must match for throughputs and work to be compared; the
+# number of calls depends on the Python minor version
+SETTING_KEYS = (
+    'board', 'n_players', 'n_games', 'seed', 'count_turns', 'repeats',
+    'python_version'
+)
+
+# Reproducible work metrics gated on with a tight tolerance
+WORK_METRICS = ('calls_per_turn',)
+
+# Throughput metrics gated on with a loose tolerance, as wall-clock
+# throughput varies by more than 30% between identical runs on shared
+# machines, even as the median of repeats
+THROUGHPUT_METRICS = ('games_per_second',)
+
+# Turns of each agent played with function calls counted, as counting slows
+# games down several times
+COUNT_TURNS = 40
+
+TOTAL_KEY = 'total'
+
+
+def run_throughput_benchmark(
+    agents: Sequence[str] = BENCHMARK_AGENTS, n_players: int = 4,
+    board: dict = DEFAULT_BOARD, n_games: int = 4, seed: int = 0,
+    count_turns: int = COUNT_TURNS, repeats: int = 3
+) -> dict:
+    """
+    Play n_games seeded games of n_players copies of each agent through
+    Client.play repeats times, returning the settings, throughput keyed by
+    agent and in total of the median duration of the repeats, see
+    get_throughput, and work keyed by agent, see measure_work. Only
+    Client.play is timed, and the same seeds are used for each agent and
+    repeat, so the games are reproducible.
+    """
+    throughput = {}
+    work = {}
+    for agent in agents:
+        config = set_config_defaults(
+            get_lineup_config([agent] * n_players, board, n_games)
+        )
+        initial_client = initialize_client(config)
+        repeat_seconds = []
+        for _ in range(repeats):
+            n_plays = 0
+            seconds = 0.
+            for game_seed in derive_seeds(seed, n_games):
+                client = deepcopy(initial_client)
+                client.set_seed(game_seed)
+                start = perf_counter()
+                _, plays = client.play()
+                seconds += perf_counter() - start
+                n_plays += plays
+            repeat_seconds.append(seconds)
+        throughput[agent] = get_throughput(
+            n_games, n_plays, median(repeat_seconds)
+        )
+        work[agent] = measure_work(agent, n_players, board, seed, count_turns)
+    throughput[TOTAL_KEY] = get_throughput(
+        sum(value['n_games'] for value in throughput.values()),
+        sum(value['n_plays'] for value in throughput.values()),
+        sum(value['seconds'] for value in throughput.values())
+    )
+    return dict(
+        board=dict(board), n_players=n_players, n_games=n_games, seed=seed,
+        count_turns=count_turns, repeats=repeats,
+        python_version='.'.join(platform.python_version_tuple()[:2]),
+        throughput=throughput, work=work
+    )
+
+
+def measure_work(
+    agent: str, n_players: int, board: dict, seed: int, count_turns: int
+) -> dict:
+    """
+    Return number of function calls, of Python and builtin functions, in
+    count_turns seeded turns of n_players copies of agent, and calls per
+    turn. Unlike durations, calls are reproducible to within a few per
+    million for the same code, Python and dependency versions, so they show
+    changes in the work the engine does.
+    """
+    config = set_config_defaults(
+        get_lineup_config([agent] * n_players, board, 1),
+        max_turns=count_turns
+    )
+    client = initialize_client(config)
+    client.set_seed(seed)
+    (_, n_plays), n_calls = count_calls(client.play)
+    return dict(
+        n_plays=n_plays, n_calls=n_calls,
+        calls_per_turn=n_calls / n_plays if n_plays > 0 else 0.
+    )
+
+
+def count_calls(function: Callable) -> Tuple[Any, int]:
+    """Return result of function and number of calls made calling it."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        res = function()
+    finally:
+        profiler.disable()
+    stats = pstats.Stats(profiler).stats
+    return res, sum(n_calls for _, n_calls, _, _, _ in stats.values())
+
+
+def get_throughput(n_games: int, n_plays: int, seconds: float) -> dict:
+    """Return games and turns (plays) per second of games played."""
+    return dict(
+        n_games=n_games, n_plays=n_plays, seconds=seconds,
+        games_per_second=n_games / seconds if seconds > 0 else 0.,
+        turns_per_second=n_plays / seconds if seconds > 0 else 0.
+    )
+
+
+def check_regression(
+    result: dict, baseline: dict, tolerance: float = 0.01,
+    throughput_tolerance: float = 0.5
+) -> Sequence[str]:
+    """
+    Return messages of work of a benchmark result, see
+    run_throughput_benchmark and WORK_METRICS, more than tolerance above the
+    baseline result, and of throughput, see THROUGHPUT_METRICS, more than
+    throughput_tolerance below it for games unchanged from the baseline,
+    see get_changed_games. Raises ValueError if their settings differ.
+    """
+    for key in SETTING_KEYS:
+        if result[key] != baseline[key]:
+            raise ValueError(
+                f'Benchmark {key} {result[key]} differs from baseline '
+                f'{baseline[key]}'
+            )
+    return (
+        _check_work(result, baseline, tolerance)
+        + _check_throughput(result, baseline, throughput_tolerance)
+    )
+
+
+def _check_work(
+    result: dict, baseline: dict, tolerance: float
+) -> Sequence[str]:
+    messages = []
+    for name, baseline_work in baseline['work'].items():
+        work = result['work'].get(name)
+        if work is None:
+            continue
+        for metric in WORK_METRICS:
+            change = work[metric] / baseline_work[metric] - 1
+            if change > tolerance:
+                messages.append(
+                    f'{name} {metric} {work[metric]:.6g} is '
+                    f'{change:.1%} above baseline {baseline_work[metric]:.6g}'
+                )
+    return messages
+
+
+def _check_throughput(
+    result: dict, baseline: dict, tolerance: float
+) -> Sequence[str]:
+    messages = []
+    changed_games = get_changed_games(result, baseline)
+    for name, baseline_throughput in baseline['throughput'].items():
+        throughput = result['throughput'].get(name)
+        if throughput is None or name in changed_games:
+            continue
+        for metric in THROUGHPUT_METRICS:
+            change = throughput[metric] / baseline_throughput[metric] - 1
+            if change < -tolerance:
+                messages.append(
+                    f'{name} {metric} {throughput[metric]:.3g} is '
+                    f'{-change:.1%} below baseline '
+                    f'{baseline_throughput[metric]:.3g}'
+                )
+    return messages
+
+
+def get_changed_games(result: dict, baseline: dict) -> Sequence[str]:
+    """
+    Return names of benchmark throughputs whose games took a different
+    number of turns than in the baseline, i.e. whose games changed.
+    """
+    return [
+        name for name, baseline_throughput in baseline['throughput'].items()
+        if name in result['throughput']
+        and result['throughput'][name]['n_plays']
+        != baseline_throughput['n_plays']
+    ]
+
+
+SCALING_PARAMETERS = (
+    'main_board_section_length', 'n_players', 'pieces_per_player'
+)
+
+DEFAULT_SCALING_GRIDS = dict(
+    main_board_section_length=[4, 16, 64, 256], n_players=[2, 4, 6, 8],
+    pieces_per_player=[1, 4, 16]
+)
+
+# Point of the parameters not swept
+BASE_SCALING_POINT = dict(
+    main_board_section_length=4, n_players=4, pieces_per_player=4
+)
+
+ENGINE_PATHS = (
+    'initialize', 'get_player_moves', 'do', 'is_winner', 'distance_to_end',
+    'turn'
+)
+
+
+def measure_engine_paths(
+    main_board_section_length: int, n_players: int, pieces_per_player: int,
+    number_of_dice_faces: int = 6, n_turns: int = 10, repeats: int = 3,
+    seed: int = 0
+) -> dict:
+    """
+    Return seconds per call of engine paths and peak traced memory of a
+    board, playing n_turns seeded turns of RandomPlayers through Client.play
+    to reach a game state with pieces out, see ENGINE_PATHS.
+
+    Games on large boards take too long to finish, so turns stand in for
+    games: seconds per game are seconds per turn times turns per game.
+    Paths on the game state are timed as median of repeats, and memory is
+    traced in a separate pass, as tracing slows down the engine.
+    """
+    board = dict(
+        main_board_section_length=main_board_section_length,
+        pieces_per_player=pieces_per_player,
+        number_of_dice_faces=number_of_dice_faces
+    )
+    config = set_config_defaults(
+        get_lineup_config(['RandomPlayer'] * n_players, board, 1),
+        max_turns=n_turns
+    )
+
+    def initialize():
+        return initialize_client(config)
+
+    def play(client):
+        client.set_seed(seed)
+        return client.play()[1]
+
+    seconds = dict(initialize=_time(initialize, repeats))
+    client = initialize()
+    start = perf_counter()
+    n_plays = play(client)
+    seconds['turn'] = (perf_counter() - start) / max(n_plays, 1)
+    seconds.update(_time_game_state_paths(
+        client.get_game_state(), number_of_dice_faces, repeats
+    ))
+
+    client, initialize_peak = _trace_peak_bytes(initialize)
+    _, turns_peak = _trace_peak_bytes(lambda: play(client))
+
+    return dict(
+        parameters=dict(
+            board, n_players=n_players, n_turns=n_turns, n_plays=n_plays
+        ),
+        seconds=seconds,
+        peak_bytes=dict(initialize=initialize_peak, turns=turns_peak)
+    )
+
+
+def _time_game_state_paths(
+    game_state: 'GameState', roll: int, repeats: int
+) -> dict:
+    player_names = game_state.player_names
+    seconds = dict(
+        get_player_moves=_time(lambda: [
+            game_state.get_player_moves(roll, player_name)
+            for player_name in player_names
+        ], repeats) / len(player_names),
+        is_winner=_time(
+            lambda: game_state.is_winner(player_names[0]), repeats
+        ),
+        do=float('nan'), distance_to_end=float('nan')
+    )
+    piece_moves = next(
+        (
+            moves[0] for moves in (
+                game_state.get_player_moves(roll, player_name)
+                for player_name in player_names
+            ) if moves
+        ),
+        None
+    )
+    if piece_moves is None:
+        return seconds
+
+    from_space = piece_moves[-1].from_space
+    seconds['distance_to_end'] = _time(
+        lambda: game_state.distance_to_end(from_space), repeats
+    )
+    do_seconds = []
+    for _ in range(repeats):
+        moved_game_state = deepcopy(game_state)
+        start = perf_counter()
+        for move in piece_moves:
+            moved_game_state.do(move)
+        do_seconds.append((perf_counter() - start) / len(piece_moves))
+    seconds['do'] = median(do_seconds)
+    return seconds
+
+
+def _trace_peak_bytes(function: Callable):
+    """Return result of function and peak memory traced while calling it."""
+    # Restart tracing rather than tracemalloc.reset_peak, new in Python 3.9
+    tracemalloc.start()
+    try:
+        res = function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return res, peak
+
+
+def _time(function: Callable, repeats: int) -> float:
+    durations = []
+    for _ in range(repeats):
+        start = perf_counter()
+        function()
+        durations.append(perf_counter() - start)
+    return median(durations)
+
+
+def run_scaling_benchmark(
+    grids: dict = DEFAULT_SCALING_GRIDS, base: dict = BASE_SCALING_POINT,
+    **kwargs
+) -> dict:
+    """
+    Measure engine paths, see measure_engine_paths with kwargs, sweeping
+    each parameter of SCALING_PARAMETERS over its grid with the others at
+    base. Returns the points and fitted exponents of each sweep, see
+    fit_scaling_exponents, keyed by parameter.
+    """
+    res = dict(base=dict(base), sweeps={})
+    for parameter in SCALING_PARAMETERS:
+        points = [
+            measure_engine_paths(**dict(base, **{parameter: value}), **kwargs)
+            for value in grids.get(parameter, [])
+        ]
+        res['sweeps'][parameter] = dict(
+            points=points,
+            exponents=fit_scaling_exponents(points, parameter)
+        )
+    return res
+
+
+def fit_scaling_exponents(points: Sequence[dict], parameter: str) -> dict:
+    """
+    Return exponents k of power laws seconds ~ parameter ** k of engine
+    paths and of peak memory, fitted by least squares on log-log scale, or
+    nan for fewer than two valid points.
+    """
+    values = {
+        path: [point['seconds'][path] for point in points]
+        for path in ENGINE_PATHS
+    }
+    values.update(
+        (f'peak_bytes.{key}', [point['peak_bytes'][key] for point in points])
+        for key in ('initialize', 'turns')
+    )
+    x = np.array(
+        [point['parameters'][parameter] for point in points], dtype=float
+    )
+    res = {}
+    for path, y in values.items():
+        y = np.array(y, dtype=float)
+        is_valid = np.isfinite(y) & (y > 0)
+        if len(np.unique(x[is_valid])) < 2:
+            res[path] = float('nan')
+            continue
+        res[path] = float(
+            np.polyfit(np.log(x[is_valid]), np.log(y[is_valid]), 1)[0]
+        )
+    return res
+
+
+def format_scaling_report(result: dict) -> str:
+    """
+    Return text tables of a scaling benchmark result, see
+    run_scaling_benchmark, with milliseconds per call of engine paths and
+    peak memory in MiB, and fitted exponents.
+    """
+    lines = []
+    for parameter, sweep in result['sweeps'].items():
+        width = max(12, len(parameter))
+        lines.append(
+            f'{parameter} (others at {_format_base(result, parameter)})'
+        )
+        lines.append(' '.join(
+            [f'{parameter:>{width}}']
+            + [f'{path[:16]:>16}' for path in ENGINE_PATHS]
+            + [f'{"MiB init":>9}', f'{"MiB turns":>9}']
+        ))
+        for point in sweep['points']:
+            lines.append(' '.join(
+                [f'{point["parameters"][parameter]:>{width}}']
+                + [
+                    f'{1000 * point["seconds"][path]:>16.3f}'
+                    for path in ENGINE_PATHS
+                ]
+                + [
+                    f'{point["peak_bytes"][key] / 2 ** 20:>9.2f}'
+                    for key in ('initialize', 'turns')
+                ]
+            ))
+        lines.append(' '.join(
+            [f'{"exponent":>{width}}']
+            + [
+                f'{sweep["exponents"][path]:>16.2f}'
+                for path in ENGINE_PATHS
+            ]
+            + [
+                f'{sweep["exponents"]["peak_bytes." + key]:>9.2f}'
+                for key in ('initialize', 'turns')
+            ]
+        ))
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def _format_base(result: dict, parameter: str) -> str:
+    return ', '.join(
+        f'{key}={value}' for key, value in result['base'].items()
+        if key != parameter
+    )
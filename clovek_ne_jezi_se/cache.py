@@ -0,0 +1,35 @@
+"""Content-addressed keys of game results"""
+from functools import lru_cache
+from hashlib import sha256
+from pathlib import Path
+
+from clovek_ne_jezi_se import __version__
+
+
+# Modules whose code determines the outcome of seeded games
+GAME_MODULES = (
+    'agents', 'client', 'game_state', 'observers', 'seeding', 'utils'
+)
+
+
+@lru_cache(maxsize=None)
+def get_code_version() -> str:
+    """
+    Return hash of package version and source code of GAME_MODULES, so that
+    cached results are invalidated by any change of the game or agent code,
+    but not of code running or reporting experiments.
+    """
+    digest = sha256(__version__.encode())
+    for module in GAME_MODULES:
+        path = Path(__file__).parent / f'{module}.py'
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def get_cache_key(config_hash: str, seed: int, code_version: str) -> str:
+    """
+    Return key of a game result, identical for games of the same normalized
+    configuration, see seeding.get_config_hash, seed and code version.
+    """
+    return sha256(f'{config_hash}:{seed}:{code_version}'.encode()).hexdigest()
@@ -0,0 +1,148 @@
+"""Durable record of finished runs for resuming experiments"""
+from typing import Callable, Iterable, Sequence, Tuple
+from pathlib import Path
+import json
+import logging
+import os
+import time
+
+import attr
+
+from clovek_ne_jezi_se.log_handler import handler
+
+
+logger = logging.getLogger(__name__)
+logger.addHandler(handler)
+
+
+@attr.s
+class RunManifest:
+    """
+    Append-only json-lines manifest of finished runs, each identified by
+    experiment name, config hash and run index, from which its seed is
+    derived, see seeding.get_run_seed.
+
+    Entries are flushed and fsynced on each record call, so they survive a
+    crash of the process or machine. A partially written last line, e.g.
+    from a crash during a write, is ignored on loading.
+
+    Parameters
+    ----------
+    path :
+        Manifest file, created if missing
+    """
+    path = attr.ib(converter=Path)
+
+    def __attrs_post_init__(self):
+        self._done = set()
+        if self.path.exists():
+            self._load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fp = open(self.path, 'a')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _load(self):
+        with open(self.path, 'r') as fp:
+            for line_idx, line in enumerate(fp):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(
+                        f'Ignoring corrupt line {line_idx} of {self.path}'
+                    )
+                    continue
+                # Entries without experiment name, of older manifests, never
+                # match, as their seeds are unknown
+                self._done.add((
+                    entry.get('experiment_name'), entry['config_hash'],
+                    entry['run_idx']
+                ))
+
+    def __len__(self):
+        return len(self._done)
+
+    def is_done(
+        self, experiment_name: str, config_hash: str, run_idx: int
+    ) -> bool:
+        """Return whether run is recorded as finished."""
+        return (experiment_name, config_hash, run_idx) in self._done
+
+    def record(self, runs: Iterable[Tuple[str, str, int]]):
+        """
+        Durably record runs, each a tuple of experiment name, config hash
+        and run index, as finished.
+        """
+        lines = []
+        for experiment_name, config_hash, run_idx in runs:
+            self._done.add((experiment_name, config_hash, run_idx))
+            lines.append(json.dumps(dict(
+                experiment_name=experiment_name, config_hash=config_hash,
+                run_idx=run_idx
+            )) + '\n')
+        self._fp.write(''.join(lines))
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+
+    def close(self):
+        """Close manifest file."""
+        self._fp.close()
+
+
+@attr.s
+class ManifestWriter:
+    """
+    Buffer finished runs and record them in a run manifest in batches, once
+    flush_runs runs are buffered or flush_seconds passed since the first
+    buffered run. Before recording, the before_record callables are called,
+    e.g. to flush the results store and mlflow logger the results of the
+    runs were written to, so recorded runs are never lost.
+
+    Parameters
+    ----------
+    manifest :
+        Manifest to record runs in
+    before_record :
+        Functions called before each recording
+    flush_runs :
+        Number of buffered runs that triggers recording
+    flush_seconds :
+        Seconds since the first buffered run that trigger recording
+    """
+    manifest = attr.ib(type=RunManifest)
+    before_record = attr.ib(factory=list, type=Sequence[Callable[[], None]])
+    flush_runs = attr.ib(default=10000, type=int)
+    flush_seconds = attr.ib(default=60., type=float)
+    clock = attr.ib(
+        default=time.monotonic, type=Callable[[], float], repr=False,
+        eq=False
+    )
+
+    def __attrs_post_init__(self):
+        self._runs = []
+        self._first_time = None
+
+    def add(self, runs: Iterable[Tuple[str, str, int]]):
+        """Buffer finished runs, see RunManifest.record."""
+        self._runs.extend(runs)
+        if self._first_time is None:
+            self._first_time = self.clock()
+        if (
+            len(self._runs) >= self.flush_runs
+            or self.clock() - self._first_time >= self.flush_seconds
+        ):
+            self.flush()
+
+    def flush(self):
+        """Record buffered runs, after calling before_record."""
+        if not self._runs:
+            return
+        for function in self.before_record:
+            function()
+        self.manifest.record(self._runs)
+        self._runs = []
+        self._first_time = None
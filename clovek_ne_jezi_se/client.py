@@ -1,15 +1,20 @@
 """Client module for controlling game progression"""
+import asyncio
 import logging
-from typing import Sequence, Tuple
-from itertools import cycle
-from random import randint
+import threading
+from copy import deepcopy
+from typing import Generator, Sequence, Tuple, Union
+from math import floor, log, log1p
+from random import Random, randint, random
+from time import perf_counter_ns, monotonic
 
 import attr
 
-from clovek_ne_jezi_se.agents import Player
+from clovek_ne_jezi_se.agents import AsyncPlayer, Player, RandomPlayer
 from clovek_ne_jezi_se.log_handler import handler
+from clovek_ne_jezi_se.seeding import derive_seeds
 from clovek_ne_jezi_se.game_state import (
-    EMPTY_SYMBOL, GameState
+    EMPTY_SYMBOL, GameState, MoveContainer
 )
 
 logger = logging.getLogger(__name__)
@@ -20,6 +25,34 @@ logger.addHandler(handler)
 class Client:
     """
     Client class for controlling game flow.
+
+    Observers (see clovek_ne_jezi_se.observers) are passed on to the game state
+    and notified of game start and end, turns, rolls and moves.
+
+    If a timer (see clovek_ne_jezi_se.instrumentation) is given, durations of
+    move generation, agent choice, move application and winner checks are
+    recorded, and the timer is passed on to the players.
+
+    Play ends without a winner once max_turns turns have been played or
+    max_seconds of wall-clock time have passed, if given.
+
+    With skip_dead_turns, turns of players with all pieces waiting are
+    simulated from the dice distribution alone, as only rolling the number
+    of dice faces can change the board. The play count distribution is
+    unchanged, but observers are notified of these turns via on_dead_turns
+    rather than on_turn_start and on_roll.
+
+    Players with a decision_timeout get that many seconds per move choice;
+    on timeout, a player of class fallback_agent with the same name chooses
+    instead, and the timeout is counted in timeout_counts. Timed-out agents
+    are abandoned, not stopped: they keep running in a daemon thread on a
+    copy of the game state, and their choice is discarded. Players that do
+    not support this, see Player.supports_decision_timeout, may not have a
+    decision_timeout.
+
+    If a seed is given, dice and each player's rng get independent random
+    streams derived from it, so that games are reproducible. Otherwise the
+    random module is used.
     """
     players = attr.ib(type=Sequence['Player'])
     pieces_per_player = attr.ib(kw_only=True, type=int)
@@ -28,46 +61,254 @@ class Client:
         kw_only=True, type=int
     )
     empty_symbol = attr.ib(kw_only=True, default=EMPTY_SYMBOL)
+    observers = attr.ib(kw_only=True, factory=list)
+    timer = attr.ib(kw_only=True, default=None)
+    max_turns = attr.ib(kw_only=True, default=None)
+    max_seconds = attr.ib(kw_only=True, default=None)
+    skip_dead_turns = attr.ib(kw_only=True, default=False)
+    fallback_agent = attr.ib(kw_only=True, default=RandomPlayer)
+    seed = attr.ib(kw_only=True, default=None)
 
     def initialize(self):
-        self._player_cycle = cycle(self.players)
+        for player in self.players:
+            if (
+                player.decision_timeout is not None
+                and not player.supports_decision_timeout
+            ):
+                raise ValueError(
+                    f'Player {player.name} of class {type(player).__name__} '
+                    'cannot be abandoned on decision timeout'
+                )
+        self._next_player_idx = 0
         self._player_names = [player.name for player in self.players]
         self._game_state = GameState(
             self._player_names,
             pieces_per_player=self.pieces_per_player,
             section_length=self.main_board_section_length,
             number_of_dice_faces=self.number_of_dice_faces,
-            empty_symbol=self.empty_symbol
+            empty_symbol=self.empty_symbol,
+            observers=self.observers
         )
         self._game_state.initialize()
         self.winner = None
         self.play_count = 0
+        self.timeout_counts = {
+            player_name: 0 for player_name in self._player_names
+        }
+        self._fallback_players = {
+            player_name: self.fallback_agent(name=player_name)
+            for player_name in self._player_names
+        }
+
+        for observer in self.observers:
+            observer.on_game_start(self._game_state)
+
+        if self.timer is not None:
+            self.set_timer(self.timer)
+        self.set_seed(self.seed)
+
+    def set_seed(self, seed: Union[int, None]):
+        """Seed random streams of dice and players, see class docstring."""
+        self.seed = seed
+        if seed is None:
+            self._rng = None
+            for player in self.players:
+                player.rng = None
+            return
+
+        dice_seed, *player_seeds = derive_seeds(seed, 1 + len(self.players))
+        self.set_stream_seeds(dice_seed, player_seeds)
+
+    def set_stream_seeds(self, dice_seed: int, player_seeds: Sequence[int]):
+        """
+        Seed dice and player random streams directly, e.g. to replay the
+        same rolls with players in other seats.
+        """
+        self._rng = Random(dice_seed)
+        for player, player_seed in zip(self.players, player_seeds):
+            player.rng = Random(player_seed)
 
-    def play(self) -> Tuple['Player', int]:
-        """Play until a player wins wins"""
+    def set_timer(self, timer):
+        """Set timing instrumentation for client and players."""
+        self.timer = timer
+        for player in self.players:
+            player.timer = timer
 
+    def play(self) -> Tuple[Union['Player', None], int]:
+        """
+        Play until a player wins, or until the turn or time budget is used up,
+        in which case the winner is None.
+        """
+        return self.run_steps(self.play_steps())
+
+    def play_steps(self) -> Generator[
+        Tuple['Player', Sequence], Sequence['MoveContainer'],
+        Tuple[Union['Player', None], int]
+    ]:
+        """
+        Generator version of play, yielding (player, allowed moves) at each
+        decision point and expecting the selected move to be sent back.
+        Returns the same as play.
+        """
+        start = monotonic()
         while(self.winner is None):
-            self.take_turn()
+            if self.is_stalled(start):
+                logger.debug(
+                    f'Stalled after {self.play_count} turns, '
+                    'ending game without winner'
+                )
+                break
+
+            first_roll = None
+            if self.skip_dead_turns and self._is_dead_turn():
+                first_roll = self._skip_dead_turns()
+                if first_roll is None:
+                    continue
+
+            yield from self.turn_steps(first_roll)
             self.play_count += 1
 
+        winner_name = self.winner.name if self.winner is not None else None
+        for observer in self.observers:
+            observer.on_game_end(winner_name, self.play_count)
+
         return self.winner, self.play_count
 
-    def take_turn(self):
-        """Take a single player turn"""
+    def run_steps(self, steps: Generator):
+        """
+        Drive play_steps or turn_steps generator, letting the deciding players
+        choose moves, and return its return value.
+        """
+        try:
+            player, moves = next(steps)
+            while True:
+                player, moves = steps.send(self.choose_move(player, moves))
+        except StopIteration as stop:
+            return stop.value
+
+    def is_stalled(self, start: float) -> bool:
+        """
+        Return whether turn or wall-clock budget since start (from
+        time.monotonic) is used up.
+        """
+        if self.max_turns is not None and self.play_count >= self.max_turns:
+            return True
+        if (
+            self.max_seconds is not None
+            and monotonic() - start >= self.max_seconds
+        ):
+            return True
+        return False
+
+    def _is_dead_turn(self) -> bool:
+        """Return whether the next player has all pieces waiting."""
+        next_player = self.players[self._next_player_idx]
+        return self._game_state.is_all_waiting(next_player.name)
+
+    def _skip_dead_turns(self) -> Union[int, None]:
+        """
+        Skip dead turns starting with the next player, who must have all
+        pieces waiting. If all players have all pieces waiting, the number of
+        turns until one rolls the number of dice faces is sampled in one go.
+
+        Returns the roll value starting the following turn, or None if no
+        such roll has been sampled yet.
+        """
+        if not all(
+            self._game_state.is_all_waiting(player_name)
+            for player_name in self._player_names
+        ):
+            roll_value = self.roll()
+            if roll_value == self.number_of_dice_faces:
+                return roll_value
+            self._record_dead_turns(1)
+            return None
+
+        n_dead_turns = self._sample_dead_turn_count()
+        if (
+            self.max_turns is not None
+            and self.play_count + n_dead_turns >= self.max_turns
+        ):
+            self._record_dead_turns(self.max_turns - self.play_count)
+            return None
+
+        self._record_dead_turns(n_dead_turns)
+        return self.number_of_dice_faces
+
+    def _sample_dead_turn_count(self) -> int:
+        """
+        Sample number of rolls before rolling the number of dice faces, i.e.
+        from the geometric distribution with success probability one over the
+        number of dice faces.
+        """
+        if self.number_of_dice_faces == 1:
+            return 0
+        uniform = random() if self._rng is None else self._rng.random()
+        return floor(
+            log(1. - uniform) / log1p(-1. / self.number_of_dice_faces)
+        )
+
+    def _record_dead_turns(self, n_dead_turns: int):
+        """Advance players and play count by dead turns."""
+        n_players = len(self.players)
+        for offset in range(min(n_dead_turns, n_players)):
+            player = self.players[
+                (self._next_player_idx + offset) % n_players
+            ]
+            player_dead_turns = n_dead_turns // n_players \
+                + int(offset < n_dead_turns % n_players)
+            for observer in self.observers:
+                observer.on_dead_turns(player.name, player_dead_turns)
+
+        self._next_player_idx = \
+            (self._next_player_idx + n_dead_turns) % n_players
+        self.play_count += n_dead_turns
+
+    def take_turn(self, first_roll: Union[int, None] = None):
+        """
+        Take a single player turn, optionally with a given first roll value.
+        """
+        self.run_steps(self.turn_steps(first_roll))
+
+    def turn_steps(self, first_roll: Union[int, None] = None) -> Generator[
+        Tuple['Player', Sequence], Sequence['MoveContainer'], None
+    ]:
+        """
+        Generator version of take_turn, yielding (player, allowed moves) at
+        each decision point and expecting the selected move to be sent back.
+        """
         current_player = self.next_player()
+        for observer in self.observers:
+            observer.on_turn_start(current_player.name, self.play_count)
 
         players_turn_continues = True
         while players_turn_continues:
-            roll_value = self.roll()
+            if first_roll is None:
+                roll_value = self.roll()
+            else:
+                roll_value, first_roll = first_roll, None
+            for observer in self.observers:
+                observer.on_roll(current_player.name, roll_value)
 
             self.log(current_player, f'Rolls a {roll_value}')
 
-            self._choose_and_do_move(current_player, roll_value)
+            moves = self._get_moves(current_player, roll_value)
+            if len(moves) > 0:
+                selected_move = yield current_player, moves
+                self._do_move(current_player, selected_move)
+            else:
+                self.log(current_player, 'No moves possible')
 
             counts = self._get_game_state_counts()
             self.log(current_player, f'Board counts: {counts}')
 
-            if self._game_state.is_winner(current_player.name):
+            if self.timer is not None:
+                start = perf_counter_ns()
+            is_winner = self._game_state.is_winner(current_player.name)
+            if self.timer is not None:
+                self.timer.lap('winner_check', start)
+
+            if is_winner:
                 self.winner = current_player
                 self.log(current_player, 'wins')
 
@@ -76,44 +317,128 @@ class Client:
             )
 
     def next_player(self):
-        return next(self._player_cycle)
+        res = self.players[self._next_player_idx]
+        self._next_player_idx = (self._next_player_idx + 1) % len(self.players)
+        return res
 
     def roll(self):
-        return randint(1, self.number_of_dice_faces)
+        if self._rng is None:
+            return randint(1, self.number_of_dice_faces)
+        return self._rng.randint(1, self.number_of_dice_faces)
 
     def log(self, player, message):
         message = f'{player}:' + message
         logger.debug(message)
 
-    def _choose_and_do_move(self, current_player, roll_value):
+    def choose_move(
+        self, current_player: 'Player', moves: Sequence
+    ) -> Sequence['MoveContainer']:
+        """Let current player choose among allowed moves."""
+        self.draw_for(current_player)
+
+        if self.timer is None:
+            return self._choose_move_before_deadline(current_player, moves)
+
+        start = perf_counter_ns()
+        selected_move = self._choose_move_before_deadline(
+            current_player, moves
+        )
+        self.timer.lap('agent_choice', start)
+        return selected_move
+
+    def draw_for(self, current_player: 'Player'):
+        """Let current player draw the game state if it prints it."""
+        if (
+            getattr(current_player, 'draw', None) is not None
+            and current_player.print_game_state
+        ):
+            current_player.draw(self._game_state)
+
+    def _choose_move_before_deadline(
+        self, current_player: 'Player', moves: Sequence
+    ) -> Sequence['MoveContainer']:
+        """
+        Let current player choose move, in a separate thread if the player has
+        a decision timeout, falling back to the fallback agent on timeout.
+        """
+        if current_player.decision_timeout is None:
+            return current_player.choose_move(self._game_state, moves)
+
+        res = {}
+        game_state, moves = self._copy_for_abandoning(moves)
+
+        def choose():
+            try:
+                res['move'] = current_player.choose_move(game_state, moves)
+            except Exception as error:
+                res['error'] = error
+
+        thread = threading.Thread(target=choose, daemon=True)
+        thread.start()
+        thread.join(current_player.decision_timeout)
+        if thread.is_alive():
+            return self._choose_fallback_move(current_player, moves)
+        if 'error' in res:
+            raise res['error']
+        return res['move']
+
+    def _copy_for_abandoning(
+        self, moves: Sequence
+    ) -> Tuple['GameState', list]:
+        """
+        Return copies of game state, without observers, and moves for a
+        thread that outlives the decision on timeout, not changed by play.
+        """
+        game_state = deepcopy(
+            self._game_state, {id(self._game_state.observers): []}
+        )
+        return game_state, list(moves)
+
+    def _choose_fallback_move(
+        self, current_player: 'Player', moves: Sequence
+    ) -> Sequence['MoveContainer']:
+        """Count timeout of current player and let fallback player choose."""
+        self.timeout_counts[current_player.name] += 1
+        self.log(
+            current_player,
+            f'Decision timeout, falling back to {self.fallback_agent.__name__}'
+        )
+        return self._fallback_players[current_player.name].choose_move(
+            self._game_state, moves
+        )
+
+    def _get_moves(self, current_player: 'Player', roll_value: int) -> list:
+        """Return allowed moves of current player for roll value."""
+        if self.timer is not None:
+            start = perf_counter_ns()
         moves = self._game_state.get_player_moves(
                 roll_value, current_player.name
             )
+        if self.timer is not None:
+            self.timer.lap('move_generation', start)
         self.log(current_player, f'Available moves: {moves}')
+        return moves
 
-        if len(moves) > 0:
-            if (
-                getattr(current_player, 'draw', None) is not None
-                and current_player.print_game_state
-            ):
-                current_player.draw(self._game_state)
-            selected_move = current_player.choose_move(
-                self._game_state, moves
-            )
+    def _do_move(
+        self, current_player: 'Player',
+        selected_move: Sequence['MoveContainer']
+    ):
+        """Apply all components of the selected move to the game state."""
+        if self.timer is not None:
+            start = perf_counter_ns()
+        for move_component in selected_move:
+            self._game_state.do(move_component)
+            self.log(current_player, f'Do move {move_component}')
+        if self.timer is not None:
+            self.timer.lap('move_application', start)
 
-            for move_component in selected_move:
-                self._game_state.do(move_component)
-                self.log(current_player, f'Do move {move_component}')
-
-            self.log(
-                current_player,
-                'Game state post-move.'
-                f'\nWaiting areas: {self._game_state.waiting_areas_to_dict()}'
-                f'\nMain spaces: {self._game_state.main_spaces_to_list()}'
-                f'\nHome areas: {self._game_state.home_areas_to_dict()}'
-            )
-        else:
-            self.log(current_player, 'No moves possible')
+        self.log(
+            current_player,
+            'Game state post-move.'
+            f'\nWaiting areas: {self._game_state.waiting_areas_to_dict()}'
+            f'\nMain spaces: {self._game_state.main_spaces_to_list()}'
+            f'\nHome areas: {self._game_state.home_areas_to_dict()}'
+        )
 
     def _get_game_state_counts(self):
         """Convenience function for debugging.
@@ -147,3 +472,114 @@ class Client:
 
     def get_game_state(self):
         return self._game_state
+
+
+@attr.s
+class AsyncClient(Client):
+    """
+    Client for use with asyncio, awaiting asynchronous agents (see
+    clovek_ne_jezi_se.agents.AsyncPlayer), so that one event loop can drive
+    many games. Synchronous agents are called directly, or in a daemon
+    thread if they have a decision timeout, so that the event loop keeps
+    running and the timeout fires.
+    """
+    async def play(self) -> Tuple[Union['Player', None], int]:
+        """Asynchronous version of Client.play"""
+        return await self.run_steps(self.play_steps())
+
+    async def take_turn(self, first_roll: Union[int, None] = None):
+        """Asynchronous version of Client.take_turn"""
+        await self.run_steps(self.turn_steps(first_roll))
+
+    async def run_steps(self, steps: Generator):
+        """Asynchronous version of Client.run_steps"""
+        try:
+            player, moves = next(steps)
+            while True:
+                selected_move = await self.choose_move(player, moves)
+                player, moves = steps.send(selected_move)
+        except StopIteration as stop:
+            return stop.value
+
+    async def choose_move(
+        self, current_player: 'Player', moves: Sequence
+    ) -> Sequence['MoveContainer']:
+        """Asynchronous version of Client.choose_move"""
+        self.draw_for(current_player)
+
+        if self.timer is None:
+            return await self._choose_move_before_deadline(
+                current_player, moves
+            )
+
+        start = perf_counter_ns()
+        selected_move = await self._choose_move_before_deadline(
+            current_player, moves
+        )
+        self.timer.lap('agent_choice', start)
+        return selected_move
+
+    async def _choose_move_before_deadline(
+        self, current_player: 'Player', moves: Sequence
+    ) -> Sequence['MoveContainer']:
+        """
+        Asynchronous version of Client._choose_move_before_deadline, cancelling
+        asynchronous agents on timeout.
+        """
+        if current_player.decision_timeout is None:
+            return await current_player.choose_move_async(
+                self._game_state, moves
+            )
+
+        if isinstance(current_player, AsyncPlayer):
+            choice = current_player.choose_move_async(self._game_state, moves)
+        else:
+            choice = self._choose_move_in_thread(current_player, moves)
+        try:
+            return await asyncio.wait_for(
+                choice, current_player.decision_timeout
+            )
+        except asyncio.TimeoutError:
+            return self._choose_fallback_move(current_player, moves)
+
+    def _choose_move_in_thread(
+        self, current_player: 'Player', moves: Sequence
+    ) -> 'asyncio.Future':
+        """
+        Return future of the move chosen by a synchronous player in a daemon
+        thread, on copies as in Client._choose_move_before_deadline.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        game_state, moves = self._copy_for_abandoning(moves)
+
+        def set_choice(move, error):
+            # The future is cancelled if the choice timed out
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(move)
+
+        def choose():
+            move = error = None
+            try:
+                move = current_player.choose_move(game_state, moves)
+            except Exception as choice_error:
+                error = choice_error
+            try:
+                loop.call_soon_threadsafe(set_choice, move, error)
+            except RuntimeError:
+                # The event loop closed after abandoning the choice
+                pass
+
+        threading.Thread(target=choose, daemon=True).start()
+        return future
+
+
+async def play_concurrently(
+    clients: Sequence['AsyncClient']
+) -> Sequence[Tuple[Union['Player', None], int]]:
+    """Play games of initialized async clients concurrently."""
+    return await asyncio.gather(*[client.play() for client in clients])
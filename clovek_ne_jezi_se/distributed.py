@@ -0,0 +1,222 @@
+"""Distributing work chunks to worker processes over TCP"""
+from typing import Any, Callable, Sequence, Tuple, Union
+from multiprocessing import AuthenticationError, Process
+from multiprocessing.connection import Listener, Client as connect
+import logging
+import queue
+import threading
+
+import attr
+
+from clovek_ne_jezi_se.log_handler import handler
+
+
+logger = logging.getLogger(__name__)
+logger.addHandler(handler)
+
+
+# Result placeholders of chunks skipped or failed by a Coordinator
+_SKIPPED = object()
+_FAILED = object()
+
+# Message workers send while working on a chunk, to show they are alive
+_HEARTBEAT = 'heartbeat'
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Return (host, port) tuple from address string host:port."""
+    host, port = address.rsplit(':', 1)
+    return host, int(port)
+
+
+@attr.s
+class Coordinator:
+    """
+    Hand out work chunks to workers connecting over TCP and collect results.
+
+    Each connected worker is served by its own thread and processes one
+    chunk at a time. If a worker dies, its connection breaks or it sends
+    neither result nor heartbeat for heartbeat_timeout seconds, e.g. as its
+    host vanished, its chunk is put back in the queue for other workers,
+    until it was handed out max_attempts times. Then the chunk is given up
+    and added to failed_chunks, so that a chunk which crashes every worker
+    cannot stall the run.
+
+    Parameters
+    ----------
+    address :
+        (host, port) to listen on, with port 0 for any free port
+    authkey :
+        Shared secret workers must authenticate with
+    max_attempts :
+        Number of times a chunk is handed out before it is given up
+    heartbeat_timeout :
+        Seconds without message after which a worker is considered lost,
+        must exceed the heartbeat_seconds of the workers, see run_worker
+    """
+    address = attr.ib(type=Tuple[str, int])
+    authkey = attr.ib(type=bytes)
+    max_attempts = attr.ib(default=3, type=int)
+    heartbeat_timeout = attr.ib(default=60., type=float)
+
+    def __attrs_post_init__(self):
+        self._listener = Listener(self.address, authkey=self.authkey)
+        self.n_requeued = 0
+        self.failed_chunks = []
+
+    def get_address(self) -> Tuple[str, int]:
+        """Return address listened on, e.g. if started with port 0."""
+        return self._listener.address
+
+    def run(
+        self, chunks: Sequence[Tuple],
+        result_callback: Callable[[Tuple, Any], None],
+        skip_chunk: Union[Callable[[Tuple], bool], None] = None
+    ):
+        """
+        Serve chunks, each a tuple of work function arguments, to workers
+        until all results have been passed to result_callback(chunk, result)
+        in the calling thread. Chunks for which the optional
+        skip_chunk(chunk) is true once they are due are not served, and
+        chunks given up are not passed to result_callback.
+        """
+        self._skip_chunk = skip_chunk
+        self._pending = queue.Queue()
+        self._results = queue.Queue()
+        self._done = threading.Event()
+        for chunk in chunks:
+            # Chunks hold configuration dictionaries, so they are queued
+            # with their number of attempts rather than used as keys
+            self._pending.put((chunk, 0))
+
+        accept_thread = threading.Thread(target=self._accept, daemon=True)
+        accept_thread.start()
+
+        try:
+            for _ in range(len(chunks)):
+                chunk, result = self._results.get()
+                if result is _FAILED:
+                    self.failed_chunks.append(chunk)
+                elif result is not _SKIPPED:
+                    result_callback(chunk, result)
+        finally:
+            self._done.set()
+            self._listener.close()
+
+    def _accept(self):
+        while not self._done.is_set():
+            try:
+                conn = self._listener.accept()
+            except (AuthenticationError, EOFError) as error:
+                logger.warning(f'Rejected worker connection: {error}')
+                continue
+            except OSError:
+                # Listener closed once all results are in
+                return
+            logger.debug('Worker connected')
+            threading.Thread(
+                target=self._serve, args=(conn,), daemon=True
+            ).start()
+
+    def _serve(self, conn):
+        with conn:
+            while not self._done.is_set():
+                try:
+                    chunk, n_attempts = self._pending.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if self._skip_chunk is not None and self._skip_chunk(chunk):
+                    self._results.put((chunk, _SKIPPED))
+                    continue
+
+                try:
+                    conn.send(chunk)
+                    result = self._receive_result(conn)
+                except (EOFError, OSError) as error:
+                    self._give_back(chunk, n_attempts + 1, error)
+                    return
+                self._results.put((chunk, result))
+
+    def _receive_result(self, conn) -> Any:
+        while True:
+            if not conn.poll(self.heartbeat_timeout):
+                raise TimeoutError(
+                    f'No heartbeat for {self.heartbeat_timeout} seconds'
+                )
+            message = conn.recv()
+            if not (isinstance(message, str) and message == _HEARTBEAT):
+                return message
+
+    def _give_back(self, chunk: Tuple, n_attempts: int, error: Exception):
+        if n_attempts >= self.max_attempts:
+            logger.error(
+                f'Worker lost ({error!r}), giving up chunk {chunk} after '
+                f'{n_attempts} attempts'
+            )
+            self._results.put((chunk, _FAILED))
+            return
+        logger.debug(f'Worker lost ({error!r}), re-queueing chunk {chunk}')
+        self.n_requeued += 1
+        self._pending.put((chunk, n_attempts))
+
+
+def run_worker(
+    address: Tuple[str, int], authkey: bytes, work_function,
+    heartbeat_seconds: float = 10.
+):
+    """
+    Connect to a Coordinator and call work_function(*chunk) for each chunk
+    received, sending back the results until the coordinator closes the
+    connection. While working on a chunk, a heartbeat is sent every
+    heartbeat_seconds.
+    """
+    with connect(address, authkey=authkey) as conn:
+        send_lock = threading.Lock()
+        while True:
+            try:
+                chunk = conn.recv()
+            except (EOFError, OSError):
+                return
+            done = threading.Event()
+            threading.Thread(
+                target=_send_heartbeats,
+                args=(conn, send_lock, done, heartbeat_seconds), daemon=True
+            ).start()
+            try:
+                result = work_function(*chunk)
+            finally:
+                done.set()
+            with send_lock:
+                conn.send(result)
+
+
+def _send_heartbeats(
+    conn, send_lock: 'threading.Lock', done: 'threading.Event',
+    heartbeat_seconds: float
+):
+    while not done.wait(heartbeat_seconds):
+        with send_lock:
+            if done.is_set():
+                return
+            try:
+                conn.send(_HEARTBEAT)
+            except (EOFError, OSError):
+                return
+
+
+def start_local_workers(
+    address: Tuple[str, int], authkey: bytes, work_function, n_workers: int,
+    heartbeat_seconds: float = 10.
+) -> Sequence['Process']:
+    """Start worker processes on this host, e.g. as stand-ins for testing."""
+    workers = [
+        Process(
+            target=run_worker,
+            args=(address, authkey, work_function, heartbeat_seconds),
+            daemon=True
+        )
+        for _ in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    return workers
@@ -0,0 +1,205 @@
+"""
+Playing chunks of game runs in this process, in a pool of worker processes
+or on workers connecting over TCP
+"""
+from typing import Callable, Iterable, Iterator, Sequence, Tuple, Union
+from math import ceil
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, wait
+)
+
+import click
+
+from clovek_ne_jezi_se.distributed import Coordinator, start_local_workers
+from clovek_ne_jezi_se.instrumentation import TimingHistogram
+
+
+def run_chunks(
+    chunks: Iterable[Tuple], result_callback: Callable[[dict, dict], None],
+    work_function: Callable, workers: int = 1,
+    address: Union[Tuple[str, int], None] = None,
+    local_workers: int = 0, authkey: bytes = b'',
+    timer: Union['TimingHistogram', None] = None,
+    chunk_callback: Union[
+        Callable[[Tuple, Sequence[dict]], None], None
+    ] = None,
+    skip_chunk: Union[Callable[[Tuple], bool], None] = None
+):
+    """
+    Play chunks of runs with work_function, e.g. run_experiments.run_games,
+    on workers connecting to address if given, see run_chunks_distributed,
+    else in a pool of workers processes if more than one, else in this
+    process.
+    """
+    if address is not None:
+        run_chunks_distributed(
+            chunks, work_function, address, authkey, local_workers,
+            result_callback, timer, chunk_callback, skip_chunk
+        )
+    elif workers > 1:
+        run_chunks_in_parallel(
+            chunks, work_function, workers, result_callback, timer,
+            chunk_callback
+        )
+    else:
+        run_chunks_serially(
+            chunks, work_function, result_callback, timer, chunk_callback
+        )
+
+
+def run_chunks_in_parallel(
+    chunks: Iterable[Tuple], work_function: Callable, workers: int,
+    result_callback: Callable[[dict, dict], None],
+    timer: Union['TimingHistogram', None] = None,
+    chunk_callback: Union[
+        Callable[[Tuple, Sequence[dict]], None], None
+    ] = None,
+    max_pending_per_worker: int = 2
+):
+    """
+    Spread chunks of runs, see get_game_chunks, across a pool of worker
+    processes playing them with work_function, which returns results and
+    timer of a chunk. Calls result_callback(config, result) in the parent
+    process for each result as chunks complete, followed by the optional
+    chunk_callback(chunk, results). Chunks are submitted as workers free up,
+    so they are consumed lazily.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for chunk in chunks:
+            futures[executor.submit(work_function, *chunk)] = chunk
+            if len(futures) >= workers * max_pending_per_worker:
+                _handle_completed(
+                    futures, result_callback, timer, chunk_callback
+                )
+
+        while futures:
+            _handle_completed(futures, result_callback, timer, chunk_callback)
+
+
+def _handle_completed(futures, result_callback, timer, chunk_callback):
+    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+    for future in done:
+        handle_chunk_result(
+            futures.pop(future), future.result(), result_callback, timer,
+            chunk_callback
+        )
+
+
+def run_chunks_distributed(
+    chunks: Iterable[Tuple], work_function: Callable,
+    address: Tuple[str, int], authkey: bytes, local_workers: int,
+    result_callback: Callable[[dict, dict], None],
+    timer: Union['TimingHistogram', None] = None,
+    chunk_callback: Union[
+        Callable[[Tuple, Sequence[dict]], None], None
+    ] = None,
+    skip_chunk: Union[Callable[[Tuple], bool], None] = None
+):
+    """
+    Coordinate workers connecting over TCP to address, see the worker
+    command, optionally starting local_workers playing chunks with
+    work_function on this host. The result_callback and chunk_callback are
+    called as for run_chunks_in_parallel, and queued chunks for which
+    skip_chunk(chunk) is true by the time a worker is free are not played.
+    """
+    chunks = list(chunks)
+    coordinator = Coordinator(address, authkey)
+    click.echo(f'Coordinating workers on {coordinator.get_address()}')
+    start_local_workers(
+        coordinator.get_address(), authkey, work_function, local_workers
+    )
+    coordinator.run(
+        chunks,
+        lambda chunk, chunk_result: handle_chunk_result(
+            chunk, chunk_result, result_callback, timer, chunk_callback
+        ),
+        skip_chunk=skip_chunk
+    )
+    if coordinator.failed_chunks:
+        click.echo(
+            f'Gave up {len(coordinator.failed_chunks)} chunks of games whose '
+            'workers were lost repeatedly'
+        )
+
+
+def run_chunks_serially(
+    chunks: Iterable[Tuple], work_function: Callable,
+    result_callback: Callable[[dict, dict], None],
+    timer: Union['TimingHistogram', None] = None,
+    chunk_callback: Union[Callable[[Tuple, Sequence[dict]], None], None] = None
+):
+    """
+    Play chunks of runs with work_function in this process, calling
+    result_callback and chunk_callback as for run_chunks_in_parallel.
+    """
+    for chunk in chunks:
+        handle_chunk_result(
+            chunk, work_function(*chunk), result_callback, timer,
+            chunk_callback
+        )
+
+
+def handle_chunk_result(
+    chunk: Tuple, chunk_result: Tuple,
+    result_callback: Callable[[dict, dict], None],
+    timer: Union['TimingHistogram', None] = None,
+    chunk_callback: Union[Callable[[Tuple, Sequence[dict]], None], None] = None
+):
+    """
+    Pass results of a chunk_result, the (results, timer) returned by a work
+    function, to result_callback, merge its timer into timer if given and
+    pass chunk and results to chunk_callback if given.
+    """
+    config = chunk[0]
+    results, chunk_timer = chunk_result
+    for result in results:
+        result_callback(config, result)
+    if timer is not None:
+        timer.merge(chunk_timer)
+    if chunk_callback is not None:
+        chunk_callback(chunk, results)
+
+
+def get_game_chunks(
+    experiment_group_variables: Iterable[dict], workers: int,
+    record_timings: bool, max_chunk_size: Union[int, None] = None,
+    skip_chunk: Union[Callable[[Tuple], bool], None] = None
+) -> Iterator[Tuple[dict, range, bool, str]]:
+    """
+    Yield run_games arguments for chunks of all experiments, of the run
+    indices in experiment variables run_idxs if given, else of all runs.
+    Chunks for which skip_chunk(chunk) is true when they are due are left
+    out, e.g. of experiments stopped early.
+    """
+    for experiment_variables in experiment_group_variables:
+        run_idxs = experiment_variables.get(
+            'run_idxs', range(experiment_variables['n_runs'])
+        )
+        for chunk_idxs in get_run_idx_chunks(
+            len(run_idxs), workers, max_chunk_size=max_chunk_size
+        ):
+            chunk = (
+                experiment_variables['config'],
+                run_idxs[chunk_idxs.start:chunk_idxs.stop], record_timings,
+                experiment_variables['experiment_name']
+            )
+            if skip_chunk is None or not skip_chunk(chunk):
+                yield chunk
+
+
+def get_run_idx_chunks(
+    n_runs: int, workers: int, chunks_per_worker: int = 4,
+    max_chunk_size: Union[int, None] = None
+) -> Sequence[range]:
+    """
+    Split run indices into chunks, several per worker to balance the load of
+    games of differing length, of at most max_chunk_size runs if given.
+    """
+    chunk_size = max(1, ceil(n_runs / (workers * chunks_per_worker)))
+    if max_chunk_size is not None:
+        chunk_size = min(chunk_size, max_chunk_size)
+    return [
+        range(chunk_start, min(chunk_start + chunk_size, n_runs))
+        for chunk_start in range(0, n_runs, chunk_size)
+    ]
@@ -35,6 +35,9 @@ class GameState:
     Game state including board, player pieces and query methods. The board
     consists of three areas: the waiting areas for each, the shared main board,
     and the home areas for each player.
+
+    Observers (see clovek_ne_jezi_se.observers) are notified of every move
+    component done.
     """
     player_names = attr.ib(
         type=Sequence,
@@ -55,6 +58,7 @@ class GameState:
         ]
     )
     empty_symbol = attr.ib(kw_only=True, default=EMPTY_SYMBOL)
+    observers = attr.ib(kw_only=True, factory=list, repr=False, eq=False)
 
     def initialize(self):
         """Create internal game-state representation"""
@@ -65,6 +69,10 @@ class GameState:
         self._join_waiting_graphs_to_main()
         self._create_home_graphs()
         self._join_home_graphs_to_main()
+        self._waiting_counts = {
+            player_name: self.pieces_per_player
+            for player_name in self.player_names
+        }
 
     def _create_main_graph(self):
         main_board_graph = nx.cycle_graph(
@@ -363,6 +371,14 @@ class GameState:
         to_node = self._graph.nodes[to_node_name]
         to_node['occupied_by'] = move_container.from_space.occupied_by
 
+        if move_container.from_space.kind == 'waiting':
+            self._waiting_counts[move_container.from_space.occupied_by] -= 1
+        if move_container.to_space.kind == 'waiting':
+            self._waiting_counts[move_container.from_space.occupied_by] += 1
+
+        for observer in self.observers:
+            observer.on_move(move_container)
+
     def get_player_moves(
         self, roll: int, player_name: str
     ) -> Sequence:
@@ -547,6 +563,13 @@ class GameState:
             allowed_traversers_query_params, allowed_occupants_query_params
         ]
 
+    def is_all_waiting(self, player_name: str) -> bool:
+        """
+        Returns boolean for whether all player pieces are in the waiting area,
+        using counts kept up to date by do rather than board queries.
+        """
+        return self._waiting_counts[player_name] == self.pieces_per_player
+
     def is_winner(self, player_name: str) -> bool:
         """Returns boolean for whether player name is current winner"""
         home_dict = self.home_areas_to_dict()
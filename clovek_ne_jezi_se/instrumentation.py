@@ -0,0 +1,69 @@
+"""Timing instrumentation for game and agent code"""
+from time import perf_counter_ns
+import json
+
+import attr
+
+
+@attr.s
+class TimingHistogram:
+    """
+    Histogram of phase durations in nanoseconds.
+
+    Durations are counted in power-of-two buckets, so recording is a constant
+    time operation independent of the number of recorded durations.
+    """
+    counts = attr.ib(factory=dict)
+    totals = attr.ib(factory=dict)
+
+    def record(self, phase: str, duration_ns: int):
+        """Add duration of phase to histogram."""
+        phase_counts = self.counts.get(phase)
+        if phase_counts is None:
+            phase_counts = self.counts[phase] = {}
+            self.totals[phase] = 0
+        bucket = duration_ns.bit_length()
+        phase_counts[bucket] = phase_counts.get(bucket, 0) + 1
+        self.totals[phase] += duration_ns
+
+    def merge(self, other: 'TimingHistogram'):
+        """Add counts and totals of other histogram, e.g. from a worker."""
+        for phase, other_counts in other.counts.items():
+            phase_counts = self.counts.setdefault(phase, {})
+            for bucket, count in other_counts.items():
+                phase_counts[bucket] = phase_counts.get(bucket, 0) + count
+            self.totals[phase] = self.totals.get(phase, 0) \
+                + other.totals[phase]
+
+    def lap(self, phase: str, start_ns: int) -> int:
+        """
+        Record duration of phase from start_ns until now, and return now for
+        timing the following phase.
+        """
+        now = perf_counter_ns()
+        self.record(phase, now - start_ns)
+        return now
+
+    def summary(self) -> dict:
+        """
+        Return per-phase count, total and mean duration in nanoseconds, and
+        histogram counts keyed by bucket upper bound in nanoseconds.
+        """
+        res = {}
+        for phase, phase_counts in self.counts.items():
+            count = sum(phase_counts.values())
+            res[phase] = dict(
+                count=count,
+                total_ns=self.totals[phase],
+                mean_ns=self.totals[phase] / count,
+                histogram={
+                    2 ** bucket: phase_counts[bucket]
+                    for bucket in sorted(phase_counts)
+                }
+            )
+        return res
+
+    def dump(self, path):
+        """Write summary as json to path."""
+        with open(path, 'w') as fp:
+            json.dump(self.summary(), fp, indent=2)
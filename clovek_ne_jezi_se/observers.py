@@ -0,0 +1,126 @@
+"""Game observers for collecting events and statistics during play"""
+from typing import Union
+
+import attr
+
+from clovek_ne_jezi_se.game_state import GameState, MoveContainer
+
+
+@attr.s
+class GameObserver:
+    """
+    Base class for game observers.
+
+    Observers are registered with a Client (which passes them on to its
+    GameState) and are notified of game events. All event methods are no-ops
+    by default, so subclasses only need to override the events they use.
+    """
+    def on_game_start(self, game_state: 'GameState'):
+        """Called once the game state has been initialized."""
+
+    def on_turn_start(self, player_name: str, play_count: int):
+        """Called at the start of each player turn."""
+
+    def on_roll(self, player_name: str, roll_value: int):
+        """Called for every dice roll."""
+
+    def on_move(self, move_component: 'MoveContainer'):
+        """Called by GameState.do for every move component done."""
+
+    def on_dead_turns(self, player_name: str, n_turns: int):
+        """
+        Called for turns skipped by a Client with skip_dead_turns, in which
+        the player had all pieces waiting and did not roll the number of dice
+        faces.
+        """
+
+    def on_game_end(self, winner_name: Union[str, None], play_count: int):
+        """Called once play has finished."""
+
+
+@attr.s
+class GameStatistics(GameObserver):
+    """
+    Observer collecting per-player game statistics with incremental counters.
+
+    Statistics collected are
+
+    * captures: opponent pieces sent back to their waiting areas by player
+    * pieces_sent_home: player pieces sent back to the waiting area
+      by opponents
+    * waiting_turns: turns spent with all pieces waiting without rolling
+      the number of dice faces
+    * first_home_play: play count when the player's first piece entered its
+      home area
+    """
+    def on_game_start(self, game_state: 'GameState'):
+        self._player_names = list(game_state.player_names)
+        self._pieces_per_player = game_state.pieces_per_player
+        self._number_of_dice_faces = game_state.number_of_dice_faces
+
+        self.captures = self._make_counter()
+        self.pieces_sent_home = self._make_counter()
+        self.waiting_turns = self._make_counter()
+        self.first_home_play = {}
+
+        self._waiting_counts = {
+            player_name: self._pieces_per_player
+            for player_name in self._player_names
+        }
+        self._current_player_name = None
+        self._play_count = 0
+
+    def _make_counter(self) -> dict:
+        return {player_name: 0 for player_name in self._player_names}
+
+    def on_turn_start(self, player_name: str, play_count: int):
+        self._current_player_name = player_name
+        self._play_count = play_count
+
+    def on_roll(self, player_name: str, roll_value: int):
+        if (
+            self._waiting_counts[player_name] == self._pieces_per_player
+            and roll_value != self._number_of_dice_faces
+        ):
+            self.waiting_turns[player_name] += 1
+
+    def on_dead_turns(self, player_name: str, n_turns: int):
+        self.waiting_turns[player_name] += n_turns
+
+    def on_move(self, move_component: 'MoveContainer'):
+        from_space = move_component.from_space
+        to_space = move_component.to_space
+        mover_name = from_space.occupied_by
+
+        if from_space.kind == 'waiting':
+            self._waiting_counts[mover_name] -= 1
+
+        if to_space.kind == 'waiting':
+            self._waiting_counts[mover_name] += 1
+            self.pieces_sent_home[mover_name] += 1
+            if self._current_player_name is not None:
+                self.captures[self._current_player_name] += 1
+        elif (
+            to_space.kind == 'home' and from_space.kind != 'home'
+            and mover_name not in self.first_home_play
+        ):
+            self.first_home_play[mover_name] = self._play_count
+
+    def to_metrics(self) -> dict:
+        """
+        Return statistics as flat dictionary with keys of the form
+        <statistic>_<player index>, e.g. for logging as mlflow metrics.
+        Players without a piece in their home area have no first_home_play
+        entry.
+        """
+        res = {}
+        for player_idx, player_name in enumerate(self._player_names):
+            res[f'captures_{player_idx}'] = self.captures[player_name]
+            res[f'pieces_sent_home_{player_idx}'] = \
+                self.pieces_sent_home[player_name]
+            res[f'waiting_turns_{player_idx}'] = \
+                self.waiting_turns[player_name]
+            if player_name in self.first_home_play:
+                res[f'first_home_play_{player_idx}'] = \
+                    self.first_home_play[player_name]
+        return res
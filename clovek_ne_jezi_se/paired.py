@@ -0,0 +1,88 @@
+"""Paired comparison of agents with common dice across seatings"""
+from typing import Sequence, Tuple
+from itertools import combinations, permutations
+
+import numpy as np
+from scipy.stats import norm
+
+
+SEATINGS = ('rotations', 'permutations')
+
+
+def get_seatings(n_players: int, seatings: str = 'rotations') -> Sequence[
+    Tuple[int, ...]
+]:
+    """
+    Return seatings of a lineup of n_players agents, each a tuple of the
+    lineup index of the agent in each seat. Rotations seat every agent once in
+    every seat, permutations additionally vary who follows whom.
+    """
+    if seatings == 'rotations':
+        return [
+            tuple((seat + shift) % n_players for seat in range(n_players))
+            for shift in range(n_players)
+        ]
+    if seatings == 'permutations':
+        return list(permutations(range(n_players)))
+    raise ValueError(f'Seatings must be one of {SEATINGS}')
+
+
+def seat_config(config: dict, seating: Sequence[int]) -> dict:
+    """
+    Return configuration with the agents and kwargs of the lineup in config
+    seated by seating, see get_seatings. Seat names stay in place.
+    """
+    players = config['players']
+    return dict(config, players=[
+        dict(
+            players[seat_idx], agent=players[lineup_idx]['agent'],
+            kwargs=players[lineup_idx]['kwargs']
+        )
+        for seat_idx, lineup_idx in enumerate(seating)
+    ])
+
+
+def get_paired_win_rates(results: Sequence[dict], n_players: int) -> dict:
+    """
+    Return win rates of lineup agents and their pairwise differences, with
+    standard errors, from paired results, each a dict with winner lineup
+    indices of all seatings of one dice stream.
+
+    Each dice stream is a block in which every agent sits in every seat
+    equally often, so seat-order effects and dice luck cancel in the
+    differences, whose standard errors are estimated across blocks.
+    """
+    block_win_rates = np.zeros((len(results), n_players))
+    for block_idx, result in enumerate(results):
+        winner_lineup_idxs = np.asarray(result['winner_lineup_idxs'])
+        has_winner = winner_lineup_idxs >= 0
+        block_win_rates[block_idx] = np.bincount(
+            winner_lineup_idxs[has_winner], minlength=n_players
+        ) / len(winner_lineup_idxs)
+
+    n_blocks = len(results)
+    res = dict(n_blocks=n_blocks, win_rates=[], differences=[])
+    for lineup_idx in range(n_players):
+        res['win_rates'].append(_get_estimate(
+            block_win_rates[:, lineup_idx], lineup_idx=lineup_idx
+        ))
+    for first_idx, second_idx in combinations(range(n_players), 2):
+        res['differences'].append(_get_estimate(
+            block_win_rates[:, first_idx] - block_win_rates[:, second_idx],
+            lineup_idxs=[first_idx, second_idx]
+        ))
+    return res
+
+
+def _get_estimate(block_values: np.ndarray, confidence=0.95, **labels) -> dict:
+    n_blocks = len(block_values)
+    mean = float(block_values.mean()) if n_blocks else float('nan')
+    if n_blocks > 1:
+        std_err = float(block_values.std(ddof=1) / np.sqrt(n_blocks))
+    else:
+        std_err = float('nan')
+    half_width = norm.ppf(0.5 + confidence / 2) * std_err
+    return dict(
+        labels, mean=mean, std_err=std_err,
+        lower=mean - half_width, upper=mean + half_width
+    )
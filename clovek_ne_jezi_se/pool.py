@@ -0,0 +1,117 @@
+"""Pool for playing many games interleaved in one process"""
+from typing import Dict, Sequence, Tuple, Union
+from time import perf_counter_ns
+import logging
+
+import attr
+
+from clovek_ne_jezi_se.agents import Player
+from clovek_ne_jezi_se.client import Client
+from clovek_ne_jezi_se.log_handler import handler
+
+
+logger = logging.getLogger(__name__)
+logger.addHandler(handler)
+
+
+@attr.s
+class GamePool:
+    """
+    Play many initialized Client games round-robin in a single process.
+
+    In each round every unfinished game is advanced to its next decision
+    point. The pending decisions are grouped by player class, and each group
+    is answered by a single call to the class's choose_move_idx_batch, so that
+    expensive agents can amortize per-call costs across games.
+
+    Decisions go through the same hooks as in Client.choose_move: players
+    draw the game state if they print it, allowed and chosen moves are
+    logged, and batch durations are recorded by client timers as
+    agent_choice, once per batch. A batch cannot be abandoned per game, so
+    players with a decision_timeout, and with it the fallback agent, are
+    not supported and raise ValueError.
+    """
+    clients = attr.ib(type=Sequence['Client'])
+
+    @clients.validator
+    def _check_decision_timeouts(self, attribute, clients):
+        for client in clients:
+            for player in client.players:
+                if player.decision_timeout is not None:
+                    raise ValueError(
+                        f'Player {player.name} has a decision timeout, '
+                        'which is not supported in a GamePool'
+                    )
+
+    def play(self) -> Sequence[Tuple[Union['Player', None], int]]:
+        """
+        Play all games to the end, returning (winner, play count) per client
+        as Client.play does.
+        """
+        results = [None] * len(self.clients)
+        steps = {}
+        pending = {}
+        for client_idx, client in enumerate(self.clients):
+            steps[client_idx] = client.play_steps()
+            self._advance(client_idx, steps, pending, results, None)
+
+        n_rounds = 0
+        while len(pending) > 0:
+            selected_moves = self.choose_moves(pending)
+            for client_idx, selected_move in selected_moves.items():
+                self._advance(
+                    client_idx, steps, pending, results, selected_move
+                )
+            n_rounds += 1
+
+        logger.debug(f'Played {len(self.clients)} games in {n_rounds} rounds')
+        return results
+
+    def _advance(self, client_idx, steps, pending, results, selected_move):
+        """
+        Advance game to its next decision point, moving it from pending to
+        results once finished.
+        """
+        try:
+            if selected_move is None:
+                pending[client_idx] = next(steps[client_idx])
+            else:
+                pending[client_idx] = steps[client_idx].send(selected_move)
+        except StopIteration as stop:
+            pending.pop(client_idx, None)
+            results[client_idx] = stop.value
+
+    def choose_moves(
+        self, pending: Dict[int, Tuple['Player', Sequence]]
+    ) -> Dict[int, Sequence]:
+        """
+        Return selected move per client index for the pending
+        (player, allowed moves) decisions, batched by player class.
+        """
+        batches = {}
+        for client_idx, (player, moves) in pending.items():
+            batches.setdefault(type(player), []).append(client_idx)
+
+        res = {}
+        for player_class, client_idxs in batches.items():
+            clients = [self.clients[client_idx] for client_idx in client_idxs]
+            decisions = [
+                (
+                    pending[client_idx][0], client.get_game_state(),
+                    pending[client_idx][1]
+                )
+                for client_idx, client in zip(client_idxs, clients)
+            ]
+            for client, (player, _, _) in zip(clients, decisions):
+                client.draw_for(player)
+
+            start = perf_counter_ns()
+            moves = player_class.choose_move_batch(decisions)
+            timers = {
+                id(client.timer): client.timer for client in clients
+                if client.timer is not None
+            }
+            for timer in timers.values():
+                timer.lap('agent_choice', start)
+            res.update(zip(client_idxs, moves))
+        return res
@@ -0,0 +1,219 @@
+"""Live throughput and progress of experiment runs"""
+from typing import Callable, Union
+import time
+
+import attr
+
+
+@attr.s
+class _ConfigProgress:
+    """Progress of the games of one experiment configuration."""
+    n_planned = attr.ib(default=0, type=int)
+    n_games = attr.ib(default=0, type=int)
+    n_plays = attr.ib(default=0, type=int)
+    seconds = attr.ib(default=0., type=float)
+
+
+@attr.s
+class ProgressTracker:
+    """
+    Track throughput and progress of games of experiment configurations,
+    keyed by config hash, from their results with n_plays, wall-clock
+    seconds and the worker that played them.
+
+    Overall games and turns per second are measured on the wall clock, per
+    configuration on the time its games took. Utilization of a worker is the
+    fraction of elapsed time it spent playing games. Games are planned per
+    configuration as configurations are expanded, so the total number of
+    games, and with it the overall ETA, is unknown until finish_planning is
+    called.
+
+    Parameters
+    ----------
+    n_workers :
+        Number of workers playing games in parallel
+    report_seconds :
+        Minimum seconds between progress reports, see update
+    clock :
+        Function returning the current time in seconds
+    """
+    n_workers = attr.ib(default=1, type=int)
+    report_seconds = attr.ib(default=10., type=float)
+    clock = attr.ib(
+        default=time.monotonic, type=Callable[[], float], repr=False,
+        eq=False
+    )
+
+    def __attrs_post_init__(self):
+        self._configs = {}
+        self._worker_seconds = {}
+        self.is_planning_finished = False
+        self.start_time = self._last_report_time = self.clock()
+
+    def add_planned(self, config_hash: str, n_games: int):
+        """Add number of games planned for a configuration."""
+        self._get_config(config_hash).n_planned += n_games
+
+    def finish_planning(self):
+        """Mark all configurations and their games as planned."""
+        self.is_planning_finished = True
+
+    def _get_config(self, config_hash: str) -> '_ConfigProgress':
+        progress = self._configs.get(config_hash)
+        if progress is None:
+            progress = self._configs[config_hash] = _ConfigProgress()
+        return progress
+
+    def update(self, result: dict) -> bool:
+        """
+        Add finished game result, returning whether a progress report is due
+        since the last one.
+        """
+        progress = self._get_config(result['config_hash'])
+        progress.n_games += 1
+        progress.n_plays += result['n_plays']
+        progress.seconds += result['seconds']
+        worker = result.get('worker', '')
+        self._worker_seconds[worker] = self._worker_seconds.get(worker, 0.) \
+            + result['seconds']
+
+        now = self.clock()
+        if now - self._last_report_time < self.report_seconds:
+            return False
+        self._last_report_time = now
+        return True
+
+    def get_elapsed_seconds(self) -> float:
+        """Return seconds since tracking started."""
+        return self.clock() - self.start_time
+
+    def get_n_games(self) -> int:
+        """Return number of finished games."""
+        return sum(progress.n_games for progress in self._configs.values())
+
+    def get_games_per_second(
+        self, config_hash: Union[str, None] = None
+    ) -> float:
+        """
+        Return finished games per elapsed second, or of a configuration per
+        second its games took.
+        """
+        if config_hash is None:
+            return _get_rate(self.get_n_games(), self.get_elapsed_seconds())
+        progress = self._configs[config_hash]
+        return _get_rate(progress.n_games, progress.seconds)
+
+    def get_turns_per_second(
+        self, config_hash: Union[str, None] = None
+    ) -> float:
+        """
+        Return plays of finished games per elapsed second, or of a
+        configuration per second its games took.
+        """
+        if config_hash is None:
+            return _get_rate(
+                sum(progress.n_plays for progress in self._configs.values()),
+                self.get_elapsed_seconds()
+            )
+        progress = self._configs[config_hash]
+        return _get_rate(progress.n_plays, progress.seconds)
+
+    def get_worker_utilization(self) -> dict:
+        """Return fraction of elapsed time spent playing keyed by worker."""
+        elapsed = self.get_elapsed_seconds()
+        return {
+            worker: _get_rate(seconds, elapsed)
+            for worker, seconds in self._worker_seconds.items()
+        }
+
+    def get_eta_seconds(self, config_hash: Union[str, None] = None) -> float:
+        """
+        Return estimated seconds until all planned games are finished at the
+        current overall rate, or until those of a configuration are finished
+        if all workers played them at its rate, or nan if unknown, e.g. while
+        planning is not finished.
+        """
+        if config_hash is None:
+            if not self.is_planning_finished:
+                return float('nan')
+            n_remaining = sum(
+                max(progress.n_planned - progress.n_games, 0)
+                for progress in self._configs.values()
+            )
+            games_per_second = self.get_games_per_second()
+        else:
+            progress = self._configs[config_hash]
+            n_remaining = max(progress.n_planned - progress.n_games, 0)
+            games_per_second = self.n_workers \
+                * self.get_games_per_second(config_hash)
+        if n_remaining == 0:
+            return 0.
+        if games_per_second == 0:
+            return float('nan')
+        return n_remaining / games_per_second
+
+    def get_report(self) -> str:
+        """Return lines of overall and per-configuration progress."""
+        n_planned = sum(
+            progress.n_planned for progress in self._configs.values()
+        ) if self.is_planning_finished else '?'
+        utilization = self.get_worker_utilization()
+        lines = [
+            f'{self.get_n_games()}/{n_planned} games, '
+            f'{self.get_games_per_second():.1f} games/s, '
+            f'{self.get_turns_per_second():.0f} turns/s, '
+            f'{len(utilization)} workers '
+            f'{_get_mean(utilization.values()):.0%} utilized, '
+            f'ETA {_format_seconds(self.get_eta_seconds())}'
+        ]
+        for config_hash, progress in self._configs.items():
+            if progress.n_games == 0 or progress.n_games >= progress.n_planned:
+                continue
+            lines.append(
+                f'  config {config_hash[:12]}: '
+                f'{progress.n_games}/{progress.n_planned} games, '
+                f'{self.get_turns_per_second(config_hash):.0f} turns/s, '
+                f'ETA {_format_seconds(self.get_eta_seconds(config_hash))}'
+            )
+        return '\n'.join(lines)
+
+    def get_metrics(self) -> dict:
+        """
+        Return overall throughput and utilization, and per-configuration
+        throughput with the config hash prefix as key suffix.
+        """
+        utilization = self.get_worker_utilization().values()
+        metrics = dict(
+            n_games=self.get_n_games(),
+            elapsed_seconds=self.get_elapsed_seconds(),
+            games_per_second=self.get_games_per_second(),
+            turns_per_second=self.get_turns_per_second(),
+            mean_worker_utilization=_get_mean(utilization),
+            min_worker_utilization=min(utilization, default=0.)
+        )
+        for config_hash, progress in self._configs.items():
+            if progress.n_games == 0:
+                continue
+            suffix = config_hash[:12]
+            metrics[f'games_per_second.{suffix}'] = \
+                self.get_games_per_second(config_hash)
+            metrics[f'turns_per_second.{suffix}'] = \
+                self.get_turns_per_second(config_hash)
+        return metrics
+
+
+def _get_rate(count: float, seconds: float) -> float:
+    return count / seconds if seconds > 0 else 0.
+
+
+def _get_mean(values) -> float:
+    values = list(values)
+    return sum(values) / len(values) if values else 0.
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds != seconds:
+        return '?'
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours:d}:{minutes:02d}:{seconds:02d}'
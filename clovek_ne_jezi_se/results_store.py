@@ -0,0 +1,207 @@
+"""Columnar local store of game results"""
+from typing import Sequence, Set, Union
+from pathlib import Path
+import os
+import time
+import uuid
+
+import attr
+import numpy as np
+from scipy.stats import beta
+
+
+METRIC_PREFIX = 'metrics.'
+
+
+@attr.s
+class ResultsStore:
+    """
+    Store of game results as NumPy .npz shards of columns in a directory.
+
+    Results are buffered in memory and written as a new shard once
+    shard_size results are buffered or on flush, so concurrent writers never
+    touch the same file.
+
+    Parameters
+    ----------
+    path :
+        Directory holding the shards, created if missing
+    shard_size :
+        Number of buffered results written per shard
+    """
+    path = attr.ib(converter=Path)
+    shard_size = attr.ib(default=10000, type=int)
+
+    def __attrs_post_init__(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def append(self, config: dict, result: dict):
+        """Buffer game result of an experiment configuration."""
+        row = dict(
+            config_hash=result['config_hash'],
+            cache_key=result['cache_key'],
+            agents=','.join(player['agent'] for player in config['players']),
+            seed=result['seed'],
+            run_idx=result['run_idx'],
+            winner_idx=result['winner_idx'],
+            n_plays=result['n_plays'],
+            seconds=result.get('seconds', np.nan),
+            **config['board']
+        )
+        row.update(
+            (METRIC_PREFIX + key, value)
+            for key, value in result['metrics'].items()
+        )
+        self._rows.append(row)
+        if len(self._rows) >= self.shard_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered results as a new shard."""
+        if not self._rows:
+            return
+        columns = _rows_to_columns(self._rows)
+        name = f'{time.time_ns()}-{uuid.uuid4().hex[:8]}'
+        tmp_path = self.path / f'.{name}.tmp.npz'
+        np.savez(tmp_path, **columns)
+        os.replace(tmp_path, self.path / f'{name}.npz')
+        self._rows = []
+
+    def load(self, columns: Union[Sequence[str], None] = None) -> dict:
+        """
+        Return dictionary of column arrays of all written results, with
+        metrics missing in some shards filled with nan.
+        """
+        shards = []
+        for shard_path in sorted(self.path.glob('*.npz')):
+            if shard_path.name.startswith('.'):
+                continue
+            with np.load(shard_path, allow_pickle=False) as shard:
+                shards.append({
+                    key: shard[key] for key in shard.files
+                    if columns is None or key in columns
+                })
+        return _concatenate_shards(shards)
+
+    def get_cache_keys(self) -> Set[str]:
+        """Return cache keys of written results, see cache.get_cache_key."""
+        data = self.load(['cache_key'])
+        if 'cache_key' not in data:
+            return set()
+        return set(data['cache_key'].astype(str))
+
+    def get_seconds_per_game(self) -> dict:
+        """Return mean seconds per game keyed by config hash."""
+        data = self.load(['config_hash', 'seconds'])
+        if 'seconds' not in data:
+            return {}
+        res = {}
+        config_hashes, inverse = np.unique(
+            data['config_hash'], return_inverse=True
+        )
+        for config_idx, config_hash in enumerate(config_hashes):
+            seconds = data['seconds'][inverse == config_idx].astype(float)
+            seconds = seconds[~np.isnan(seconds)]
+            if len(seconds):
+                res[str(config_hash)] = float(seconds.mean())
+        return res
+
+    def get_win_counts(self) -> dict:
+        """
+        Return dictionary keyed by config hash of agents, number of games,
+        games without winner and wins per player index.
+        """
+        data = self.load(['config_hash', 'agents', 'winner_idx'])
+        if not data:
+            return {}
+        config_hashes, first_idxs, inverse = np.unique(
+            data['config_hash'], return_index=True, return_inverse=True
+        )
+        res = {}
+        for config_idx, config_hash in enumerate(config_hashes):
+            agents = str(data['agents'][first_idxs[config_idx]])
+            winner_idxs = data['winner_idx'][inverse == config_idx]
+            has_winner = winner_idxs >= 0
+            res[str(config_hash)] = dict(
+                agents=agents,
+                n_games=len(winner_idxs),
+                n_no_winner=int((~has_winner).sum()),
+                wins=np.bincount(
+                    winner_idxs[has_winner],
+                    minlength=len(agents.split(','))
+                )
+            )
+        return res
+
+    def get_win_rates(self, confidence: float = 0.95) -> dict:
+        """
+        Return win counts, see get_win_counts, with win rates per player
+        index and their exact Clopper-Pearson confidence intervals.
+        """
+        res = self.get_win_counts()
+        for counts in res.values():
+            lower, upper = get_clopper_pearson_interval(
+                counts['wins'], counts['n_games'], confidence
+            )
+            counts.update(
+                win_rate=counts['wins'] / counts['n_games'],
+                lower=lower, upper=upper
+            )
+        return res
+
+
+def get_clopper_pearson_interval(
+    successes: np.ndarray, n_trials: int, confidence: float = 0.95
+):
+    """Return exact binomial confidence interval bounds of success rates."""
+    successes = np.asarray(successes)
+    alpha = 1 - confidence
+    with np.errstate(invalid='ignore'):
+        lower = beta.ppf(alpha / 2, successes, n_trials - successes + 1)
+        upper = beta.ppf(1 - alpha / 2, successes + 1, n_trials - successes)
+    lower = np.where(successes == 0, 0., lower)
+    upper = np.where(successes == n_trials, 1., upper)
+    return lower, upper
+
+
+def _rows_to_columns(rows: Sequence[dict]) -> dict:
+    keys = []
+    for row in rows:
+        keys.extend(key for key in row if key not in keys)
+    columns = {}
+    for key in keys:
+        if key.startswith(METRIC_PREFIX):
+            columns[key] = np.array(
+                [row.get(key, np.nan) for row in rows], dtype=float
+            )
+        elif key == 'seed':
+            columns[key] = np.array(
+                [row[key] for row in rows], dtype=np.uint64
+            )
+        else:
+            columns[key] = np.array([row[key] for row in rows])
+    return columns
+
+
+def _concatenate_shards(shards: Sequence[dict]) -> dict:
+    keys = []
+    for shard in shards:
+        keys.extend(key for key in shard if key not in keys)
+    res = {}
+    for key in keys:
+        parts = []
+        for shard in shards:
+            if key in shard:
+                parts.append(shard[key])
+            else:
+                n_rows = len(next(iter(shard.values())))
+                parts.append(np.full(n_rows, np.nan))
+        res[key] = np.concatenate(parts)
+    return res
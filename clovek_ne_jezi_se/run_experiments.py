@@ -1,64 +1,1196 @@
-from typing import Sequence
+from typing import (
+    Callable, Iterable, Iterator, Sequence, Set, Tuple, Union
+)
 import json
+import os
+import secrets
+import socket
+from contextlib import ExitStack
 from copy import deepcopy
-
+from functools import partial
+from itertools import islice
 from pathlib import Path
+from time import perf_counter
 
 import click
 import mlflow
 
+from clovek_ne_jezi_se import __version__
 from clovek_ne_jezi_se.client import Client
-from clovek_ne_jezi_se.agents import RandomPlayer, FurthestAlongPlayer
+from clovek_ne_jezi_se.agents import AGENTS
+from clovek_ne_jezi_se.observers import GameStatistics
+from clovek_ne_jezi_se.instrumentation import TimingHistogram
+from clovek_ne_jezi_se.tracking import BatchedMlflowLogger
+from clovek_ne_jezi_se.results_store import ResultsStore
+from clovek_ne_jezi_se.checkpoint import ManifestWriter, RunManifest
+from clovek_ne_jezi_se.progress import ProgressTracker
+from clovek_ne_jezi_se.sequential import SequentialStopper
+from clovek_ne_jezi_se.scheduling import (
+    AdaptiveAllocator, get_cost_ordered_chunks, get_game_costs
+)
+from clovek_ne_jezi_se.tournament import (
+    EloRatings, get_lineup_config, get_lineups, iter_round_robin_rounds,
+    sort_round_results
+)
+from clovek_ne_jezi_se.seeding import (
+    derive_seeds, get_config_hash, get_run_seed
+)
+from clovek_ne_jezi_se.paired import (
+    SEATINGS, get_paired_win_rates, get_seatings, seat_config
+)
+from clovek_ne_jezi_se.cache import get_cache_key, get_code_version
+from clovek_ne_jezi_se.sweep import count_sweep, expand_sweep, is_sweep_spec
+from clovek_ne_jezi_se.distributed import parse_address, run_worker
+from clovek_ne_jezi_se.execution import get_game_chunks, run_chunks
+
+
+NO_WINNER_IDX = -1
+
+BOARD_KEYS = (
+    'main_board_section_length', 'pieces_per_player', 'number_of_dice_faces'
+)
+
+# Experiment of the throughput of experiment groups, see log_progress
+PROGRESS_EXPERIMENT_NAME = 'progress'
+
+
+def config_default_options(command):
+    """
+    Add options for defaults of optional configuration values to a click
+    command, see set_config_defaults.
+    """
+    options = [
+        click.option(
+            '--max_turns', default=None, type=int,
+            help='Default maximum number of turns per game, if not set in '
+            'config'
+        ),
+        click.option(
+            '--max_seconds', default=None, type=float,
+            help='Default wall-clock budget per game, if not set in config'
+        ),
+        click.option(
+            '--skip_dead_turns', is_flag=True,
+            help='Sample turns of players with all pieces waiting from dice '
+            'alone'
+        ),
+        click.option(
+            '--fallback_agent', default='RandomPlayer',
+            help='Default agent choosing moves for players exceeding their '
+            'decision_timeout, if not set in config'
+        ),
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
 
 
-@click.command()
-@click.option('--config_dir', help='Directory holding experiment configurations')
-def run_experiments(config_dir):
+@click.group()
+def cli():
+    """Run and distribute clovek-ne-jezi-se experiments"""
 
+
+@cli.command('run')
+@click.option(
+    '--config_dir',
+    help='Directory holding experiment configuration json or json-lines '
+    'files, or a single json-lines file'
+)
+@click.option(
+    '--timings_path', default=None,
+    help='If given, record per-turn phase timings and dump them as json here'
+)
+@config_default_options
+@click.option(
+    '--workers', default=1, type=int,
+    help='Number of worker processes to spread games across'
+)
+@click.option(
+    '--serve', default=None,
+    help='Coordinate workers connecting to host:port instead of running '
+    'games locally'
+)
+@click.option(
+    '--local_workers', default=0, type=int,
+    help='Number of workers to start on this host when coordinating'
+)
+@click.option(
+    '--authkey', envvar='CLOVEK_NE_JEZI_SE_AUTHKEY', default=None,
+    help='Shared secret for coordinator and workers, generated and printed '
+    'with --serve if not given'
+)
+@click.option(
+    '--log_mode', type=click.Choice(['per_game', 'batched']),
+    default='per_game',
+    help='Log each game as its own mlflow run, or games of each '
+    'configuration as steps of one parent run in background batches'
+)
+@click.option(
+    '--results_dir', default=None,
+    help='If given, also append results to a columnar results store here'
+)
+@click.option(
+    '--ignore_cache', is_flag=True,
+    help='Play games even if their results are in the results store'
+)
+@click.option(
+    '--stop_likelihood_ratio', default=None, type=float,
+    help='Stop runs of a config once the posterior likelihood ratio of equal '
+    'win rates drops to this threshold'
+)
+@click.option(
+    '--stop_precision', default=None, type=float,
+    help='Stop runs of a config once the posterior standard deviation of all '
+    'win rates drops to this value'
+)
+@click.option(
+    '--min_runs', default=10, type=int,
+    help='Number of runs of a config before it may stop early'
+)
+@click.option(
+    '--check_every', default=20, type=int,
+    help='Maximum number of runs per chunk when stopping early or allocating '
+    'a budget'
+)
+@click.option(
+    '--budget', default=None, type=int,
+    help='If given, allocate this total number of games adaptively to the '
+    'configs with the most uncertain win rates, each at most its n_runs'
+)
+@click.option(
+    '--schedule', type=click.Choice(['in_order', 'cost']), default='in_order',
+    help='Play chunks of runs in config order, or longest first by estimated '
+    'cost to balance workers'
+)
+@click.option(
+    '--pilot_runs', default=0, type=int,
+    help='Number of runs of each config to measure its cost with before '
+    'scheduling by cost, unless measured in the results store'
+)
+@click.option(
+    '--report_seconds', default=10., type=float,
+    help='Minimum seconds between reports of throughput and progress'
+)
+@click.option(
+    '--manifest_path', default=None,
+    help='If given, record finished runs in this manifest file and skip runs '
+    'recorded in it, e.g. to resume an interrupted sweep'
+)
+def run_experiments(
+    config_dir, timings_path, max_turns, max_seconds, skip_dead_turns,
+    fallback_agent, workers, serve, local_workers, authkey, log_mode,
+    results_dir, ignore_cache, stop_likelihood_ratio, stop_precision,
+    min_runs, check_every, budget, schedule, pilot_runs, report_seconds,
+    manifest_path
+):
+    """Run experiments from configuration files in config_dir"""
+    authkey = check_distribution_options(
+        serve, authkey, budget, pilot_runs
+    )
     config_dir = Path(config_dir)
-    click.echo(f'Getting experiment variables from {config_dir}')
-    experiment_group_variables = get_experiment_variables_from_config_dir(config_dir)
+    experiment_group_name = get_experiment_name(config_dir)
+    n_configs = validate_experiment_configs(
+        config_dir, max_turns=max_turns, max_seconds=max_seconds,
+        skip_dead_turns=skip_dead_turns, fallback_agent=fallback_agent
+    )
+    click.echo(f'Validated {n_configs} configurations in {config_dir}')
+    n_workers = max(workers, local_workers) if serve is not None \
+        else workers
+    progress = ProgressTracker(n_workers, report_seconds=report_seconds)
+    timer = TimingHistogram() if timings_path is not None else None
+
+    with ExitStack() as sinks:
+        results_store, cache_keys, manifest = open_stores(
+            sinks, results_dir, ignore_cache, manifest_path
+        )
+        experiment_group_variables = plan_progress(progress, skip_done_runs(
+            deduplicate_experiments(iter_experiment_variables(
+                config_dir, max_turns=max_turns, max_seconds=max_seconds,
+                skip_dead_turns=skip_dead_turns, fallback_agent=fallback_agent
+            )),
+            cache_keys, manifest
+        ))
+        result_callback, chunk_callback = get_result_callbacks(
+            sinks, experiment_group_name, log_mode, progress, results_store,
+            manifest
+        )
+        result_callback, skip_chunk = get_stopping_callbacks(
+            result_callback, stop_likelihood_ratio, stop_precision, min_runs
+        )
+        run = partial(
+            run_chunks, work_function=run_games, workers=workers,
+            address=parse_address(serve) if serve is not None else None,
+            local_workers=local_workers, authkey=authkey.encode(),
+            timer=timer, chunk_callback=chunk_callback, skip_chunk=skip_chunk
+        )
+        chunks, result_callback = schedule_chunks(
+            experiment_group_variables, result_callback, run, schedule,
+            n_workers=n_workers, record_timings=timer is not None,
+            skip_chunk=skip_chunk, budget=budget, check_every=check_every,
+            min_runs=min_runs, results_store=results_store,
+            pilot_runs=pilot_runs
+        )
+        click.echo(f'Running experiments {experiment_group_name}')
+        run(chunks, result_callback)
+
+    click.echo(progress.get_report())
+    log_progress(progress, experiment_group_name)
+
+    if timer is not None:
+        click.echo(f'Writing timings to {timings_path}')
+        timer.dump(timings_path)
+
+
+def check_distribution_options(
+    serve: Union[str, None], authkey: Union[str, None],
+    budget: Union[int, None], pilot_runs: int
+) -> str:
+    """
+    Raise a click.UsageError for options not supported with serve, and
+    return the authkey, generated and printed if serving without one.
+    """
+    if serve is None:
+        return authkey or ''
+    if budget is not None:
+        raise click.UsageError(
+            '--budget allocates games as workers free up, and is not '
+            'supported with --serve'
+        )
+    if pilot_runs > 0:
+        raise click.UsageError(
+            '--pilot_runs are played before coordinating workers for the '
+            'other runs, and are not supported with --serve'
+        )
+    if authkey is None:
+        authkey = secrets.token_hex(16)
+        click.echo(f'Workers must connect with --authkey={authkey}')
+    return authkey
+
+
+def open_stores(
+    sinks: 'ExitStack', results_dir: Union[str, None], ignore_cache: bool,
+    manifest_path: Union[str, None]
+) -> Tuple[
+    Union['ResultsStore', None], Union[Set[str], None],
+    Union['RunManifest', None]
+]:
+    """
+    Open results store, with cache keys of its results unless ignore_cache,
+    and run manifest if their paths are given, to be closed with sinks.
+    """
+    results_store = cache_keys = manifest = None
+    if results_dir is not None:
+        results_store = sinks.enter_context(ResultsStore(results_dir))
+        if not ignore_cache:
+            cache_keys = results_store.get_cache_keys()
+    if manifest_path is not None:
+        manifest = sinks.enter_context(RunManifest(manifest_path))
+        click.echo(
+            f'Skipping {len(manifest)} finished runs in {manifest_path}'
+        )
+    return results_store, cache_keys, manifest
 
-    experiment_group_name = config_dir.name
+
+def skip_done_runs(
+    experiment_group_variables: Iterable[dict],
+    cache_keys: Union[Set[str], None], manifest: Union['RunManifest', None]
+) -> Iterator[dict]:
+    """
+    Skip runs whose results are cached or recorded in manifest, if given.
+    """
+    if cache_keys is not None:
+        experiment_group_variables = skip_cached_runs(
+            experiment_group_variables, cache_keys
+        )
+    if manifest is not None:
+        experiment_group_variables = skip_runs(
+            experiment_group_variables, manifest.is_done
+        )
+    return experiment_group_variables
+
+
+def get_result_callbacks(
+    sinks: 'ExitStack', experiment_group_name: str, log_mode: str,
+    progress: 'ProgressTracker', results_store: Union['ResultsStore', None],
+    manifest: Union['RunManifest', None]
+) -> Tuple[
+    Callable[[dict, dict], None],
+    Union[Callable[[Tuple, Sequence[dict]], None], None]
+]:
+    """
+    Return result callback logging results to mlflow per log_mode, storing
+    them in results store if given and updating progress, and chunk
+    callback recording finished runs in manifest if given. Batched logger
+    and manifest writer are closed with sinks.
+    """
     mlflow.set_experiment(experiment_group_name)
-    click.echo(f'Running experiments {experiment_group_name}')
+    batched_logger = None
+    if log_mode == 'batched':
+        batched_logger = sinks.enter_context(BatchedMlflowLogger(
+            mlflow.get_experiment_by_name(experiment_group_name).experiment_id
+        ))
+        result_callback = partial(log_result_batched, batched_logger)
+    else:
+        result_callback = log_result
+    if results_store is not None:
+        result_callback = partial(
+            store_result, results_store, result_callback
+        )
+    result_callback = partial(update_progress, progress, result_callback)
+
+    if manifest is None:
+        return result_callback, None
+    manifest_writer = ManifestWriter(manifest, before_record=[
+        sink.flush for sink in (results_store, batched_logger)
+        if sink is not None
+    ])
+    # Closed first, so runs are recorded before their sinks are closed
+    sinks.callback(manifest_writer.flush)
+    return result_callback, partial(record_finished_chunk, manifest_writer)
+
+
+def get_stopping_callbacks(
+    result_callback: Callable[[dict, dict], None],
+    stop_likelihood_ratio: Union[float, None],
+    stop_precision: Union[float, None], min_runs: int
+) -> Tuple[
+    Callable[[dict, dict], None], Union[Callable[[Tuple], bool], None]
+]:
+    """
+    Return result callback updating a SequentialStopper and skip_chunk
+    function of stopped experiments if a stopping rule is given, else
+    result_callback and None.
+    """
+    if stop_likelihood_ratio is None and stop_precision is None:
+        return result_callback, None
+    stopper = SequentialStopper(
+        likelihood_ratio_threshold=stop_likelihood_ratio,
+        precision=stop_precision, min_games=min_runs
+    )
+    return (
+        partial(update_stopper, stopper, result_callback),
+        partial(is_chunk_stopped, stopper)
+    )
+
+
+def schedule_chunks(
+    experiment_group_variables: Iterable[dict],
+    result_callback: Callable[[dict, dict], None], run: Callable,
+    schedule: str, n_workers: int, record_timings: bool,
+    skip_chunk: Union[Callable[[Tuple], bool], None], budget: Union[
+        int, None
+    ], check_every: int, min_runs: int,
+    results_store: Union['ResultsStore', None], pilot_runs: int
+) -> Tuple[Iterable[Tuple], Callable[[dict, dict], None]]:
+    """
+    Return chunks of runs of experiments allocated adaptively within budget
+    if given, see scheduling.AdaptiveAllocator, else in order of schedule,
+    see schedule_by_cost, and the result callback to play them with. With
+    early stopping, see skip_chunk, chunks hold at most check_every runs.
+    """
+    if budget is not None:
+        allocator = AdaptiveAllocator(
+            list(experiment_group_variables), budget,
+            chunk_size=check_every, min_runs=min_runs
+        )
+        return (
+            allocator.iter_chunks(record_timings, skip_chunk),
+            partial(update_allocator, allocator, result_callback)
+        )
+    if schedule == 'cost':
+        chunks = schedule_by_cost(
+            list(experiment_group_variables), n_workers, record_timings,
+            results_store, pilot_runs, run, result_callback
+        )
+        if skip_chunk is not None:
+            chunks = (chunk for chunk in chunks if not skip_chunk(chunk))
+        return chunks, result_callback
+    return get_game_chunks(
+        experiment_group_variables, n_workers, record_timings,
+        max_chunk_size=check_every if skip_chunk is not None else None,
+        skip_chunk=skip_chunk
+    ), result_callback
+
+
+def schedule_by_cost(
+    experiment_group_variables: Sequence[dict], workers: int,
+    record_timings: bool, results_store: Union['ResultsStore', None],
+    pilot_runs: int, run: Callable,
+    result_callback: Callable[[dict, dict], None]
+) -> Sequence[Tuple]:
+    """
+    Return chunks of runs longest first, see get_cost_ordered_chunks, with
+    seconds per game measured in results_store if given. For other
+    configurations, their first pilot_runs runs are played with run, see
+    run_chunks, to measure them, or else costs are estimated.
+    """
+    seconds_per_game = {}
+    if results_store is not None:
+        seconds_per_game = results_store.get_seconds_per_game()
+
+    pilot_chunks = []
+    remaining_variables = []
+    for variables in experiment_group_variables:
+        config_hash = get_config_hash(variables['config'])
+        run_idxs = variables.get('run_idxs', range(variables['n_runs']))
+        if pilot_runs > 0 and config_hash not in seconds_per_game:
+            pilot_chunks.append((
+                variables['config'], run_idxs[:pilot_runs], record_timings,
+                variables['experiment_name']
+            ))
+            variables = dict(variables, run_idxs=run_idxs[pilot_runs:])
+        remaining_variables.append(variables)
+
+    if pilot_chunks:
+        click.echo(f'Measuring game costs with {len(pilot_chunks)} pilots')
+        pilot_seconds = {}
+
+        def record_seconds(config, result):
+            pilot_seconds.setdefault(result['config_hash'], []).append(
+                result['seconds']
+            )
+            result_callback(config, result)
+
+        run(pilot_chunks, record_seconds)
+        seconds_per_game.update(
+            (config_hash, sum(seconds) / len(seconds))
+            for config_hash, seconds in pilot_seconds.items()
+        )
+
+    return get_cost_ordered_chunks(
+        remaining_variables,
+        get_game_costs(remaining_variables, seconds_per_game), workers,
+        record_timings
+    )
+
+
+def run_paired_games(
+    config: dict, run_idxs: Sequence[int], record_timings: bool = False,
+    experiment_name: str = '', seatings: str = 'rotations'
+) -> Tuple[Sequence[dict], Union['TimingHistogram', None]]:
+    """
+    Play each run of an experiment configuration once per seating of its
+    lineup of agents, see paired.get_seatings, with the same dice rolls in
+    all seatings. Each agent keeps its own random stream across seatings.
+
+    Returns per run the seatings and the lineup index of each winner, or
+    NO_WINNER_IDX, and timings if recorded.
+    """
+    timer = TimingHistogram() if record_timings else None
+    config_hash = get_config_hash(config)
+    seatings = get_seatings(len(config['players']), seatings)
+    initial_clients = [
+        initialize_client(seat_config(config, seating))
+        for seating in seatings
+    ]
+    results = []
+    for run_idx in run_idxs:
+        seed = get_run_seed(experiment_name, config_hash, run_idx)
+        dice_seed, *lineup_seeds = derive_seeds(seed, 1 + len(seatings[0]))
+        winner_lineup_idxs = []
+        for seating, initial_client in zip(seatings, initial_clients):
+            client = deepcopy(initial_client)
+            client.set_stream_seeds(
+                dice_seed, [lineup_seeds[lineup_idx] for lineup_idx in seating]
+            )
+            if timer is not None:
+                client.set_timer(timer)
+            winner_idx = play_game(client)['winner_idx']
+            winner_lineup_idxs.append(
+                NO_WINNER_IDX if winner_idx == NO_WINNER_IDX
+                else seating[winner_idx]
+            )
+        results.append(dict(
+            run_idx=run_idx, seed=seed, config_hash=config_hash,
+            seatings=seatings, winner_lineup_idxs=winner_lineup_idxs
+        ))
+    return results, timer
+
+
+def run_games(
+    config: dict, run_idxs: Sequence[int], record_timings: bool = False,
+    experiment_name: str = ''
+) -> Tuple[Sequence[dict], Union['TimingHistogram', None]]:
+    """
+    Play games with given run indices of an experiment configuration, with
+    the client built once from the configuration. Each game is seeded from
+    experiment name, configuration hash and run index alone, so results do
+    not depend on how runs are split across workers.
+
+    Returns compact results, see play_game, with the host and process of
+    the worker playing them, and timings if recorded.
+    """
+    timer = TimingHistogram() if record_timings else None
+    config_hash = get_config_hash(config)
+    code_version = get_code_version()
+    initial_client = initialize_client(config)
+    worker = f'{socket.gethostname()}:{os.getpid()}'
+    results = []
+    for run_idx in run_idxs:
+        client = deepcopy(initial_client)
+        seed = get_run_seed(experiment_name, config_hash, run_idx)
+        client.set_seed(seed)
+        if timer is not None:
+            client.set_timer(timer)
+        result = play_game(client)
+        result.update(
+            run_idx=run_idx, seed=seed, config_hash=config_hash,
+            cache_key=get_cache_key(config_hash, seed, code_version),
+            worker=worker
+        )
+        results.append(result)
+    return results, timer
+
+
+def play_game(client: 'Client') -> dict:
+    """
+    Play game of initialized client and return result dictionary with
+    winner_idx, n_plays, wall-clock seconds and further metrics.
+    """
+    start = perf_counter()
+    winner, n_plays = client.play()
+    seconds = perf_counter() - start
+
+    if winner is None:
+        winner_idx = NO_WINNER_IDX
+    else:
+        winner_idx = client.players.index(winner)
+
+    metrics = get_game_statistics(client).to_metrics()
+    metrics.update(get_timeout_metrics(client))
+    return dict(
+        winner_idx=winner_idx, n_plays=n_plays, seconds=seconds,
+        metrics=metrics
+    )
+
+
+def get_run_params(config: dict) -> dict:
+    """Return parameters to log for runs of an experiment configuration."""
+    return dict(
+        agents=','.join(player['agent'] for player in config['players']),
+        **config['board']
+    )
+
+
+def echo_result(config: dict, result: dict):
+    """Print winner of game result."""
+    if result['winner_idx'] == NO_WINNER_IDX:
+        click.echo(
+            f'Run {result["run_idx"]}: no winner after '
+            f'{result["n_plays"]} plays'
+        )
+    else:
+        winner = config['players'][result['winner_idx']]['name']
+        click.echo(f'Run {result["run_idx"]}: winner of round is {winner}')
+
+
+def log_result_batched(
+    batched_logger: 'BatchedMlflowLogger', config: dict, result: dict
+):
+    """Log game result as step of the parent mlflow run of its config."""
+    echo_result(config, result)
+    batched_logger.log_result(result, get_run_params(config))
+
+
+def update_stopper(
+    stopper: 'SequentialStopper',
+    result_callback: Callable[[dict, dict], None], config: dict, result: dict
+):
+    """
+    Pass game result on to callback and add it to the stopping rule of its
+    configuration. Results of chunks already running when the configuration
+    stops are kept.
+    """
+    result_callback(config, result)
+    reason = stopper.update(config, result)
+    if reason is not None:
+        click.echo(
+            f'Stopping config {result["config_hash"][:12]} after '
+            f'{stopper.get_n_games(result["config_hash"])} games: {reason}'
+        )
+
+
+def update_allocator(
+    allocator: 'AdaptiveAllocator',
+    result_callback: Callable[[dict, dict], None], config: dict, result: dict
+):
+    """Pass game result on to callback and add it to allocator."""
+    result_callback(config, result)
+    allocator.update(config, result)
+
+
+def is_chunk_stopped(stopper: 'SequentialStopper', chunk: Tuple) -> bool:
+    """Return whether the configuration of a run_games chunk was stopped."""
+    return stopper.is_stopped(get_config_hash(chunk[0]))
+
+
+def skip_runs(
+    experiment_group_variables: Iterable[dict],
+    is_done: Callable[[str, str, int], bool]
+) -> Iterator[dict]:
+    """
+    Yield experiment variables with run_idxs of runs for which
+    is_done(experiment_name, config_hash, run_idx) is false, skipping
+    experiments without such runs.
+    """
     for experiment_variables in experiment_group_variables:
+        experiment_name = experiment_variables['experiment_name']
+        config_hash = get_config_hash(experiment_variables['config'])
+        run_idxs = [
+            run_idx
+            for run_idx in experiment_variables.get(
+                'run_idxs', range(experiment_variables['n_runs'])
+            )
+            if not is_done(experiment_name, config_hash, run_idx)
+        ]
+        if run_idxs:
+            yield dict(experiment_variables, run_idxs=run_idxs)
+
+
+def skip_cached_runs(
+    experiment_group_variables: Iterable[dict], cache_keys: Set[str]
+) -> Iterator[dict]:
+    """
+    Skip runs with results of the same configuration, seed and code version
+    in cache_keys, see cache.get_cache_key.
+    """
+    code_version = get_code_version()
+
+    def is_cached(experiment_name, config_hash, run_idx):
+        seed = get_run_seed(experiment_name, config_hash, run_idx)
+        return get_cache_key(config_hash, seed, code_version) in cache_keys
 
+    return skip_runs(experiment_group_variables, is_cached)
+
+
+def deduplicate_experiments(
+    experiment_group_variables: Iterable[dict]
+) -> Iterator[dict]:
+    """
+    Yield experiment variables of configurations differing in more than
+    n_runs only once. Repeated configurations with more runs yield only the
+    runs in addition to those already yielded.
+    """
+    n_runs_seen = {}
+    for experiment_variables in experiment_group_variables:
+        config_hash = get_config_hash(experiment_variables['config'])
+        n_seen = n_runs_seen.get(config_hash)
         n_runs = experiment_variables['n_runs']
-        for idx in range(n_runs):
-            click.echo(f'Running experiment {idx} of {n_runs}')
-            with mlflow.start_run():
-                client = deepcopy(experiment_variables['client'])
-                agent_names = [player.__class__.__name__ for player in client.players]
-                run_dict = dict(
-                    agents=','.join(agent_names),
-                    main_board_section_length=client.main_board_section_length,
-                    pieces_per_player=client.pieces_per_player,
-                    number_of_dice_faces=client.number_of_dice_faces
-                )
-
-                mlflow.log_params(run_dict)
-
-                winner, n_plays = client.play()
-
-                winner_idx = client.players.index(winner)
-                print(f'Winner of round is {winner}')
-                mlflow.log_metric('winner_idx', winner_idx)
-                mlflow.log_metric('n_plays', n_plays)
-
-def get_experiment_variables_from_config_dir(config_dir) -> Sequence[dict]:
-    """Get experiment variables from files in config_dir"""
-    res = []
-    if not isinstance(config_dir, Path):
-        config_dir = Path(config_dir)
-    for fp in config_dir.iterdir():
-        config = parse_config_file(fp)
-        client = initialize_client(config)
+        if n_seen is None:
+            n_runs_seen[config_hash] = n_runs
+            yield experiment_variables
+        elif n_runs > n_seen:
+            n_runs_seen[config_hash] = n_runs
+            yield dict(experiment_variables, run_idxs=range(n_seen, n_runs))
+
+
+def record_finished_chunk(
+    manifest_writer: 'ManifestWriter', chunk: Tuple, results: Sequence[dict]
+):
+    """
+    Add runs of a chunk to be recorded as finished by the manifest writer,
+    which writes their results out before recording them.
+    """
+    experiment_name = chunk[3]
+    manifest_writer.add(
+        (experiment_name, result['config_hash'], result['run_idx'])
+        for result in results
+    )
+
+
+def store_result(
+    results_store: 'ResultsStore',
+    result_callback: Callable[[dict, dict], None], config: dict, result: dict
+):
+    """Append game result to results store and pass it on to callback."""
+    results_store.append(config, result)
+    result_callback(config, result)
+
+
+def update_progress(
+    progress: 'ProgressTracker',
+    result_callback: Callable[[dict, dict], None], config: dict, result: dict
+):
+    """Pass game result on to callback and report progress when due."""
+    result_callback(config, result)
+    if progress.update(result):
+        click.echo(progress.get_report())
+
+
+def plan_progress(
+    progress: 'ProgressTracker', experiment_group_variables: Iterable[dict]
+) -> Iterator[dict]:
+    """
+    Yield experiment variables, adding their runs to the games planned in
+    progress as they are expanded, and finish planning after the last.
+    """
+    for experiment_variables in experiment_group_variables:
+        progress.add_planned(
+            get_config_hash(experiment_variables['config']),
+            len(experiment_variables.get(
+                'run_idxs', range(experiment_variables['n_runs'])
+            ))
+        )
+        yield experiment_variables
+    progress.finish_planning()
+
+
+def log_progress(progress: 'ProgressTracker', experiment_group_name: str):
+    """
+    Log throughput of experiment runs as metrics of an mlflow run named
+    after the experiment group, in the experiment PROGRESS_EXPERIMENT_NAME
+    rather than among the game runs, with the package and code versions to
+    compare releases by.
+    """
+    experiment = mlflow.get_experiment_by_name(PROGRESS_EXPERIMENT_NAME)
+    experiment_id = experiment.experiment_id if experiment is not None \
+        else mlflow.create_experiment(PROGRESS_EXPERIMENT_NAME)
+    with mlflow.start_run(
+        experiment_id=experiment_id, run_name=experiment_group_name
+    ):
+        mlflow.log_params(dict(
+            experiment_name=experiment_group_name, version=__version__,
+            code_version=get_code_version(), n_workers=progress.n_workers
+        ))
+        mlflow.log_metrics(progress.get_metrics())
+
+
+def log_result(config: dict, result: dict):
+    """Log game result as its own mlflow run."""
+    echo_result(config, result)
+    with mlflow.start_run():
+        mlflow.log_params(get_run_params(config))
+        mlflow.log_params(dict(
+            run_idx=result['run_idx'], seed=result['seed'],
+            config_hash=result['config_hash']
+        ))
+        mlflow.log_metric('winner_idx', result['winner_idx'])
+        mlflow.log_metric('n_plays', result['n_plays'])
+        mlflow.log_metrics(result['metrics'])
+
+
+@cli.command('replay-run')
+@click.option('--config_path', help='Experiment configuration file of run')
+@click.option(
+    '--config_idx', default=0, type=int,
+    help='Line of configuration in a json-lines configuration file, or index '
+    'of configuration in the expansion of a sweep specification'
+)
+@click.option('--run_idx', type=int, help='Index of run to replay')
+@click.option(
+    '--experiment_name', default=None,
+    help='Experiment name of run, by default the name of the config directory '
+    'of a json file, or of a sweep specification without suffix. Required '
+    'for json-lines files, whose runs are seeded with the name of their '
+    'config directory, or their own name without suffix if run directly'
+)
+@config_default_options
+def replay_run(
+    config_path, config_idx, run_idx, experiment_name, max_turns,
+    max_seconds, skip_dead_turns, fallback_agent
+):
+    """
+    Re-execute a single run exactly, with the same configuration defaults as
+    the original run command, and print its result.
+    """
+    config_path = Path(config_path)
+    if config_path.suffix == '.jsonl':
+        if experiment_name is None:
+            raise click.UsageError(
+                'Json-lines files need --experiment_name, the name of the '
+                'config directory they were run from, or their name without '
+                'suffix if run directly'
+            )
+    elif experiment_name is None:
+        # Sweeps are named after their specification, see the sweep command
+        experiment_name = get_experiment_name(
+            config_path if is_sweep_spec(parse_config_file(config_path))
+            else config_path.parent
+        )
+    config = next(islice(iter_configs(config_path), config_idx, None), None)
+    if config is None:
+        raise click.BadParameter(
+            f'No configuration {config_idx} in {config_path}',
+            param_hint='--config_idx'
+        )
+    config = set_config_defaults(
+        config, max_turns=max_turns, max_seconds=max_seconds,
+        skip_dead_turns=skip_dead_turns, fallback_agent=fallback_agent
+    )
+    results, _ = run_games(
+        config, [run_idx], experiment_name=experiment_name
+    )
+    click.echo(json.dumps(results[0], indent=2))
+
+
+@cli.command('paired')
+@click.option('--config_path', help='Experiment configuration file of lineup')
+@click.option(
+    '--n_runs', default=None, type=int,
+    help='Number of dice streams, by default n_runs of the configuration'
+)
+@click.option(
+    '--seatings', type=click.Choice(SEATINGS), default='rotations',
+    help='Seatings of the lineup to play each dice stream with'
+)
+@click.option(
+    '--workers', default=1, type=int,
+    help='Number of worker processes to spread games across'
+)
+@click.option(
+    '--experiment_name', default=None,
+    help='Experiment name for seeding, by default the config directory name'
+)
+@config_default_options
+def paired(
+    config_path, n_runs, seatings, workers, experiment_name, max_turns,
+    max_seconds, skip_dead_turns, fallback_agent
+):
+    """
+    Compare the agents of a lineup with common dice across seatings, and
+    print their win rates and paired win rate differences as json.
+    """
+    config_path = Path(config_path)
+    if experiment_name is None:
+        experiment_name = get_experiment_name(config_path.parent)
+    config = set_config_defaults(
+        parse_config_file(config_path), max_turns=max_turns,
+        max_seconds=max_seconds, skip_dead_turns=skip_dead_turns,
+        fallback_agent=fallback_agent
+    )
+    validate_config(config)
+    if n_runs is None:
         n_runs = config['n_runs']
-        res.append(dict(client=client, n_runs=n_runs))
+    experiment_variables = dict(
+        config=config, n_runs=n_runs, experiment_name=experiment_name
+    )
+
+    results = []
+    chunks = [
+        chunk + (seatings,)
+        for chunk in get_game_chunks([experiment_variables], workers, False)
+    ]
+
+    def collect(_, result):
+        results.append(result)
+
+    run_chunks(chunks, collect, run_paired_games, workers=workers)
+
+    summary = get_paired_win_rates(
+        sorted(results, key=lambda result: result['run_idx']),
+        len(config['players'])
+    )
+    summary['agents'] = [player['agent'] for player in config['players']]
+    click.echo(json.dumps(summary, indent=2))
+
+
+@cli.command('tournament')
+@click.option(
+    '--agents', default='RandomPlayer,FurthestAlongPlayer',
+    help='Comma-separated names of agent classes in the agents module'
+)
+@click.option(
+    '--n_players', default=2, type=int, help='Number of players per game'
+)
+@click.option(
+    '--n_runs', default=100, type=int,
+    help='Maximum number of games per seating of agents'
+)
+@click.option('--main_board_section_length', default=4, type=int)
+@click.option('--pieces_per_player', default=4, type=int)
+@click.option('--number_of_dice_faces', default=6, type=int)
+@click.option(
+    '--workers', default=1, type=int,
+    help='Number of worker processes to spread games across'
+)
+@click.option(
+    '--min_games', default=20, type=int,
+    help='Number of games of each agent before games of a seating may be '
+    'skipped'
+)
+@click.option(
+    '--check_every', default=10, type=int,
+    help='Number of games per seating between ranking checks'
+)
+@click.option('--k_factor', default=16., type=float, help='Elo K-factor')
+@config_default_options
+def tournament(
+    agents, n_players, n_runs, main_board_section_length, pieces_per_player,
+    number_of_dice_faces, workers, min_games, check_every, k_factor,
+    max_turns, max_seconds, skip_dead_turns, fallback_agent
+):
+    """
+    Play all seatings of agents round-robin with Elo ratings updated after
+    each round of games, in run and seating order so ratings do not depend
+    on how games are spread over workers, skipping games of seatings that
+    cannot change the ranking, and print the final ratings as json.
+    """
+    agents = agents.split(',')
+    for agent in agents:
+        get_agent_class(agent)
+    board = dict(
+        main_board_section_length=main_board_section_length,
+        pieces_per_player=pieces_per_player,
+        number_of_dice_faces=number_of_dice_faces
+    )
+    experiment_group_variables = []
+    for lineup in get_lineups(agents, n_players):
+        config = set_config_defaults(
+            get_lineup_config(lineup, board, n_runs), max_turns=max_turns,
+            max_seconds=max_seconds, skip_dead_turns=skip_dead_turns,
+            fallback_agent=fallback_agent
+        )
+        validate_config(config)
+        experiment_group_variables.append(dict(
+            config=config, n_runs=n_runs, experiment_name='tournament'
+        ))
+
+    ratings = EloRatings(agents, k_factor=k_factor)
+    n_skipped = []
+
+    def update_ratings(config, result):
+        lineup = [player['agent'] for player in config['players']]
+        ratings.update(lineup, result['winner_idx'])
+
+    def skip_chunk(chunk):
+        lineup = [player['agent'] for player in chunk[0]['players']]
+        skip = all(
+            ratings.n_games[agent] >= min_games for agent in lineup
+        ) and not ratings.could_change_ranking(lineup, len(chunk[1]))
+        if skip:
+            n_skipped.append(len(chunk[1]))
+        return skip
+
+    seating_idxs = {
+        get_config_hash(variables['config']): seating_idx
+        for seating_idx, variables in enumerate(experiment_group_variables)
+    }
+    for chunks in iter_round_robin_rounds(
+        experiment_group_variables, check_every, skip_chunk
+    ):
+        results = []
+        run_chunks(
+            chunks, lambda config, result: results.append((config, result)),
+            run_games, workers=workers
+        )
+        for config, result in sort_round_results(results, seating_idxs):
+            update_ratings(config, result)
+
+    click.echo(json.dumps(dict(
+        ranking=ratings.get_ranking(), ratings=ratings.ratings,
+        n_games=ratings.n_games, n_skipped_games=sum(n_skipped)
+    ), indent=2))
+
+
+@cli.command('sweep', context_settings=dict(
+    ignore_unknown_options=True, allow_extra_args=True
+))
+@click.option(
+    '--spec_path',
+    help='Json file of sweep specification, see sweep.expand_sweep'
+)
+@click.option(
+    '--count', is_flag=True,
+    help='Only print the number of configurations of the sweep'
+)
+@click.option(
+    '--output_path', default=None,
+    help='Write the configurations of the sweep to this json-lines file '
+    'instead of running them'
+)
+@click.pass_context
+def sweep(ctx, spec_path, count, output_path):
+    """
+    Run experiments of all configurations of a sweep specification, expanded
+    lazily. Further options are passed on to the run command, and the
+    experiment name is the name of the specification file.
+    """
+    spec = parse_config_file(spec_path)
+    if not is_sweep_spec(spec):
+        raise click.BadParameter(
+            'Sweep specification needs lineups', param_hint='--spec_path'
+        )
+    if count:
+        click.echo(count_sweep(spec))
+        return
+    if output_path is not None:
+        with open(output_path, 'w') as fp:
+            for config in expand_sweep(spec):
+                fp.write(json.dumps(config) + '\n')
+        return
+    with run_experiments.make_context(
+        'run', ['--config_dir', spec_path] + ctx.args, parent=ctx.parent
+    ) as run_ctx:
+        run_experiments.invoke(run_ctx)
+
+
+@cli.command('worker')
+@click.option('--address', help='Coordinator host:port to connect to')
+@click.option(
+    '--authkey', envvar='CLOVEK_NE_JEZI_SE_AUTHKEY', required=True,
+    help='Shared secret for coordinator and workers'
+)
+def worker(address, authkey):
+    """Play games handed out by a coordinating run command"""
+    click.echo(f'Working for coordinator at {address}')
+    run_worker(parse_address(address), authkey.encode(), run_games)
+
+
+def get_experiment_variables_from_config_dir(
+    config_dir, max_turns=None, max_seconds=None, skip_dead_turns=False,
+    fallback_agent='RandomPlayer'
+) -> Sequence[dict]:
+    """
+    Get experiment variables, including initialized clients, from files in
+    config_dir, see iter_experiment_variables.
+    """
+    res = []
+    for experiment_variables in iter_experiment_variables(
+        config_dir, max_turns=max_turns, max_seconds=max_seconds,
+        skip_dead_turns=skip_dead_turns, fallback_agent=fallback_agent
+    ):
+        experiment_variables['client'] = initialize_client(
+            experiment_variables['config']
+        )
+        res.append(experiment_variables)
 
     return res
 
+
+def iter_experiment_variables(
+    config_path, max_turns=None, max_seconds=None, skip_dead_turns=False,
+    fallback_agent='RandomPlayer'
+) -> Iterator[dict]:
+    """
+    Yield validated experiment variables for configurations read lazily from
+    config_path, see iter_configs, with max_turns, max_seconds,
+    skip_dead_turns and fallback_agent as defaults for configurations not
+    setting them. Clients are not built, see initialize_client.
+    """
+    if not isinstance(config_path, Path):
+        config_path = Path(config_path)
+    experiment_name = get_experiment_name(config_path)
+    for config in iter_configs(config_path):
+        config = set_config_defaults(
+            config, max_turns=max_turns, max_seconds=max_seconds,
+            skip_dead_turns=skip_dead_turns, fallback_agent=fallback_agent
+        )
+        validate_config(config)
+        yield dict(
+            config=config, n_runs=config['n_runs'],
+            experiment_name=experiment_name
+        )
+
+
+def validate_experiment_configs(
+    config_path, max_turns=None, max_seconds=None, skip_dead_turns=False,
+    fallback_agent='RandomPlayer'
+) -> int:
+    """
+    Validate all configurations read from config_path with defaults, see
+    iter_experiment_variables, before any of their games are played, and
+    return their number. Configurations are read lazily and not kept.
+    """
+    return sum(1 for _ in iter_experiment_variables(
+        config_path, max_turns=max_turns, max_seconds=max_seconds,
+        skip_dead_turns=skip_dead_turns, fallback_agent=fallback_agent
+    ))
+
+
+def get_experiment_name(config_path: Path) -> str:
+    """
+    Return experiment name of a config directory, its full name even if it
+    contains a dot, or of a configuration file, its name without suffix.
+    """
+    config_path = Path(config_path)
+    if config_path.is_dir():
+        return config_path.name
+    return config_path.stem
+
+
+def iter_configs(config_path: Path) -> Iterator[dict]:
+    """
+    Yield experiment configurations of a json-lines file, or of the json and
+    json-lines files in a directory. Json files of sweep specifications are
+    expanded lazily, see sweep.expand_sweep.
+    """
+    if config_path.is_dir():
+        for fp in sorted(config_path.iterdir()):
+            yield from iter_configs(fp)
+    elif config_path.suffix == '.jsonl':
+        with open(config_path, 'r') as fp:
+            for line in fp:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        config = parse_config_file(config_path)
+        if is_sweep_spec(config):
+            yield from expand_sweep(config)
+        else:
+            yield config
+
+
+def validate_config(config: dict):
+    """
+    Check that a client can be initialized from config without building it,
+    raising KeyError for missing and TypeError or ValueError for invalid
+    values.
+    """
+    _check_keys(config, ['players', 'board', 'n_runs'])
+    if not isinstance(config['players'], list) or not config['players']:
+        raise ValueError('Configuration players must be a non-empty list')
+    for player in config['players']:
+        _check_keys(player, ['name', 'agent', 'kwargs'])
+        get_agent_class(player['agent'])
+        if not isinstance(player['kwargs'], dict):
+            raise TypeError(f'Invalid kwargs of player {player["name"]}')
+    get_agent_class(config['fallback_agent'])
+
+    board = config['board']
+    missing_keys = set(BOARD_KEYS) - set(board)
+    unknown_keys = set(board) - set(BOARD_KEYS)
+    if missing_keys or unknown_keys:
+        raise TypeError(
+            f'Board missing {sorted(missing_keys)}, '
+            f'unknown {sorted(unknown_keys)}'
+        )
+    for key in BOARD_KEYS:
+        if not isinstance(board[key], int) or board[key] < 1:
+            raise ValueError(f'Board {key} must be a positive integer')
+
+
+def _check_keys(dictionary: dict, keys: Sequence[str]):
+    for key in keys:
+        if key not in dictionary:
+            raise KeyError(key)
+
+
+def get_agent_class(agent_name: str) -> type:
+    """Return agent class of given name, see agents.AGENTS."""
+    agent = AGENTS.get(agent_name)
+    if agent is None:
+        raise ValueError(
+            f'Unknown agent {agent_name}, must be one of '
+            f'{", ".join(sorted(AGENTS))}'
+        )
+    return agent
+
+
+def set_config_defaults(
+    config: dict, max_turns=None, max_seconds=None, skip_dead_turns=False,
+    fallback_agent='RandomPlayer'
+) -> dict:
+    """
+    Set values of optional configuration keys not given in config, in place,
+    and return config.
+    """
+    config.setdefault('max_turns', max_turns)
+    config.setdefault('max_seconds', max_seconds)
+    config.setdefault('skip_dead_turns', skip_dead_turns)
+    config.setdefault('fallback_agent', fallback_agent)
+    return config
+
+
 def parse_config_file(config_path: Path) -> dict:
     """Return experiment configuration dictionary from file content"""
     with open(config_path, 'r') as fp:
@@ -67,15 +1199,47 @@ def parse_config_file(config_path: Path) -> dict:
 
 
 def initialize_client(config: dict) -> 'Client':
-
+    """
+    Return initialized client from configuration, with optional max_turns
+    and max_seconds game limits, skip_dead_turns simulation mode and
+    fallback_agent for players with a decision_timeout.
+    """
     players = [
-        eval(player['agent'])(name=player['name'], **player['kwargs'])
+        get_agent_class(player['agent'])(
+            name=player['name'], **player['kwargs']
+        )
         for player in config['players']
     ]
 
-    client = Client(players=players, **config['board'])
+    client = Client(
+        players=players, observers=[GameStatistics()],
+        max_turns=config.get('max_turns'),
+        max_seconds=config.get('max_seconds'),
+        skip_dead_turns=config.get('skip_dead_turns', False),
+        fallback_agent=get_agent_class(
+            config.get('fallback_agent', 'RandomPlayer')
+        ),
+        **config['board']
+    )
     client.initialize()
     return client
 
+
+def get_game_statistics(client: 'Client') -> 'GameStatistics':
+    """Return the GameStatistics observer of a client."""
+    for observer in client.observers:
+        if isinstance(observer, GameStatistics):
+            return observer
+    raise ValueError(f'Client {client} has no GameStatistics observer')
+
+
+def get_timeout_metrics(client: 'Client') -> dict:
+    """Return decision timeout counts keyed by n_timeouts_<player index>."""
+    return {
+        f'n_timeouts_{player_idx}': client.timeout_counts[player.name]
+        for player_idx, player in enumerate(client.players)
+    }
+
+
 if __name__ == '__main__':
-    run_experiments()
+    cli()
@@ -0,0 +1,200 @@
+"""Scheduling of games across experiment configurations"""
+from typing import Callable, Iterator, Sequence, Tuple, Union
+from math import sqrt
+
+import attr
+
+from clovek_ne_jezi_se.seeding import get_config_hash
+from clovek_ne_jezi_se.sequential import DirichletStoppingRule
+
+
+@attr.s
+class _ConfigAllocation:
+    """Allocation state of the runs of one experiment configuration."""
+    experiment_variables = attr.ib(type=dict)
+    run_idxs = attr.ib(type=Sequence[int])
+    rule = attr.ib(type=DirichletStoppingRule)
+    n_allocated = attr.ib(default=0, type=int)
+    n_pending = attr.ib(default=0, type=int)
+    is_stopped = attr.ib(default=False, type=bool)
+
+    def has_runs(self) -> bool:
+        return not self.is_stopped and self.n_allocated < len(self.run_idxs)
+
+
+@attr.s
+class AdaptiveAllocator:
+    """
+    Allocate a total budget of games across experiment configurations in
+    chunks, racing-style: each next chunk goes to the configuration whose
+    win rate estimates are most uncertain, measured by the largest posterior
+    standard deviation of its Dirichlet posterior, see
+    sequential.DirichletStoppingRule. Games allocated but not yet finished
+    discount the uncertainty, so parallel workers spread over configurations.
+
+    The runs of a configuration, its n_runs or run_idxs, cap its allocation.
+
+    Parameters
+    ----------
+    experiment_group_variables :
+        Experiment variables of all configurations to allocate games to
+    budget :
+        Total number of games to allocate
+    chunk_size :
+        Number of games allocated at a time
+    min_runs :
+        Number of games of each configuration before allocating by
+        uncertainty
+    """
+    experiment_group_variables = attr.ib(type=Sequence[dict])
+    budget = attr.ib(type=int)
+    chunk_size = attr.ib(default=20, type=int)
+    min_runs = attr.ib(default=10, type=int)
+
+    def __attrs_post_init__(self):
+        self._allocations = {}
+        for experiment_variables in self.experiment_group_variables:
+            config = experiment_variables['config']
+            self._allocations[get_config_hash(config)] = _ConfigAllocation(
+                experiment_variables,
+                experiment_variables.get(
+                    'run_idxs', range(experiment_variables['n_runs'])
+                ),
+                DirichletStoppingRule(len(config['players']))
+            )
+        self.n_allocated = 0
+
+    def get_n_allocated(self, config_hash: str) -> int:
+        """Return number of games allocated to a configuration."""
+        return self._allocations[config_hash].n_allocated
+
+    def update(self, config: dict, result: dict):
+        """Add finished game result of a configuration."""
+        allocation = self._allocations[result['config_hash']]
+        allocation.rule.update(result['winner_idx'])
+        allocation.n_pending -= 1
+
+    def get_priority(self, allocation: '_ConfigAllocation') -> float:
+        """Return priority of allocating games to a configuration."""
+        if allocation.n_allocated < self.min_runs:
+            return float('inf')
+        n_games = allocation.rule.n_games
+        return allocation.rule.get_max_posterior_std() * sqrt(
+            (n_games + 1) / (n_games + allocation.n_pending + 1)
+        )
+
+    def iter_chunks(
+        self, record_timings: bool = False,
+        skip_chunk: Union[Callable[[Tuple], bool], None] = None
+    ) -> Iterator[Tuple[dict, Sequence[int], bool, str]]:
+        """
+        Yield run_games arguments of chunks, each allocated when it is
+        requested, until the budget or all runs are used up. Configurations
+        for which skip_chunk(chunk) is true are not allocated further games.
+        """
+        while self.n_allocated < self.budget:
+            candidates = [
+                allocation for allocation in self._allocations.values()
+                if allocation.has_runs()
+            ]
+            if not candidates:
+                return
+            allocation = max(candidates, key=self.get_priority)
+            size = min(
+                self.chunk_size, self.budget - self.n_allocated,
+                len(allocation.run_idxs) - allocation.n_allocated
+            )
+            experiment_variables = allocation.experiment_variables
+            chunk = (
+                experiment_variables['config'],
+                allocation.run_idxs[
+                    allocation.n_allocated:allocation.n_allocated + size
+                ],
+                record_timings, experiment_variables['experiment_name']
+            )
+            if skip_chunk is not None and skip_chunk(chunk):
+                allocation.is_stopped = True
+                continue
+            allocation.n_allocated += size
+            allocation.n_pending += size
+            self.n_allocated += size
+            yield chunk
+
+
+def get_heuristic_game_cost(config: dict) -> float:
+    """
+    Return relative cost of a game of a configuration, proportional to the
+    number of pieces times the number of squares they move across.
+    """
+    board = config['board']
+    n_players = len(config['players'])
+    n_pieces = n_players * board['pieces_per_player']
+    n_squares = n_players * board['main_board_section_length'] \
+        + board['pieces_per_player']
+    return n_pieces * n_squares / board['number_of_dice_faces']
+
+
+def get_game_costs(
+    experiment_group_variables: Sequence[dict], seconds_per_game: dict
+) -> dict:
+    """
+    Return estimated seconds per game keyed by config hash, measured if in
+    seconds_per_game, e.g. from a pilot or past results, else heuristic costs
+    scaled to the measured ones, see get_heuristic_game_cost.
+    """
+    heuristic_costs = {
+        get_config_hash(variables['config']): get_heuristic_game_cost(
+            variables['config']
+        )
+        for variables in experiment_group_variables
+    }
+    scales = [
+        seconds_per_game[config_hash] / heuristic_cost
+        for config_hash, heuristic_cost in heuristic_costs.items()
+        if config_hash in seconds_per_game
+    ]
+    scale = sum(scales) / len(scales) if scales else 1.
+    return {
+        config_hash: seconds_per_game.get(config_hash, heuristic_cost * scale)
+        for config_hash, heuristic_cost in heuristic_costs.items()
+    }
+
+
+def get_cost_ordered_chunks(
+    experiment_group_variables: Sequence[dict], game_costs: dict,
+    workers: int, record_timings: bool = False, chunks_per_worker: int = 4
+) -> Sequence[Tuple[dict, Sequence[int], bool, str]]:
+    """
+    Return run_games arguments of chunks of all experiments, longest first,
+    so that workers taking chunks in order finish at about the same time.
+    Configurations are split into chunks of at most the total cost divided
+    by workers * chunks_per_worker, given costs per game keyed by config
+    hash, see get_game_costs.
+    """
+    run_idxses = [
+        variables.get('run_idxs', range(variables['n_runs']))
+        for variables in experiment_group_variables
+    ]
+    costs = [
+        game_costs[get_config_hash(variables['config'])]
+        for variables in experiment_group_variables
+    ]
+    total_cost = sum(
+        cost * len(run_idxs) for cost, run_idxs in zip(costs, run_idxses)
+    )
+    max_chunk_cost = total_cost / (workers * chunks_per_worker)
+
+    chunks = []
+    for variables, run_idxs, cost in zip(
+        experiment_group_variables, run_idxses, costs
+    ):
+        chunk_size = max(1, int(max_chunk_cost // cost)) if cost > 0 \
+            else max(1, len(run_idxs))
+        for chunk_start in range(0, len(run_idxs), chunk_size):
+            chunk_idxs = run_idxs[chunk_start:chunk_start + chunk_size]
+            chunks.append((cost * len(chunk_idxs), (
+                variables['config'], chunk_idxs, record_timings,
+                variables['experiment_name']
+            )))
+    chunks.sort(key=lambda cost_chunk: -cost_chunk[0])
+    return [chunk for _, chunk in chunks]
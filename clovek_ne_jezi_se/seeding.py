@@ -0,0 +1,38 @@
+"""Reproducible seeding of games independent of scheduling"""
+from typing import Sequence
+from hashlib import sha256
+import json
+
+import numpy as np
+
+
+def get_config_hash(config: dict) -> str:
+    """
+    Return hash of experiment configuration, ignoring the number of runs so
+    that adding runs does not change the seeds of existing ones.
+    """
+    hashed_config = {
+        key: value for key, value in config.items() if key != 'n_runs'
+    }
+    canonical = json.dumps(hashed_config, sort_keys=True)
+    return sha256(canonical.encode()).hexdigest()
+
+
+def get_run_seed(experiment_name: str, config_hash: str, run_idx: int) -> int:
+    """
+    Return seed of a single game, derived from experiment name, configuration
+    hash and run index alone via numpy SeedSequence spawn keys.
+    """
+    entropy = int(
+        sha256(f'{experiment_name}:{config_hash}'.encode()).hexdigest(), 16
+    )
+    seed_sequence = np.random.SeedSequence(entropy, spawn_key=(run_idx,))
+    return int(seed_sequence.generate_state(1, dtype=np.uint64)[0])
+
+
+def derive_seeds(seed: int, n_seeds: int) -> Sequence[int]:
+    """Return independent child seeds of seed, e.g. for dice and players."""
+    return [
+        int(child.generate_state(1, dtype=np.uint64)[0])
+        for child in np.random.SeedSequence(seed).spawn(n_seeds)
+    ]
@@ -0,0 +1,154 @@
+"""Sequential stopping of experiments on Dirichlet posteriors of win rates"""
+from typing import Sequence, Union
+
+import attr
+import numpy as np
+
+
+@attr.s
+class DirichletStoppingRule:
+    """
+    Stopping rule on the Dirichlet posterior of player win rates, updated
+    with each game, see the evaluate-agents notebook. Games without winner
+    are counted but do not update the posterior.
+
+    A configuration is settled once either the ratio of posterior density at
+    the null win rates to the density at the posterior mode drops to
+    likelihood_ratio_threshold, i.e. the win rates differ from the null, or
+    the largest posterior standard deviation of a win rate drops to
+    precision.
+
+    Parameters
+    ----------
+    n_players :
+        Number of players
+    likelihood_ratio_threshold :
+        Likelihood ratio at or below which the null win rates are rejected
+    precision :
+        Posterior standard deviation of all win rates at or below which the
+        win rates are precise enough
+    prior :
+        Dirichlet prior concentration of each win rate, at least 1
+    min_games :
+        Number of games before the rule may stop
+    null_win_rates :
+        Win rates of null hypothesis, by default equal for all players
+    """
+    n_players = attr.ib(type=int)
+    likelihood_ratio_threshold = attr.ib(
+        default=None, type=Union[float, None]
+    )
+    precision = attr.ib(default=None, type=Union[float, None])
+    prior = attr.ib(default=2., type=float)
+    min_games = attr.ib(default=10, type=int)
+    null_win_rates = attr.ib(default=None, type=Union[Sequence[float], None])
+
+    def __attrs_post_init__(self):
+        if self.prior < 1:
+            raise ValueError('Prior concentration must be at least 1')
+        if self.null_win_rates is None:
+            self.null_win_rates = np.full(self.n_players, 1 / self.n_players)
+        self.null_win_rates = np.asarray(self.null_win_rates, dtype=float)
+        self.counts = np.zeros(self.n_players, dtype=int)
+        self.n_games = 0
+
+    def update(self, winner_idx: int):
+        """Add game result, with negative winner_idx for no winner."""
+        self.n_games += 1
+        if winner_idx >= 0:
+            self.counts[winner_idx] += 1
+
+    def get_posterior(self) -> np.ndarray:
+        """Return Dirichlet posterior concentrations."""
+        return self.prior + self.counts
+
+    def get_log_likelihood_ratio(self) -> float:
+        """
+        Return log of posterior density at null win rates over density at the
+        posterior mode. The normalizing constants cancel.
+        """
+        posterior = self.get_posterior()
+        if self.prior == 1 and not self.counts.any():
+            # Flat density, without mode
+            return 0.
+        mode = (posterior - 1) / (posterior.sum() - self.n_players)
+        exponents = posterior - 1
+        has_mass = exponents > 0
+        with np.errstate(divide='ignore'):
+            return float(np.sum(
+                exponents[has_mass] * (
+                    np.log(self.null_win_rates[has_mass])
+                    - np.log(mode[has_mass])
+                )
+            ))
+
+    def get_max_posterior_std(self) -> float:
+        """Return largest posterior standard deviation of a win rate."""
+        posterior = self.get_posterior()
+        total = posterior.sum()
+        variances = posterior * (total - posterior) \
+            / (total ** 2 * (total + 1))
+        return float(np.sqrt(variances.max()))
+
+    def get_stop_reason(self) -> Union[str, None]:
+        """Return why the rule stops, or None if it does not stop yet."""
+        if self.n_games < self.min_games:
+            return None
+        if self.likelihood_ratio_threshold is not None:
+            log_ratio = self.get_log_likelihood_ratio()
+            if log_ratio <= np.log(self.likelihood_ratio_threshold):
+                return f'likelihood ratio {np.exp(log_ratio):.3g}'
+        if self.precision is not None:
+            std = self.get_max_posterior_std()
+            if std <= self.precision:
+                return f'posterior std {std:.3g}'
+        return None
+
+
+@attr.s
+class SequentialStopper:
+    """
+    Track stopping rules of experiment configurations keyed by config hash,
+    see DirichletStoppingRule for parameters.
+    """
+    likelihood_ratio_threshold = attr.ib(
+        default=None, type=Union[float, None]
+    )
+    precision = attr.ib(default=None, type=Union[float, None])
+    prior = attr.ib(default=2., type=float)
+    min_games = attr.ib(default=10, type=int)
+
+    def __attrs_post_init__(self):
+        self._rules = {}
+        self._stop_reasons = {}
+
+    def update(self, config: dict, result: dict) -> Union[str, None]:
+        """
+        Add game result of configuration, returning the stop reason if its
+        rule stops with this result.
+        """
+        config_hash = result['config_hash']
+        if config_hash in self._stop_reasons:
+            return None
+        rule = self._rules.get(config_hash)
+        if rule is None:
+            rule = self._rules[config_hash] = DirichletStoppingRule(
+                len(config['players']),
+                likelihood_ratio_threshold=self.likelihood_ratio_threshold,
+                precision=self.precision, prior=self.prior,
+                min_games=self.min_games
+            )
+        rule.update(result['winner_idx'])
+        reason = rule.get_stop_reason()
+        if reason is not None:
+            self._stop_reasons[config_hash] = reason
+        return reason
+
+    def is_stopped(self, config_hash: str) -> bool:
+        """Return whether runs of config hash should stop."""
+        return config_hash in self._stop_reasons
+
+    def get_n_games(self, config_hash: str) -> int:
+        """Return number of games added for config hash."""
+        rule = self._rules.get(config_hash)
+        return 0 if rule is None else rule.n_games
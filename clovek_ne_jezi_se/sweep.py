@@ -0,0 +1,81 @@
+"""Lazy expansion of compact sweep specifications into configurations"""
+from typing import Iterator, Sequence, Tuple
+from functools import reduce
+from itertools import product
+import operator
+
+from clovek_ne_jezi_se.paired import get_seatings
+from clovek_ne_jezi_se.tournament import get_lineup_config
+
+
+SWEEP_KEY = 'lineups'
+
+FIXED_SEATING = 'fixed'
+
+
+def is_sweep_spec(config: dict) -> bool:
+    """Return whether a configuration file holds a sweep specification."""
+    return SWEEP_KEY in config
+
+
+def expand_sweep(spec: dict) -> Iterator[dict]:
+    """
+    Yield experiment configurations of a sweep specification one at a time,
+    so that sweeps of millions of configurations are never held in memory
+    or written out.
+
+    A specification is a configuration with lineups instead of players,
+    each a list of agent names, optional seatings of each lineup, one of
+    'fixed' (default), 'rotations' or 'permutations', see
+    paired.get_seatings, and a list of values for any board key to sweep
+    over, e.g.
+
+    {"lineups": [["RandomPlayer", "FurthestAlongPlayer"]],
+     "seatings": "rotations",
+     "board": {"main_board_section_length": [1, 2, 4],
+               "pieces_per_player": [1, 4], "number_of_dice_faces": 6},
+     "n_runs": 100}
+
+    Further keys, e.g. max_turns, are copied to every configuration.
+    """
+    board_keys, board_grids = _get_board_grids(spec['board'])
+    seatings = spec.get('seatings', FIXED_SEATING)
+    extra = {
+        key: value for key, value in spec.items()
+        if key not in (SWEEP_KEY, 'seatings', 'board', 'n_runs')
+    }
+    for lineup in spec[SWEEP_KEY]:
+        seated_lineups = [tuple(lineup)] if seatings == FIXED_SEATING else [
+            tuple(lineup[lineup_idx] for lineup_idx in seating)
+            for seating in get_seatings(len(lineup), seatings)
+        ]
+        for seated_lineup, board_values in product(
+            seated_lineups, product(*board_grids)
+        ):
+            config = get_lineup_config(
+                seated_lineup, dict(zip(board_keys, board_values)),
+                spec['n_runs']
+            )
+            config.update(extra)
+            yield config
+
+
+def count_sweep(spec: dict) -> int:
+    """Return number of configurations of a sweep specification."""
+    _, board_grids = _get_board_grids(spec['board'])
+    seatings = spec.get('seatings', FIXED_SEATING)
+    n_boards = reduce(operator.mul, (len(grid) for grid in board_grids), 1)
+    return sum(
+        n_boards * (1 if seatings == FIXED_SEATING else len(
+            get_seatings(len(lineup), seatings)
+        ))
+        for lineup in spec[SWEEP_KEY]
+    )
+
+
+def _get_board_grids(board: dict) -> Tuple[Sequence[str], Sequence[list]]:
+    keys = list(board)
+    return keys, [
+        board[key] if isinstance(board[key], list) else [board[key]]
+        for key in keys
+    ]
@@ -0,0 +1,153 @@
+"""Round-robin tournaments of agents with incremental Elo ratings"""
+from typing import Callable, Iterator, Sequence, Tuple, Union
+from itertools import permutations
+
+import attr
+
+
+@attr.s
+class EloRatings:
+    """
+    Elo ratings of agents, updated incrementally with each game. A game of
+    several players counts as the winner beating each other player, and
+    games without winner are ignored.
+
+    Parameters
+    ----------
+    agents :
+        Names of rated agents
+    k_factor :
+        Maximum rating change per pairwise comparison
+    initial_rating :
+        Rating of agents before their first game
+    """
+    agents = attr.ib(type=Sequence[str])
+    k_factor = attr.ib(default=16., type=float)
+    initial_rating = attr.ib(default=1500., type=float)
+
+    def __attrs_post_init__(self):
+        self.ratings = {agent: self.initial_rating for agent in self.agents}
+        self.n_games = {agent: 0 for agent in self.agents}
+
+    def get_expected_score(self, agent: str, other: str) -> float:
+        """Return expected score of agent against other agent."""
+        return get_expected_score(self.ratings[agent], self.ratings[other])
+
+    def update(self, lineup: Sequence[str], winner_idx: int):
+        """
+        Update ratings with game result of lineup of agents, with negative
+        winner_idx for no winner.
+        """
+        for agent in lineup:
+            self.n_games[agent] += 1
+        if winner_idx < 0:
+            return
+        self._update_ratings(self.ratings, lineup, winner_idx)
+
+    def _update_ratings(
+        self, ratings: dict, lineup: Sequence[str], winner_idx: int
+    ):
+        winner = lineup[winner_idx]
+        changes = {
+            loser: self.k_factor * (1 - get_expected_score(
+                ratings[winner], ratings[loser]
+            ))
+            for loser in lineup if loser != winner
+        }
+        for loser, change in changes.items():
+            ratings[winner] += change
+            ratings[loser] -= change
+
+    def get_ranking(
+        self, ratings: Union[dict, None] = None
+    ) -> Sequence[str]:
+        """Return agents by decreasing rating."""
+        if ratings is None:
+            ratings = self.ratings
+        return sorted(self.agents, key=lambda agent: -ratings[agent])
+
+    def could_change_ranking(
+        self, lineup: Sequence[str], n_games: int = 1
+    ) -> bool:
+        """
+        Return whether n_games of lineup could change the ranking, assuming
+        the worst case of one agent winning all of them.
+        """
+        ranking = self.get_ranking()
+        for winner_idx in range(len(lineup)):
+            ratings = dict(self.ratings)
+            for _ in range(n_games):
+                self._update_ratings(ratings, lineup, winner_idx)
+            if self.get_ranking(ratings) != ranking:
+                return True
+        return False
+
+
+def get_expected_score(rating: float, other_rating: float) -> float:
+    """Return Elo expected score of a rating against another rating."""
+    return 1 / (1 + 10 ** ((other_rating - rating) / 400))
+
+
+def get_lineups(agents: Sequence[str], n_players: int) -> Sequence[
+    Tuple[str, ...]
+]:
+    """Return all seatings of n_players distinct agents."""
+    if not 1 < n_players <= len(agents):
+        raise ValueError(
+            f'Number of players must be between 2 and {len(agents)}'
+        )
+    return list(permutations(agents, n_players))
+
+
+def get_lineup_config(lineup: Sequence[str], board: dict, n_runs: int) -> dict:
+    """Return experiment configuration of a lineup of agents."""
+    return dict(
+        players=[
+            dict(name=str(seat_idx), agent=agent, kwargs={})
+            for seat_idx, agent in enumerate(lineup)
+        ],
+        board=board, n_runs=n_runs
+    )
+
+
+def iter_round_robin_rounds(
+    experiment_group_variables: Sequence[dict], chunk_size: int,
+    skip_chunk: Union[Callable[[Tuple], bool], None] = None
+) -> Iterator[Sequence[Tuple[dict, range, bool, str]]]:
+    """
+    Yield rounds of run_games arguments, each a chunk of every experiment
+    with runs left, so that ratings of all lineups develop together. Chunks
+    for which skip_chunk(chunk) is true when their round is due are left out,
+    so a round is decided only after the previous one is requested.
+    """
+    max_n_runs = max(
+        variables['n_runs'] for variables in experiment_group_variables
+    )
+    for chunk_start in range(0, max_n_runs, chunk_size):
+        chunks = []
+        for experiment_variables in experiment_group_variables:
+            n_runs = experiment_variables['n_runs']
+            if chunk_start >= n_runs:
+                continue
+            chunk = (
+                experiment_variables['config'],
+                range(chunk_start, min(chunk_start + chunk_size, n_runs)),
+                False, experiment_variables['experiment_name']
+            )
+            if skip_chunk is None or not skip_chunk(chunk):
+                chunks.append(chunk)
+        yield chunks
+
+
+def sort_round_results(
+    results: Sequence[Tuple[dict, dict]], seating_idxs: dict
+) -> Sequence[Tuple[dict, dict]]:
+    """
+    Return (config, result) pairs of a round by run index and seating index,
+    keyed by config hash in seating_idxs, so that ratings updated in this
+    order do not depend on the order in which parallel games finished.
+    """
+    return sorted(results, key=lambda config_result: (
+        config_result[1]['run_idx'],
+        seating_idxs[config_result[1]['config_hash']]
+    ))
@@ -0,0 +1,181 @@
+"""Batched logging of game results to mlflow"""
+from typing import Tuple
+import logging
+import queue
+import threading
+import time
+
+import attr
+from mlflow.entities import Metric, Param
+from mlflow.tracking import MlflowClient
+
+from clovek_ne_jezi_se.log_handler import handler
+
+
+logger = logging.getLogger(__name__)
+logger.addHandler(handler)
+
+
+# Maximum number of metrics per MlflowClient.log_batch call
+MAX_METRICS_PER_BATCH = 1000
+
+
+@attr.s
+class BatchedMlflowLogger:
+    """
+    Log game results with one parent mlflow run per experiment configuration.
+
+    Per-game metrics are logged to the parent run with the run index as
+    step, including the game seed as metrics seed_high and seed_low, see
+    split_seed, and the config hash is logged as parameter, so games can be
+    replayed. They are sent via MlflowClient.log_batch in chunks from a
+    background thread, so playing games does not wait for the tracking
+    backend.
+
+    Parameters
+    ----------
+    experiment_id :
+        Id of mlflow experiment to create parent runs in
+    batch_size :
+        Maximum number of metrics per log_batch call
+    flush_seconds :
+        Maximum time metrics wait in the background thread before being sent
+    """
+    experiment_id = attr.ib(type=str)
+    batch_size = attr.ib(default=MAX_METRICS_PER_BATCH, type=int)
+    flush_seconds = attr.ib(default=5., type=float)
+    client = attr.ib(factory=MlflowClient, repr=False, eq=False)
+
+    def __attrs_post_init__(self):
+        if not 0 < self.batch_size <= MAX_METRICS_PER_BATCH:
+            raise ValueError(
+                f'batch_size must be between 1 and {MAX_METRICS_PER_BATCH}'
+            )
+        self._parent_run_ids = {}
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._send, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def log_result(self, result: dict, params: dict):
+        """
+        Queue metrics of a game result for the parent run of its
+        configuration, creating the parent run with params on first use.
+        """
+        if self._error is not None:
+            raise self._error
+        run_id = self._get_parent_run_id(result['config_hash'], params)
+        timestamp = int(time.time() * 1000)
+        step = result['run_idx']
+        seed_high, seed_low = split_seed(result['seed'])
+        values = dict(
+            winner_idx=result['winner_idx'], n_plays=result['n_plays'],
+            seed_high=seed_high, seed_low=seed_low, **result['metrics']
+        )
+        self._queue.put((run_id, [
+            Metric(key, value, timestamp, step)
+            for key, value in values.items()
+        ]))
+
+    def _get_parent_run_id(self, config_hash: str, params: dict) -> str:
+        run_id = self._parent_run_ids.get(config_hash)
+        if run_id is None:
+            run = self.client.create_run(
+                self.experiment_id,
+                tags={'mlflow.runName': config_hash[:12]}
+            )
+            run_id = self._parent_run_ids[config_hash] = run.info.run_id
+            self.client.log_batch(run_id, params=[
+                Param(key, str(value))
+                for key, value in dict(params, config_hash=config_hash).items()
+            ])
+        return run_id
+
+    def flush(self):
+        """
+        Send all queued metrics, waiting until they are sent, and re-raise
+        any error of the background thread.
+        """
+        sent = threading.Event()
+        self._queue.put(sent)
+        sent.wait()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """
+        Send all queued metrics, terminate parent runs and re-raise any error
+        of the background thread.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        for run_id in self._parent_run_ids.values():
+            self.client.set_terminated(run_id)
+        if self._error is not None:
+            raise self._error
+
+    def _send(self):
+        pending = {}
+        n_pending = 0
+        deadline = None
+        while True:
+            timeout = None if deadline is None \
+                else max(0., deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+
+            if isinstance(item, threading.Event):
+                # Flush requested, flush as on timeout
+                item, sent = (), item
+            else:
+                sent = None
+
+            if item:
+                run_id, metrics = item
+                pending.setdefault(run_id, []).extend(metrics)
+                n_pending += len(metrics)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_seconds
+
+            if item is None or item == () or n_pending >= self.batch_size:
+                self._flush(pending)
+                pending = {}
+                n_pending = 0
+                deadline = None
+            if sent is not None:
+                sent.set()
+            if item is None:
+                return
+
+    def _flush(self, pending: dict):
+        for run_id, metrics in pending.items():
+            for start in range(0, len(metrics), self.batch_size):
+                try:
+                    self.client.log_batch(
+                        run_id, metrics=metrics[start:start + self.batch_size]
+                    )
+                except Exception as error:  # pylint: disable=broad-except
+                    logger.error(f'Failed to log metrics batch: {error}')
+                    self._error = error
+
+
+def split_seed(seed: int) -> Tuple[int, int]:
+    """
+    Return upper and lower 32 bits of a 64 bit seed, each exactly
+    representable as mlflow metric value.
+    """
+    seed = int(seed)
+    return seed >> 32, seed & 0xFFFFFFFF
+
+
+def join_seed(seed_high: int, seed_low: int) -> int:
+    """Return seed from its upper and lower 32 bits, see split_seed."""
+    return (int(seed_high) << 32) | int(seed_low)
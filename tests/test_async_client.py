@@ -0,0 +1,150 @@
+"""Tests for clovek_ne_jezi_se.client.AsyncClient"""
+import asyncio
+import builtins
+import random
+import time
+
+import attr
+
+from clovek_ne_jezi_se.client import AsyncClient, play_concurrently
+from clovek_ne_jezi_se.agents import (
+    AsyncPlayer, AsyncHumanPlayer, Player, RandomPlayer
+)
+
+
+@attr.s
+class QueuePlayer(AsyncPlayer):
+    """
+    Asynchronous player sending decisions to a queue and awaiting the answer,
+    as for a remote agent or inference queue.
+    """
+    queue = attr.ib(kw_only=True, default=None, eq=False)
+
+    async def choose_move_idx(self, game_state, allowed_moves):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((allowed_moves, future))
+        return await future
+
+
+async def answer_queue(queue, max_batch_sizes):
+    """Answer all queued decisions with the first move, recording batch sizes"""
+    while True:
+        decisions = [await queue.get()]
+        while not queue.empty():
+            decisions.append(queue.get_nowait())
+        max_batch_sizes.append(len(decisions))
+        for _, future in decisions:
+            future.set_result(0)
+
+
+def make_client(players):
+    client = AsyncClient(
+        players=players, main_board_section_length=1, pieces_per_player=1,
+        number_of_dice_faces=6
+    )
+    client.initialize()
+    return client
+
+
+def test_play_concurrently():
+    random.seed(4)
+    n_games = 10
+
+    async def main():
+        queue = asyncio.Queue()
+        batch_sizes = []
+        server = asyncio.ensure_future(answer_queue(queue, batch_sizes))
+        clients = [
+            make_client([
+                QueuePlayer(name='red', queue=queue),
+                RandomPlayer(name='blue')
+            ])
+            for _ in range(n_games)
+        ]
+        results = await play_concurrently(clients)
+        server.cancel()
+        return clients, results, batch_sizes
+
+    clients, results, batch_sizes = asyncio.run(main())
+
+    assert len(results) == n_games
+    for client, (winner, play_count) in zip(clients, results):
+        assert winner is client.winner
+        assert winner is not None
+        assert play_count == client.play_count
+    # Games wait on the queue concurrently
+    assert max(batch_sizes) > 1
+
+
+def test_async_human_player(monkeypatch):
+    monkeypatch.setattr(builtins, 'input', lambda x: '0')
+    client = make_client([
+        AsyncHumanPlayer(name='red', print_game_state=False),
+        RandomPlayer(name='blue')
+    ])
+    roll_values = iter([6, 1])
+    monkeypatch.setattr(client, 'roll', lambda: next(roll_values))
+
+    asyncio.run(client.take_turn())
+
+    waiting = client.get_game_state().waiting_areas_to_dict()
+    assert 'red' not in waiting['red']
+
+
+@attr.s
+class StuckPlayer(AsyncPlayer):
+    """Asynchronous player never answering"""
+    async def choose_move_idx(self, game_state, allowed_moves):
+        await asyncio.sleep(10)
+        return 0
+
+
+def test_async_decision_timeout(monkeypatch):
+    client = make_client([
+        StuckPlayer(name='red', decision_timeout=0.01),
+        RandomPlayer(name='blue')
+    ])
+    roll_values = iter([6, 1])
+    monkeypatch.setattr(client, 'roll', lambda: next(roll_values))
+
+    asyncio.run(client.take_turn())
+
+    assert client.timeout_counts == dict(red=2, blue=0)
+
+
+@attr.s
+class SlowSyncPlayer(Player):
+    """Synchronous player blocking longer than its decision timeout"""
+    def choose_move_idx(self, game_state, allowed_moves):
+        time.sleep(1)
+        return 0
+
+
+def test_async_decision_timeout_sync_agent(monkeypatch):
+    client = make_client([
+        SlowSyncPlayer(name='red', decision_timeout=0.01),
+        RandomPlayer(name='blue')
+    ])
+    roll_values = iter([6, 1])
+    monkeypatch.setattr(client, 'roll', lambda: next(roll_values))
+
+    async def main():
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0.001)
+
+        ticker = asyncio.ensure_future(tick())
+        await client.take_turn()
+        ticker.cancel()
+        return ticks
+
+    start = time.monotonic()
+    ticks = asyncio.run(main())
+
+    assert client.timeout_counts == dict(red=2, blue=0)
+    # The event loop kept running while the agent blocked
+    assert len(ticks) > 2
+    assert time.monotonic() - start < 1
@@ -0,0 +1,172 @@
+"""Tests for the end-to-end throughput benchmark"""
+from copy import deepcopy
+import math
+
+import pytest
+
+from clovek_ne_jezi_se.benchmarking import (
+    ENGINE_PATHS, TOTAL_KEY, check_regression, count_calls,
+    fit_scaling_exponents, format_scaling_report, get_changed_games,
+    get_throughput, measure_engine_paths, run_scaling_benchmark,
+    run_throughput_benchmark
+)
+
+
+tiny_board = dict(
+    main_board_section_length=1, pieces_per_player=1, number_of_dice_faces=6
+)
+
+
+def test_run_throughput_benchmark():
+    result = run_throughput_benchmark(
+        n_players=2, board=tiny_board, n_games=3, count_turns=5, repeats=2
+    )
+    assert result['python_version'].count('.') == 1
+    assert set(result['throughput']) == {
+        'RandomPlayer', 'FurthestAlongPlayer', TOTAL_KEY
+    }
+    assert set(result['work']) == {'RandomPlayer', 'FurthestAlongPlayer'}
+    total = result['throughput'][TOTAL_KEY]
+    assert total['n_games'] == 6
+    assert total['games_per_second'] > 0
+    assert total['turns_per_second'] > total['games_per_second']
+
+    repeated = run_throughput_benchmark(
+        n_players=2, board=tiny_board, n_games=3, count_turns=5, repeats=2
+    )
+    assert get_changed_games(repeated, result) == []
+    # Work counts are deterministic, unlike durations
+    assert repeated['work'] == result['work']
+    assert check_regression(
+        repeated, result, tolerance=0., throughput_tolerance=1.
+    ) == []
+
+
+def test_get_throughput():
+    assert get_throughput(2, 50, 0.5) == dict(
+        n_games=2, n_plays=50, seconds=0.5, games_per_second=4.,
+        turns_per_second=100.
+    )
+    assert get_throughput(0, 0, 0.)['games_per_second'] == 0.
+
+
+def test_count_calls():
+    def recurse(depth):
+        return depth if depth == 0 else recurse(depth - 1)
+
+    res, n_calls = count_calls(lambda: recurse(3))
+    assert res == 0
+    assert n_calls - count_calls(lambda: recurse(0))[1] == 3
+
+
+def get_result(calls_per_turn, n_plays=100, games_per_second=10.):
+    return dict(
+        board=tiny_board, n_players=2, n_games=4, seed=0, count_turns=5,
+        repeats=3, python_version='3.9',
+        throughput={TOTAL_KEY: dict(
+            n_plays=n_plays, games_per_second=games_per_second
+        )},
+        work=dict(RandomPlayer=dict(calls_per_turn=calls_per_turn))
+    )
+
+
+def test_check_regression():
+    baseline = get_result(1000.)
+    assert check_regression(get_result(1005.), baseline) == []
+    assert check_regression(get_result(800.), baseline) == []
+    messages = check_regression(get_result(1020.), baseline)
+    assert len(messages) == 1
+    assert 'calls_per_turn' in messages[0]
+    assert check_regression(get_result(1020.), baseline, 0.05) == []
+
+    other_python = deepcopy(baseline)
+    other_python['python_version'] = '3.8'
+    with pytest.raises(ValueError):
+        check_regression(other_python, baseline)
+
+    other_seed = deepcopy(baseline)
+    other_seed['seed'] = 1
+    with pytest.raises(ValueError):
+        check_regression(other_seed, baseline)
+
+
+def test_check_regression_throughput():
+    baseline = get_result(1000.)
+    assert check_regression(
+        get_result(1000., games_per_second=6.), baseline
+    ) == []
+    messages = check_regression(
+        get_result(1000., games_per_second=4.), baseline
+    )
+    assert len(messages) == 1
+    assert 'games_per_second' in messages[0]
+    assert check_regression(
+        get_result(1000., games_per_second=4.), baseline,
+        throughput_tolerance=0.7
+    ) == []
+    # Throughputs of changed games are not compared
+    assert check_regression(
+        get_result(1000., n_plays=101, games_per_second=4.), baseline
+    ) == []
+
+
+def test_get_changed_games():
+    baseline = get_result(1000.)
+    assert get_changed_games(get_result(1000., n_plays=101), baseline) == [
+        TOTAL_KEY
+    ]
+
+
+def test_measure_engine_paths():
+    point = measure_engine_paths(
+        main_board_section_length=2, n_players=2, pieces_per_player=1,
+        n_turns=3, repeats=1
+    )
+    assert point['parameters']['n_plays'] == 3
+    assert set(point['seconds']) == set(ENGINE_PATHS)
+    assert point['seconds']['initialize'] > 0
+    assert point['seconds']['get_player_moves'] > 0
+    assert point['peak_bytes']['initialize'] > 0
+
+
+def get_point(section_length, seconds, peak_bytes):
+    return dict(
+        parameters=dict(main_board_section_length=section_length),
+        seconds={path: seconds for path in ENGINE_PATHS},
+        peak_bytes=dict(initialize=peak_bytes, turns=peak_bytes)
+    )
+
+
+def test_fit_scaling_exponents():
+    points = [
+        get_point(section_length, 1e-3 * section_length ** 2, section_length)
+        for section_length in [4, 16, 64]
+    ]
+    points[0]['seconds']['do'] = float('nan')
+    exponents = fit_scaling_exponents(points, 'main_board_section_length')
+    assert exponents['turn'] == pytest.approx(2.)
+    assert exponents['do'] == pytest.approx(2.)
+    assert exponents['peak_bytes.initialize'] == pytest.approx(1.)
+
+    exponents = fit_scaling_exponents(
+        points[:1], 'main_board_section_length'
+    )
+    assert math.isnan(exponents['turn'])
+
+
+def test_run_scaling_benchmark():
+    result = run_scaling_benchmark(
+        dict(main_board_section_length=[1, 2], n_players=[2]),
+        dict(main_board_section_length=1, n_players=2, pieces_per_player=1),
+        n_turns=2, repeats=1
+    )
+    sweeps = result['sweeps']
+    assert len(sweeps['main_board_section_length']['points']) == 2
+    assert len(sweeps['pieces_per_player']['points']) == 0
+    assert not math.isnan(
+        sweeps['main_board_section_length']['exponents']['initialize']
+    )
+
+    report = format_scaling_report(result)
+    assert 'main_board_section_length (others at n_players=2' in report
+    assert 'exponent' in report
@@ -0,0 +1,26 @@
+"""Tests for content-addressed result keys"""
+from pathlib import Path
+
+import clovek_ne_jezi_se
+from clovek_ne_jezi_se.cache import (
+    GAME_MODULES, get_cache_key, get_code_version
+)
+
+
+def test_get_code_version():
+    assert get_code_version() == get_code_version()
+    assert len(get_code_version()) == 16
+
+
+def test_game_modules_exist():
+    package_dir = Path(clovek_ne_jezi_se.__file__).parent
+    for module in GAME_MODULES:
+        assert (package_dir / f'{module}.py').is_file()
+
+
+def test_get_cache_key():
+    key = get_cache_key('aaa', 1, 'v1')
+    assert key == get_cache_key('aaa', 1, 'v1')
+    assert key != get_cache_key('aab', 1, 'v1')
+    assert key != get_cache_key('aaa', 2, 'v1')
+    assert key != get_cache_key('aaa', 1, 'v2')
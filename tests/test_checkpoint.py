@@ -0,0 +1,54 @@
+"""Tests for the run manifest"""
+from clovek_ne_jezi_se.checkpoint import ManifestWriter, RunManifest
+
+
+def test_run_manifest(tmpdir):
+    path = tmpdir / 'sweep' / 'manifest.jsonl'
+    with RunManifest(path) as manifest:
+        assert len(manifest) == 0
+        manifest.record([('a', 'aaa', 0), ('a', 'aaa', 1)])
+        manifest.record([('a', 'bbb', 0)])
+        assert manifest.is_done('a', 'aaa', 1)
+        assert not manifest.is_done('b', 'aaa', 1)
+
+    with RunManifest(path) as manifest:
+        assert len(manifest) == 3
+        assert manifest.is_done('a', 'bbb', 0)
+        assert not manifest.is_done('a', 'bbb', 1)
+
+
+def test_run_manifest_partial_line(tmpdir):
+    path = tmpdir / 'manifest.jsonl'
+    with RunManifest(path) as manifest:
+        manifest.record([('a', 'aaa', 0)])
+    with open(path, 'a') as fp:
+        fp.write('{"config_hash": "aaa", "ru')
+
+    with RunManifest(path) as manifest:
+        assert len(manifest) == 1
+        assert manifest.is_done('a', 'aaa', 0)
+
+
+def test_manifest_writer(tmpdir):
+    now = [0.]
+    flushed = []
+    with RunManifest(tmpdir / 'manifest.jsonl') as manifest:
+        writer = ManifestWriter(
+            manifest, before_record=[lambda: flushed.append(len(manifest))],
+            flush_runs=3, flush_seconds=10., clock=lambda: now[0]
+        )
+        writer.add([('a', 'aaa', 0), ('a', 'aaa', 1)])
+        assert len(manifest) == 0
+        writer.add([('a', 'aaa', 2)])
+        assert len(manifest) == 3
+
+        writer.add([('a', 'bbb', 0)])
+        now[0] = 10.
+        writer.add([('a', 'bbb', 1)])
+        assert len(manifest) == 5
+
+        writer.add([('a', 'bbb', 2)])
+        writer.flush()
+        writer.flush()
+        assert len(manifest) == 6
+        assert flushed == [0, 3, 5]
@@ -1,14 +1,31 @@
 """Tests for clovek_ne_jezi_se.Client"""
 import builtins
+import random
+import time
 from copy import deepcopy
 
+import attr
+import pytest
+
 from clovek_ne_jezi_se.client import Client
-from clovek_ne_jezi_se.agents import HumanPlayer
+from clovek_ne_jezi_se.agents import HumanPlayer, FurthestAlongPlayer
+from clovek_ne_jezi_se.observers import GameStatistics
 from clovek_ne_jezi_se.game_state import (
     MoveContainer, BoardSpace, EMPTY_SYMBOL
 )
 
 
+@attr.s
+class SlowPlayer(FurthestAlongPlayer):
+    """Player never answering in time, keeping the game states it got"""
+    game_states = attr.ib(kw_only=True, factory=list, repr=False, eq=False)
+
+    def choose_move_idx(self, game_state, allowed_moves):
+        self.game_states.append(game_state)
+        time.sleep(1)
+        return 0
+
+
 class TestClient:
 
     experiment_config = dict(
@@ -213,3 +230,87 @@ class TestClient:
 
         winner, _ = played_client.play()
         assert winner == played_client.players[idx_winner]
+
+    @pytest.mark.parametrize(
+        'limits,expected_play_count',
+        [
+            (dict(max_turns=3), 3),
+            (dict(max_seconds=0), 0),
+        ]
+    )
+    def test_play_stalled(self, monkeypatch, limits, expected_play_count):
+        played_client = deepcopy(self.client)
+        for name, value in limits.items():
+            setattr(played_client, name, value)
+
+        # No piece ever leaves the waiting areas
+        monkeypatch.setattr(played_client, 'roll', lambda: 1)
+
+        winner, play_count = played_client.play()
+        assert winner is None
+        assert play_count == expected_play_count
+
+    def test_skip_dead_turns(self, monkeypatch):
+        played_client = deepcopy(self.client)
+        statistics = GameStatistics()
+        played_client.observers.append(statistics)
+        statistics.on_game_start(played_client.get_game_state())
+        played_client.skip_dead_turns = True
+        played_client.max_turns = 4
+
+        # log(1 - 0.5) / log(5 / 6) = 3.8, i.e. 3 dead turns
+        monkeypatch.setattr('clovek_ne_jezi_se.client.random', lambda: 0.5)
+        monkeypatch.setattr(played_client, 'roll', lambda: 1)
+        monkeypatch.setattr(builtins, 'input', lambda x: 0)
+
+        winner, play_count = played_client.play()
+        assert winner is None
+        assert play_count == 4
+
+        # Only the fourth player rolled the six and entered the main board
+        waiting = played_client.get_game_state().waiting_areas_to_dict()
+        for player_name in self.player_names[:3]:
+            assert EMPTY_SYMBOL not in waiting[player_name]
+        assert EMPTY_SYMBOL in waiting[self.player_names[3]]
+        assert statistics.waiting_turns == dict(
+            red=1, blue=1, green=1, yellow=0
+        )
+
+    def test_sample_dead_turn_count(self):
+        random.seed(0)
+        n_samples = 10000
+        samples = [
+            self.client._sample_dead_turn_count() for _ in range(n_samples)
+        ]
+        # Geometric number of failures has mean (1 - p) / p = 5
+        assert abs(sum(samples) / n_samples - 5) < 0.25
+
+    def test_decision_timeout(self, mocker):
+        played_client = deepcopy(self.client)
+        slow_player = SlowPlayer('red', decision_timeout=0.05)
+        played_client.players[0] = slow_player
+        played_client.fallback_agent = FurthestAlongPlayer
+        played_client.initialize()
+
+        mocker.patch.object(played_client, 'roll', side_effect=[6, 1])
+
+        played_client.take_turn()
+
+        # Abandoned player chooses on a copy of the game state
+        assert len(slow_player.game_states) == 2
+        assert all(
+            game_state is not played_client.get_game_state()
+            and game_state.observers == []
+            for game_state in slow_player.game_states
+        )
+        assert played_client.timeout_counts == dict(
+            red=2, blue=0, green=0, yellow=0
+        )
+        waiting = played_client.get_game_state().waiting_areas_to_dict()
+        assert EMPTY_SYMBOL in waiting['red']
+
+    def test_decision_timeout_human_player(self):
+        refused_client = deepcopy(self.client)
+        refused_client.players[0].decision_timeout = 0.05
+        with pytest.raises(ValueError, match='red'):
+            refused_client.initialize()
@@ -0,0 +1,152 @@
+"""Tests for distributing work to workers over TCP"""
+import os
+import threading
+import time
+
+from multiprocessing.connection import Client as connect
+
+from clovek_ne_jezi_se.distributed import (
+    Coordinator, parse_address, start_local_workers
+)
+
+
+AUTHKEY = b'test-secret'
+
+
+def square(x):
+    return x ** 2
+
+
+def die(x):
+    os._exit(1)
+
+
+def slow_square(x):
+    time.sleep(0.5)
+    return x ** 2
+
+
+def test_parse_address():
+    assert parse_address('localhost:1234') == ('localhost', 1234)
+
+
+def run_coordinator(chunks, coordinator):
+    results = {}
+
+    def collect(chunk, result):
+        results[chunk] = result
+
+    coordinator.run(chunks, collect)
+    return results
+
+
+def test_coordinator_local_workers():
+    coordinator = Coordinator(('localhost', 0), AUTHKEY)
+    start_local_workers(coordinator.get_address(), AUTHKEY, square, 2)
+
+    chunks = [(x,) for x in range(10)]
+    results = run_coordinator(chunks, coordinator)
+
+    assert results == {(x,): x ** 2 for x in range(10)}
+    assert coordinator.n_requeued == 0
+
+
+def test_coordinator_skip_chunk():
+    coordinator = Coordinator(('localhost', 0), AUTHKEY)
+    start_local_workers(coordinator.get_address(), AUTHKEY, square, 1)
+
+    results = {}
+    coordinator.run(
+        [(x,) for x in range(10)],
+        lambda chunk, result: results.update({chunk: result}),
+        skip_chunk=lambda chunk: chunk[0] % 2 == 1
+    )
+    assert results == {(x,): x ** 2 for x in range(0, 10, 2)}
+
+
+def test_coordinator_requeues_chunks_of_dead_workers():
+    coordinator = Coordinator(('localhost', 0), AUTHKEY)
+    address = coordinator.get_address()
+    dying_workers = start_local_workers(address, AUTHKEY, die, 1)
+
+    def start_worker_after_requeue():
+        while coordinator.n_requeued == 0:
+            time.sleep(0.01)
+        start_local_workers(address, AUTHKEY, square, 1)
+
+    threading.Thread(target=start_worker_after_requeue, daemon=True).start()
+
+    chunks = [(x,) for x in range(3)]
+    results = run_coordinator(chunks, coordinator)
+
+    assert results == {(x,): x ** 2 for x in range(3)}
+    assert coordinator.n_requeued == 1
+    dying_workers[0].join()
+    assert dying_workers[0].exitcode == 1
+
+
+def test_coordinator_gives_up_chunks_after_max_attempts():
+    coordinator = Coordinator(('localhost', 0), AUTHKEY, max_attempts=2)
+    dying_workers = start_local_workers(
+        coordinator.get_address(), AUTHKEY, die, 2
+    )
+
+    assert run_coordinator([(1,)], coordinator) == {}
+    assert coordinator.failed_chunks == [(1,)]
+    assert coordinator.n_requeued == 1
+    for dying_worker in dying_workers:
+        dying_worker.join()
+
+
+def test_coordinator_requeues_chunks_of_silent_workers():
+    coordinator = Coordinator(
+        ('localhost', 0), AUTHKEY, heartbeat_timeout=0.2
+    )
+    address = coordinator.get_address()
+    received = threading.Event()
+
+    def hang():
+        # Stands in for a worker whose host vanished without closing
+        with connect(address, authkey=AUTHKEY) as conn:
+            conn.recv()
+            received.set()
+            time.sleep(5)
+
+    threading.Thread(target=hang, daemon=True).start()
+
+    def start_worker_after_hang():
+        received.wait()
+        start_local_workers(address, AUTHKEY, square, 1)
+
+    threading.Thread(target=start_worker_after_hang, daemon=True).start()
+
+    assert run_coordinator([(3,)], coordinator) == {(3,): 9}
+    assert coordinator.n_requeued == 1
+
+
+def test_coordinator_keeps_slow_workers_with_heartbeats():
+    coordinator = Coordinator(
+        ('localhost', 0), AUTHKEY, heartbeat_timeout=0.2
+    )
+    start_local_workers(
+        coordinator.get_address(), AUTHKEY, slow_square, 1,
+        heartbeat_seconds=0.05
+    )
+
+    assert run_coordinator([(2,)], coordinator) == {(2,): 4}
+    assert coordinator.n_requeued == 0
+
+
+def test_coordinator_rejects_wrong_authkey():
+    coordinator = Coordinator(('localhost', 0), AUTHKEY)
+    address = coordinator.get_address()
+    start_local_workers(address, b'wrong', square, 1)
+    start_local_workers(address, AUTHKEY, square, 1)
+
+    results = run_coordinator([(2,)], coordinator)
+    assert results == {(2,): 4}
+
+
+def test_coordinator_without_chunks():
+    coordinator = Coordinator(('localhost', 0), AUTHKEY)
+    assert run_coordinator([], coordinator) == {}
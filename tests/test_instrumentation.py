@@ -0,0 +1,58 @@
+"""Tests for timing instrumentation"""
+import json
+import random
+
+from clovek_ne_jezi_se.client import Client
+from clovek_ne_jezi_se.agents import RandomPlayer
+from clovek_ne_jezi_se.instrumentation import TimingHistogram
+
+
+def test_timing_histogram_record():
+    timer = TimingHistogram()
+    timer.record('phase', 3)
+    timer.record('phase', 2)
+    timer.record('phase', 100)
+
+    summary = timer.summary()['phase']
+    assert summary['count'] == 3
+    assert summary['total_ns'] == 105
+    assert summary['mean_ns'] == 35
+    # Buckets keyed by upper bound power of two
+    assert summary['histogram'] == {4: 2, 128: 1}
+
+
+def test_client_timings(tmpdir):
+    random.seed(2)
+    timer = TimingHistogram()
+    players = [RandomPlayer(name=name) for name in ['red', 'blue']]
+    client = Client(
+        players=players, timer=timer, main_board_section_length=1,
+        pieces_per_player=1, number_of_dice_faces=6
+    )
+    client.initialize()
+    assert all(player.timer is timer for player in players)
+
+    client.play()
+
+    summary = timer.summary()
+    assert set(summary.keys()) == {
+        'move_generation', 'agent_choice', 'choose_move_idx',
+        'move_application', 'winner_check'
+    }
+    assert summary['agent_choice']['count'] \
+        == summary['choose_move_idx']['count']
+
+    timings_path = tmpdir / 'timings.json'
+    timer.dump(timings_path)
+    with open(timings_path) as fp:
+        assert json.load(fp).keys() == summary.keys()
+
+
+def test_client_without_timer():
+    players = [RandomPlayer(name=name) for name in ['red', 'blue']]
+    client = Client(
+        players=players, main_board_section_length=1,
+        pieces_per_player=1, number_of_dice_faces=6
+    )
+    client.initialize()
+    assert all(player.timer is None for player in players)
@@ -0,0 +1,122 @@
+"""Tests for game observers"""
+import random
+
+import attr
+
+from clovek_ne_jezi_se.client import Client
+from clovek_ne_jezi_se.agents import FurthestAlongPlayer, RandomPlayer
+from clovek_ne_jezi_se.game_state import (
+    MoveContainer, BoardSpace, EMPTY_SYMBOL
+)
+from clovek_ne_jezi_se.observers import GameObserver, GameStatistics
+
+
+@attr.s
+class RecordingObserver(GameObserver):
+    """Observer recording all events as tuples"""
+    events = attr.ib(factory=list)
+
+    def on_game_start(self, game_state):
+        self.events.append(('game_start',))
+
+    def on_turn_start(self, player_name, play_count):
+        self.events.append(('turn_start', player_name, play_count))
+
+    def on_roll(self, player_name, roll_value):
+        self.events.append(('roll', player_name, roll_value))
+
+    def on_move(self, move_component):
+        self.events.append(('move', move_component))
+
+    def on_game_end(self, winner_name, play_count):
+        self.events.append(('game_end', winner_name, play_count))
+
+
+player_names = ['red', 'blue']
+board = dict(
+    main_board_section_length=4, pieces_per_player=2, number_of_dice_faces=6
+)
+
+
+def make_client(observer):
+    players = [FurthestAlongPlayer(name=name) for name in player_names]
+    client = Client(players=players, observers=[observer], **board)
+    client.initialize()
+    return client
+
+
+def enter_main(game_state, player_name, idx, waiting_idx=0):
+    game_state.do(MoveContainer(
+        from_space=BoardSpace(
+            kind='waiting', idx=waiting_idx, occupied_by=player_name,
+            allowed_occupants=[player_name, EMPTY_SYMBOL]
+        ),
+        to_space=BoardSpace(
+            kind='main', idx=idx, occupied_by=EMPTY_SYMBOL,
+            allowed_occupants=player_names + [EMPTY_SYMBOL]
+        )
+    ))
+
+
+def test_observer_events(mocker):
+    observer = RecordingObserver()
+    client = make_client(observer)
+    mocker.patch.object(client, 'roll', side_effect=[6, 1])
+    client.take_turn()
+
+    assert observer.events[0] == ('game_start',)
+    assert observer.events[1] == ('turn_start', 'red', 0)
+    assert observer.events[2] == ('roll', 'red', 6)
+    assert observer.events[3][0] == 'move'
+    assert observer.events[3][1].from_space.kind == 'waiting'
+
+
+def test_statistics_waiting_turns(monkeypatch):
+    statistics = GameStatistics()
+    client = make_client(statistics)
+
+    monkeypatch.setattr(client, 'roll', lambda: 1)
+    for _ in range(4):
+        client.take_turn()
+
+    assert statistics.waiting_turns == dict(red=2, blue=2)
+
+
+def test_statistics_captures(monkeypatch):
+    statistics = GameStatistics()
+    client = make_client(statistics)
+
+    game_state = client.get_game_state()
+    enter_main(game_state, 'red', 0)
+    enter_main(game_state, 'blue', 1)
+
+    monkeypatch.setattr(client, 'roll', lambda: 1)
+    client.take_turn()
+
+    assert statistics.captures == dict(red=1, blue=0)
+    assert statistics.pieces_sent_home == dict(red=0, blue=1)
+    # Blue is back to all pieces waiting
+    client.take_turn()
+    assert statistics.waiting_turns == dict(red=0, blue=1)
+
+
+def test_statistics_to_metrics():
+    random.seed(1)
+    statistics = GameStatistics()
+    players = [RandomPlayer(name=name) for name in player_names]
+    client = Client(
+        players=players, observers=[statistics],
+        main_board_section_length=1, pieces_per_player=1,
+        number_of_dice_faces=6
+    )
+    client.initialize()
+    winner, _ = client.play()
+
+    metrics = statistics.to_metrics()
+    winner_idx = client.players.index(winner)
+    assert f'first_home_play_{winner_idx}' in metrics
+    for stat in ['captures', 'pieces_sent_home', 'waiting_turns']:
+        for player_idx in range(len(player_names)):
+            assert f'{stat}_{player_idx}' in metrics
+    assert sum(statistics.captures.values()) \
+        == sum(statistics.pieces_sent_home.values())
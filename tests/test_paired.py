@@ -0,0 +1,52 @@
+"""Tests for paired agent comparisons"""
+import numpy as np
+import pytest
+
+from clovek_ne_jezi_se.paired import (
+    get_seatings, seat_config, get_paired_win_rates
+)
+
+
+def test_get_seatings():
+    rotations = get_seatings(3)
+    assert rotations == [(0, 1, 2), (1, 2, 0), (2, 0, 1)]
+    for seat_idx in range(3):
+        assert {seating[seat_idx] for seating in rotations} == {0, 1, 2}
+    assert len(get_seatings(3, 'permutations')) == 6
+    with pytest.raises(ValueError):
+        get_seatings(3, 'shuffles')
+
+
+def test_seat_config():
+    config = dict(players=[
+        dict(name='red', agent='RandomPlayer', kwargs=dict(a=1)),
+        dict(name='blue', agent='FurthestAlongPlayer', kwargs={}),
+    ], n_runs=3)
+    seated = seat_config(config, (1, 0))
+    assert [player['name'] for player in seated['players']] == ['red', 'blue']
+    assert [player['agent'] for player in seated['players']] \
+        == ['FurthestAlongPlayer', 'RandomPlayer']
+    assert seated['players'][1]['kwargs'] == dict(a=1)
+    assert config['players'][0]['agent'] == 'RandomPlayer'
+
+
+def test_get_paired_win_rates():
+    results = [
+        dict(winner_lineup_idxs=[0, 0]),
+        dict(winner_lineup_idxs=[0, 1]),
+        dict(winner_lineup_idxs=[0, -1]),
+        dict(winner_lineup_idxs=[1, 1]),
+    ]
+    summary = get_paired_win_rates(results, 2)
+    assert summary['n_blocks'] == 4
+    first, second = summary['win_rates']
+    assert first['mean'] == pytest.approx(0.5)
+    assert second['mean'] == pytest.approx(3 / 8)
+    (difference,) = summary['differences']
+    assert difference['lineup_idxs'] == [0, 1]
+    block_differences = np.array([1, 0, 0.5, -1])
+    assert difference['mean'] == pytest.approx(block_differences.mean())
+    assert difference['std_err'] == pytest.approx(
+        block_differences.std(ddof=1) / 2
+    )
+    assert difference['lower'] < difference['mean'] < difference['upper']
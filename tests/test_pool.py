@@ -0,0 +1,93 @@
+"""Tests for playing games in a GamePool"""
+import random
+
+import attr
+import pytest
+
+from clovek_ne_jezi_se.client import Client
+from clovek_ne_jezi_se.agents import RandomPlayer, FurthestAlongPlayer
+from clovek_ne_jezi_se.instrumentation import TimingHistogram
+from clovek_ne_jezi_se.pool import GamePool
+
+
+@attr.s
+class BatchCountingPlayer(FurthestAlongPlayer):
+    """Player recording sizes of batches it is asked to decide"""
+    batch_sizes = []
+
+    @classmethod
+    def choose_move_idx_batch(cls, decisions):
+        cls.batch_sizes.append(len(decisions))
+        return super().choose_move_idx_batch(decisions)
+
+
+def make_client(player_classes):
+    players = [
+        player_class(name=name)
+        for player_class, name in zip(player_classes, ['red', 'blue'])
+    ]
+    client = Client(
+        players=players, main_board_section_length=1, pieces_per_player=1,
+        number_of_dice_faces=6
+    )
+    client.initialize()
+    return client
+
+
+def test_game_pool_play():
+    random.seed(3)
+    BatchCountingPlayer.batch_sizes = []
+    n_games = 8
+    clients = [
+        make_client([BatchCountingPlayer, RandomPlayer])
+        for _ in range(n_games)
+    ]
+
+    results = GamePool(clients).play()
+
+    assert len(results) == n_games
+    for client, (winner, play_count) in zip(clients, results):
+        assert winner in client.players
+        assert winner is client.winner
+        assert play_count == client.play_count
+
+    # Decisions of concurrent games are batched
+    assert max(BatchCountingPlayer.batch_sizes) > 1
+    assert len(BatchCountingPlayer.batch_sizes) \
+        < sum(BatchCountingPlayer.batch_sizes)
+
+
+def test_choose_move_idx_batch_default():
+    client = make_client([FurthestAlongPlayer, FurthestAlongPlayer])
+    player = client.players[0]
+    game_state = client.get_game_state()
+    moves = game_state.get_player_moves(6, player.name)
+
+    res = FurthestAlongPlayer.choose_move_idx_batch(
+        [(player, game_state, moves), (player, game_state, moves)]
+    )
+    assert list(res) == 2 * [player.choose_move_idx(game_state, moves)]
+
+
+def test_game_pool_timers():
+    random.seed(4)
+    timer = TimingHistogram()
+    clients = [
+        make_client([FurthestAlongPlayer, RandomPlayer]) for _ in range(4)
+    ]
+    for client in clients:
+        client.set_timer(timer)
+
+    GamePool(clients).play()
+
+    counts = timer.summary()
+    assert counts['agent_choice']['count'] \
+        == counts['choose_move_idx_batch']['count'] > 0
+    assert 'choose_move_idx' not in counts
+
+
+def test_game_pool_decision_timeout():
+    client = make_client([FurthestAlongPlayer, RandomPlayer])
+    client.players[1].decision_timeout = 1.
+    with pytest.raises(ValueError, match='blue'):
+        GamePool([client])
@@ -0,0 +1,83 @@
+"""Tests for tracking throughput and progress of experiment runs"""
+import math
+
+import pytest
+
+from clovek_ne_jezi_se.progress import ProgressTracker, _format_seconds
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+def get_result(config_hash, worker, n_plays=100, seconds=1.):
+    return dict(
+        config_hash=config_hash, worker=worker, n_plays=n_plays,
+        seconds=seconds
+    )
+
+
+def test_progress_tracker():
+    clock = FakeClock()
+    tracker = ProgressTracker(n_workers=2, report_seconds=5., clock=clock)
+    tracker.add_planned('aaa', 10)
+    tracker.add_planned('bbb', 4)
+    assert math.isnan(tracker.get_eta_seconds())
+    assert tracker.get_report().startswith('0/? games')
+    tracker.finish_planning()
+
+    clock.now = 2.
+    assert not tracker.update(get_result('aaa', 'host:1'))
+    assert not tracker.update(get_result('aaa', 'host:2'))
+    clock.now = 4.
+    assert not tracker.update(get_result('aaa', 'host:1'))
+    assert not tracker.update(get_result('bbb', 'host:2', seconds=2.))
+
+    assert tracker.get_n_games() == 4
+    assert tracker.get_games_per_second() == 1.
+    assert tracker.get_turns_per_second() == 100.
+    assert tracker.get_games_per_second('aaa') == 1.
+    assert tracker.get_turns_per_second('bbb') == 50.
+    assert tracker.get_worker_utilization() == {'host:1': 0.5, 'host:2': 0.75}
+    assert tracker.get_eta_seconds() == 10.
+    assert tracker.get_eta_seconds('aaa') == 3.5
+    assert tracker.get_eta_seconds('bbb') == 3.
+
+    report = tracker.get_report()
+    assert report.startswith('4/14 games, 1.0 games/s, 100 turns/s')
+    assert 'ETA 0:00:10' in report
+    assert 'config aaa: 3/10 games' in report
+
+    clock.now = 5.
+    assert tracker.update(get_result('bbb', 'host:1'))
+    assert not tracker.update(get_result('bbb', 'host:1'))
+
+
+def test_progress_tracker_metrics():
+    clock = FakeClock()
+    tracker = ProgressTracker(clock=clock)
+    metrics = tracker.get_metrics()
+    assert metrics['n_games'] == 0
+    assert metrics['min_worker_utilization'] == 0.
+
+    tracker.add_planned('a' * 64, 1)
+    tracker.finish_planning()
+    clock.now = 2.
+    tracker.update(get_result('a' * 64, 'host:1'))
+    metrics = tracker.get_metrics()
+    assert metrics['mean_worker_utilization'] == 0.5
+    assert metrics['games_per_second'] == 0.5
+    assert metrics['turns_per_second.' + 'a' * 12] == 100.
+    assert tracker.get_eta_seconds() == 0.
+
+
+@pytest.mark.parametrize('seconds,expected', [
+    (0., '0:00:00'), (61.4, '0:01:01'), (3 * 3600 + 59, '3:00:59'),
+    (float('nan'), '?')
+])
+def test_format_seconds(seconds, expected):
+    assert _format_seconds(seconds) == expected
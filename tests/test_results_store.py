@@ -0,0 +1,90 @@
+"""Tests for the columnar results store"""
+import numpy as np
+import pytest
+
+from clovek_ne_jezi_se.results_store import (
+    ResultsStore, get_clopper_pearson_interval
+)
+
+
+config = dict(
+    players=[
+        dict(name='red', agent='RandomPlayer', kwargs={}),
+        dict(name='blue', agent='FurthestAlongPlayer', kwargs={}),
+    ],
+    board=dict(main_board_section_length=1, pieces_per_player=1,
+               number_of_dice_faces=6),
+    n_runs=4
+)
+
+
+def get_result(config_hash, run_idx, winner_idx, metrics=None):
+    return dict(
+        config_hash=config_hash, run_idx=run_idx, seed=2 ** 63 + run_idx,
+        cache_key=f'{config_hash}-{run_idx}',
+        winner_idx=winner_idx, n_plays=10,
+        metrics=metrics if metrics is not None else dict(captures_0=1)
+    )
+
+
+def test_results_store(tmpdir):
+    with ResultsStore(tmpdir / 'results', shard_size=3) as store:
+        for run_idx, winner_idx in enumerate([0, 1, 1, -1, 0]):
+            store.append(config, get_result('aaa', run_idx, winner_idx))
+        store.append(config, get_result('bbb', 0, 1, metrics={}))
+    assert len(list((tmpdir / 'results').listdir())) == 2
+
+    data = ResultsStore(tmpdir / 'results').load()
+    assert len(data['run_idx']) == 6
+    assert data['seed'][0] == 2 ** 63
+    assert set(data['agents']) == {'RandomPlayer,FurthestAlongPlayer'}
+    assert np.isnan(data['metrics.captures_0'][-1])
+    assert (data['pieces_per_player'] == 1).all()
+
+    win_counts = ResultsStore(tmpdir / 'results').get_win_counts()
+    assert win_counts['aaa']['n_games'] == 5
+    assert win_counts['aaa']['n_no_winner'] == 1
+    assert list(win_counts['aaa']['wins']) == [2, 2]
+    assert list(win_counts['bbb']['wins']) == [0, 1]
+    assert ResultsStore(tmpdir / 'results').get_cache_keys() \
+        == {f'aaa-{idx}' for idx in range(5)} | {'bbb-0'}
+
+
+def test_get_win_rates(tmpdir):
+    with ResultsStore(tmpdir / 'results') as store:
+        for run_idx in range(10):
+            store.append(config, get_result('aaa', run_idx, int(run_idx < 3)))
+    win_rates = store.get_win_rates()
+    assert list(win_rates['aaa']['win_rate']) == [0.7, 0.3]
+    assert (win_rates['aaa']['lower'] < win_rates['aaa']['win_rate']).all()
+    assert (win_rates['aaa']['upper'] > win_rates['aaa']['win_rate']).all()
+
+
+def test_get_seconds_per_game(tmpdir):
+    with ResultsStore(tmpdir / 'results') as store:
+        for run_idx, seconds in enumerate([1., 3.]):
+            store.append(
+                config, dict(get_result('aaa', run_idx, 0), seconds=seconds)
+            )
+        store.append(config, get_result('bbb', 0, 0))
+    assert ResultsStore(tmpdir / 'results').get_seconds_per_game() == dict(
+        aaa=2.
+    )
+
+
+def test_empty_results_store(tmpdir):
+    assert ResultsStore(tmpdir / 'results').get_win_rates() == {}
+    assert ResultsStore(tmpdir / 'results').get_cache_keys() == set()
+
+
+@pytest.mark.parametrize('successes,n_trials,expected_lower,expected_upper', [
+    (0, 10, 0., 0.3085),
+    (10, 10, 0.6915, 1.),
+    (5, 10, 0.1871, 0.8129),
+])
+def test_get_clopper_pearson_interval(
+    successes, n_trials, expected_lower, expected_upper
+):
+    lower, upper = get_clopper_pearson_interval(successes, n_trials)
+    assert lower == pytest.approx(expected_lower, abs=1e-4)
+    assert upper == pytest.approx(expected_upper, abs=1e-4)
@@ -1,9 +1,20 @@
 """Tests for running experiments"""
 import json
 import pytest
+from click.testing import CliRunner
+import mlflow
 
+from clovek_ne_jezi_se import __version__
+from clovek_ne_jezi_se.results_store import ResultsStore
+from clovek_ne_jezi_se.checkpoint import RunManifest
+from clovek_ne_jezi_se.client import Client
+from clovek_ne_jezi_se.agents import RandomPlayer
+from clovek_ne_jezi_se.execution import get_game_chunks, get_run_idx_chunks
 from clovek_ne_jezi_se.run_experiments import (
-    parse_config_file, initialize_client, get_experiment_variables_from_config_dir
+    parse_config_file, initialize_client, get_experiment_variables_from_config_dir,
+    run_games, run_experiments,
+    replay_run, iter_experiment_variables, validate_config, run_paired_games,
+    paired, tournament, sweep, cli, get_experiment_name, get_agent_class
 )
 
 def test_parse_config_file(tmpdir):
@@ -81,6 +92,20 @@ def test_initialize_client(config, is_valid, Error):
             initialize_client(config)
 
 
+def test_initialize_client_limits():
+    config = dict(
+        players=[
+            dict(name='red', agent='FurthestAlongPlayer', kwargs=dict())
+        ],
+        board=dict(main_board_section_length=4, pieces_per_player=4,
+                   number_of_dice_faces=6),
+        n_runs=1, max_turns=10, max_seconds=1.5
+    )
+    client = initialize_client(config)
+    assert client.max_turns == 10
+    assert client.max_seconds == 1.5
+
+
 valid_config = '''{
   "players": [
     {
@@ -144,3 +169,616 @@ def test_get_clients_from_configs_validation(tmpdir, configs, is_valid, Error):
     else:
         with pytest.raises(Error):
             get_experiment_variables_from_config_dir(tmpdir)
+
+
+tiny_config = dict(
+    players=[
+        dict(name='red', agent='RandomPlayer', kwargs=dict()),
+        dict(name='blue', agent='FurthestAlongPlayer', kwargs=dict())
+    ],
+    board=dict(main_board_section_length=1, pieces_per_player=1,
+               number_of_dice_faces=6),
+    n_runs=4
+)
+
+
+def test_iter_experiment_variables(tmpdir, mocker):
+    initialize_client_mock = mocker.patch(
+        'clovek_ne_jezi_se.run_experiments.initialize_client'
+    )
+    config_dir = tmpdir / 'lazy'
+    config_dir.mkdir()
+    with open(config_dir / '0.json', 'w') as fp:
+        json.dump(tiny_config, fp)
+    with open(config_dir / '1.jsonl', 'w') as fp:
+        for n_runs in [1, 2]:
+            fp.write(json.dumps(dict(tiny_config, n_runs=n_runs)) + '\n')
+
+    experiment_variables = iter_experiment_variables(config_dir, max_turns=5)
+    first = next(experiment_variables)
+    assert first['n_runs'] == tiny_config['n_runs']
+    assert first['experiment_name'] == 'lazy'
+    assert first['config']['max_turns'] == 5
+    assert [variables['n_runs'] for variables in experiment_variables] \
+        == [1, 2]
+    initialize_client_mock.assert_not_called()
+
+    jsonl_variables = list(iter_experiment_variables(config_dir / '1.jsonl'))
+    assert [variables['experiment_name'] for variables in jsonl_variables] \
+        == ['1', '1']
+
+
+@pytest.mark.parametrize('update,Error', [
+    (dict(), None),
+    (dict(players=[]), ValueError),
+    (dict(players=[dict(name='red', agent='NoPlayer', kwargs={})]), ValueError),
+    (dict(players=[dict(name='red', agent='RandomPlayer')]), KeyError),
+    (dict(board=dict(main_board_section_length=1)), TypeError),
+    (dict(board=dict(tiny_config['board'], pieces_per_player=0)), ValueError),
+    (dict(fallback_agent='eval'), ValueError),
+])
+def test_validate_config(update, Error):
+    config = dict(tiny_config, fallback_agent='RandomPlayer')
+    config.update(update)
+    if Error is None:
+        validate_config(config)
+    else:
+        with pytest.raises(Error):
+            validate_config(config)
+
+
+@pytest.fixture
+def tracking_uri(tmpdir, monkeypatch):
+    """Track mlflow runs in temporary directory"""
+    uri = 'file:' + str(tmpdir / 'mlruns')
+    monkeypatch.setenv('MLFLOW_TRACKING_URI', uri)
+    # Opt in to local file store for recent mlflow versions
+    monkeypatch.setenv('MLFLOW_ALLOW_FILE_STORE', 'true')
+    mlflow.set_tracking_uri(uri)
+    return uri
+
+
+def test_run_experiments_cli_progress(tmpdir, tracking_uri):
+    config_dir = tmpdir / 'tiny-progress'
+    config_dir.mkdir()
+    with open(config_dir / '0.json', 'w') as fp:
+        json.dump(tiny_config, fp)
+
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(config_dir), '--report_seconds', '0'
+    ])
+    assert result.exit_code == 0, result.output
+    assert f'4/{tiny_config["n_runs"]} games' in result.output
+    assert 'turns/s' in result.output
+
+    assert len(mlflow.search_runs(experiment_names=['tiny-progress'])) \
+        == tiny_config['n_runs']
+    runs = mlflow.search_runs(experiment_names=['progress'])
+    assert len(runs) == 1
+    assert runs['tags.mlflow.runName'][0] == 'tiny-progress'
+    assert runs['metrics.n_games'][0] == tiny_config['n_runs']
+    assert runs['metrics.games_per_second'][0] > 0
+    assert runs['params.version'][0] == __version__
+
+
+def test_run_experiments_cli_invalid_config(tmpdir, tracking_uri, mocker):
+    run_chunks_mock = mocker.patch(
+        'clovek_ne_jezi_se.run_experiments.run_chunks'
+    )
+    config_dir = tmpdir / 'tiny-invalid'
+    config_dir.mkdir()
+    with open(config_dir / '0.json', 'w') as fp:
+        json.dump(tiny_config, fp)
+    with open(config_dir / '1.json', 'w') as fp:
+        json.dump(dict(tiny_config, players=[]), fp)
+
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(config_dir)
+    ])
+    assert isinstance(result.exception, ValueError)
+    run_chunks_mock.assert_not_called()
+
+
+@pytest.mark.parametrize('n_runs,workers', [(10, 1), (10, 3), (2, 4)])
+def test_get_run_idx_chunks(n_runs, workers):
+    chunks = get_run_idx_chunks(n_runs, workers)
+    assert [idx for chunk in chunks for idx in chunk] == list(range(n_runs))
+
+
+def test_run_games():
+    results, timer = run_games(tiny_config, range(2, 5), record_timings=True)
+    assert [result['run_idx'] for result in results] == [2, 3, 4]
+    for result in results:
+        assert result['winner_idx'] in [0, 1]
+        assert 'captures_0' in result['metrics']
+        assert 'n_timeouts_1' in result['metrics']
+    assert 'move_generation' in timer.summary()
+
+
+def test_run_games_reproducible():
+    results, _ = run_games(tiny_config, range(4), experiment_name='exp')
+    split_results = [
+        result
+        for run_idxs in [[0, 1], [2], [3]]
+        for result in run_games(tiny_config, run_idxs, experiment_name='exp')[0]
+    ]
+    assert [result['seed'] for result in results] \
+        == [result['seed'] for result in split_results]
+    assert [result['metrics'] for result in results] \
+        == [result['metrics'] for result in split_results]
+
+    other_results, _ = run_games(tiny_config, range(4), experiment_name='other')
+    assert [result['seed'] for result in results] \
+        != [result['seed'] for result in other_results]
+
+
+def test_get_game_chunks_experiment_name():
+    experiment_variables = dict(
+        config=tiny_config, n_runs=4, experiment_name='exp'
+    )
+    chunks = get_game_chunks(
+        [experiment_variables], workers=2, record_timings=False
+    )
+    assert all(chunk[3] == 'exp' for chunk in chunks)
+
+
+def test_run_paired_games(mocker):
+    config = dict(tiny_config, max_turns=None)
+    rolls = []
+    original_roll = Client.roll
+
+    def record_roll(client):
+        roll = original_roll(client)
+        rolls[-1].append(roll)
+        return roll
+
+    def start_game(client):
+        rolls.append([])
+        return original_play(client)
+
+    original_play = Client.play
+    mocker.patch.object(Client, 'roll', record_roll)
+    mocker.patch.object(Client, 'play', start_game)
+
+    results, _ = run_paired_games(config, [0, 1], experiment_name='exp')
+    assert [result['seatings'] for result in results] == 2 * [[(0, 1), (1, 0)]]
+    for result in results:
+        assert set(result['winner_lineup_idxs']).issubset({0, 1})
+    # Same dice in both seatings up to the end of the shorter game
+    for first, second in [rolls[:2], rolls[2:]]:
+        n_rolls = min(len(first), len(second))
+        assert first[:n_rolls] == second[:n_rolls]
+    assert rolls[0] != rolls[2]
+
+
+def test_paired_cli(tmpdir):
+    config_dir = tmpdir / 'tiny-paired'
+    config_dir.mkdir()
+    with open(config_dir / '0.json', 'w') as fp:
+        json.dump(dict(tiny_config, n_runs=3), fp)
+
+    outputs = []
+    for workers in [1, 2]:
+        result = CliRunner().invoke(paired, [
+            '--config_path', str(config_dir / '0.json'),
+            '--workers', str(workers)
+        ])
+        assert result.exit_code == 0, result.output
+        outputs.append(json.loads(result.output))
+    assert outputs[0] == outputs[1]
+    assert outputs[0]['n_blocks'] == 3
+    assert outputs[0]['agents'] == ['RandomPlayer', 'FurthestAlongPlayer']
+    assert len(outputs[0]['differences']) == 1
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_tournament_cli(workers):
+    result = CliRunner().invoke(tournament, [
+        '--agents', 'RandomPlayer,FurthestAlongPlayer', '--n_runs', '6',
+        '--main_board_section_length', '1', '--pieces_per_player', '1',
+        '--min_games', '4', '--check_every', '2', '--workers', str(workers)
+    ])
+    assert result.exit_code == 0, result.output
+    summary = json.loads(result.output)
+    assert set(summary['ranking']) == {'RandomPlayer', 'FurthestAlongPlayer'}
+    n_played = summary['n_games']['RandomPlayer']
+    assert n_played + summary['n_skipped_games'] == 2 * 6
+    assert summary['n_games']['FurthestAlongPlayer'] == n_played
+
+
+def test_tournament_cli_deterministic():
+    outputs = []
+    for workers in [1, 3]:
+        result = CliRunner().invoke(tournament, [
+            '--agents', 'RandomPlayer,FurthestAlongPlayer', '--n_runs', '8',
+            '--main_board_section_length', '1', '--pieces_per_player', '1',
+            '--min_games', '4', '--check_every', '3',
+            '--workers', str(workers)
+        ])
+        assert result.exit_code == 0, result.output
+        outputs.append(json.loads(result.output))
+    assert outputs[0] == outputs[1]
+
+
+def test_tournament_cli_invalid_agent():
+    result = CliRunner().invoke(tournament, ['--agents', 'RandomPlayer,Nope'])
+    assert result.exit_code != 0
+
+
+def test_replay_run_cli(tmpdir):
+    config_dir = tmpdir / 'tiny-replay'
+    config_dir.mkdir()
+    config_path = config_dir / '0.json'
+    with open(config_path, 'w') as fp:
+        json.dump(tiny_config, fp)
+
+    expected = run_games(
+        dict(tiny_config, max_turns=None, max_seconds=None,
+             skip_dead_turns=False, fallback_agent='RandomPlayer'),
+        [2], experiment_name='tiny-replay'
+    )[0][0]
+
+    result = CliRunner().invoke(replay_run, [
+        '--config_path', str(config_path), '--run_idx', '2'
+    ])
+    assert result.exit_code == 0, result.output
+    replayed = json.loads(result.output)
+    # Wall-clock time differs between plays of the same game
+    replayed.pop('seconds')
+    expected.pop('seconds')
+    assert replayed == json.loads(json.dumps(expected))
+
+
+def test_replay_run_cli_jsonl(tmpdir, tracking_uri):
+    config_dir = tmpdir / 'tiny-replay-jsonl'
+    config_dir.mkdir()
+    config_path = config_dir / 'lines.jsonl'
+    with open(config_path, 'w') as fp:
+        for max_turns in [100, 200]:
+            fp.write(json.dumps(dict(tiny_config, max_turns=max_turns)) + '\n')
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(config_dir)
+    ])
+    assert result.exit_code == 0, result.output
+
+    args = ['--config_path', str(config_path), '--config_idx', '1',
+            '--run_idx', '2']
+    result = CliRunner().invoke(replay_run, args)
+    assert result.exit_code != 0
+    result = CliRunner().invoke(
+        replay_run, args + ['--experiment_name', 'tiny-replay-jsonl']
+    )
+    assert result.exit_code == 0, result.output
+    replayed = json.loads(result.output)
+    runs = mlflow.search_runs(experiment_names=['tiny-replay-jsonl'])
+    run = runs[
+        (runs['params.run_idx'] == '2')
+        & (runs['params.config_hash'] == replayed['config_hash'])
+    ]
+    assert run['params.seed'].item() == str(replayed['seed'])
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run_experiments_cli(tmpdir, tracking_uri, workers):
+    config_dir = tmpdir / 'tiny-experiment'
+    config_dir.mkdir()
+    with open(config_dir / '0.json', 'w') as fp:
+        json.dump(tiny_config, fp)
+
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(config_dir), '--workers', str(workers)
+    ])
+    assert result.exit_code == 0, result.output
+
+    runs = mlflow.search_runs(experiment_names=['tiny-experiment'])
+    assert len(runs) == tiny_config['n_runs']
+    assert set(runs['metrics.winner_idx']).issubset({0., 1.})
+    assert set(runs['params.agents']) == {'RandomPlayer,FurthestAlongPlayer'}
+    assert sorted(runs['params.run_idx'].astype(int)) \
+        == list(range(tiny_config['n_runs']))
+
+
+def test_run_experiments_cli_batched(tmpdir, tracking_uri):
+    config_dir = tmpdir / 'tiny-batched'
+    config_dir.mkdir()
+    with open(config_dir / '0.json', 'w') as fp:
+        json.dump(tiny_config, fp)
+
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(config_dir), '--workers', '2',
+        '--log_mode', 'batched'
+    ])
+    assert result.exit_code == 0, result.output
+
+    runs = mlflow.search_runs(experiment_names=['tiny-batched'])
+    assert len(runs) == 1
+    history = mlflow.tracking.MlflowClient().get_metric_history(
+        runs['run_id'][0], 'winner_idx'
+    )
+    assert sorted(metric.step for metric in history) \
+        == list(range(tiny_config['n_runs']))
+
+
+def test_run_experiments_cli_results_dir(tmpdir, tracking_uri):
+    config_dir = tmpdir / 'tiny-stored'
+    config_dir.mkdir()
+    with open(config_dir / '0.json', 'w') as fp:
+        json.dump(tiny_config, fp)
+
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(config_dir), '--workers', '2',
+        '--results_dir', str(tmpdir / 'results')
+    ])
+    assert result.exit_code == 0, result.output
+
+    win_counts = ResultsStore(tmpdir / 'results').get_win_counts()
+    (counts,) = win_counts.values()
+    assert counts['n_games'] == tiny_config['n_runs']
+    assert counts['wins'].sum() + counts['n_no_winner'] == counts['n_games']
+
+
+def test_run_experiments_cli_jsonl(tmpdir, tracking_uri):
+    config_path = tmpdir / 'tiny-jsonl.jsonl'
+    with open(config_path, 'w') as fp:
+        for n_runs in [1, 2]:
+            config = dict(tiny_config, n_runs=n_runs, max_turns=100 * n_runs)
+            fp.write(json.dumps(config) + '\n')
+
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(config_path), '--workers', '2'
+    ])
+    assert result.exit_code == 0, result.output
+
+    runs = mlflow.search_runs(experiment_names=['tiny-jsonl'])
+    assert len(runs) == 3
+
+
+def test_run_experiments_cli_resume(tmpdir, tracking_uri):
+    config_dir = tmpdir / 'tiny-resume'
+    config_dir.mkdir()
+    with open(config_dir / '0.json', 'w') as fp:
+        json.dump(tiny_config, fp)
+    args = ['--config_dir', str(config_dir), '--max_turns', '500']
+
+    result = CliRunner().invoke(run_experiments, args + [
+        '--results_dir', str(tmpdir / 'full')
+    ])
+    assert result.exit_code == 0, result.output
+    full = ResultsStore(tmpdir / 'full').load()
+
+    manifest_path = tmpdir / 'manifest.jsonl'
+    with RunManifest(manifest_path) as manifest:
+        manifest.record(
+            ('tiny-resume', full['config_hash'][0], run_idx)
+            for run_idx in [0, 1]
+        )
+    for _ in range(2):
+        result = CliRunner().invoke(run_experiments, args + [
+            '--results_dir', str(tmpdir / 'resumed'),
+            '--manifest_path', str(manifest_path), '--workers', '2'
+        ])
+        assert result.exit_code == 0, result.output
+
+    resumed = ResultsStore(tmpdir / 'resumed').load()
+    assert sorted(resumed['run_idx']) == [2, 3]
+    for key in ['seed', 'winner_idx', 'n_plays']:
+        assert dict(zip(resumed['run_idx'], resumed[key])) \
+            == {idx: full[key][idx] for idx in [2, 3]}
+
+
+def test_run_experiments_cli_cache(tmpdir, tracking_uri):
+    config_dir = tmpdir / 'tiny-cache'
+    config_dir.mkdir()
+    for idx, n_runs in enumerate([2, 3, 1]):
+        with open(config_dir / f'{idx}.json', 'w') as fp:
+            json.dump(dict(tiny_config, n_runs=n_runs), fp)
+    args = [
+        '--config_dir', str(config_dir), '--results_dir', str(tmpdir / 'results')
+    ]
+
+    result = CliRunner().invoke(run_experiments, args)
+    assert result.exit_code == 0, result.output
+    store = ResultsStore(tmpdir / 'results')
+    assert sorted(store.load()['run_idx']) == [0, 1, 2]
+
+    with open(config_dir / '3.json', 'w') as fp:
+        json.dump(dict(tiny_config, n_runs=5), fp)
+    result = CliRunner().invoke(run_experiments, args)
+    assert result.exit_code == 0, result.output
+    assert sorted(store.load()['run_idx']) == [0, 1, 2, 3, 4]
+
+    result = CliRunner().invoke(run_experiments, args + ['--ignore_cache'])
+    assert result.exit_code == 0, result.output
+    assert len(store.load()['run_idx']) == 10
+
+    runs = mlflow.search_runs(experiment_names=['tiny-cache'])
+    assert len(runs) == 10
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run_experiments_cli_early_stopping(tmpdir, tracking_uri, workers):
+    config_dir = tmpdir / 'tiny-stopping'
+    config_dir.mkdir()
+    with open(config_dir / '0.json', 'w') as fp:
+        json.dump(dict(tiny_config, n_runs=200), fp)
+
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(config_dir), '--workers', str(workers),
+        '--results_dir', str(tmpdir / 'results'), '--stop_precision', '0.2',
+        '--min_runs', '4', '--check_every', '2'
+    ])
+    assert result.exit_code == 0, result.output
+    assert 'Stopping config' in result.output
+    n_games = len(ResultsStore(tmpdir / 'results').load()['run_idx'])
+    # Posterior std of 2 win rates at most 0.2 after about 4 games
+    assert 4 <= n_games <= 4 + 2 * 2 * workers
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run_experiments_cli_budget(tmpdir, tracking_uri, workers):
+    config_dir = tmpdir / 'tiny-budget'
+    config_dir.mkdir()
+    for idx in range(3):
+        with open(config_dir / f'{idx}.json', 'w') as fp:
+            json.dump(dict(tiny_config, n_runs=50, max_turns=100 + idx), fp)
+
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(config_dir), '--workers', str(workers),
+        '--results_dir', str(tmpdir / 'results'), '--budget', '20',
+        '--min_runs', '3', '--check_every', '2'
+    ])
+    assert result.exit_code == 0, result.output
+    data = ResultsStore(tmpdir / 'results').load()
+    assert len(data['run_idx']) == 20
+    assert len(set(data['config_hash'])) == 3
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('pilot_runs', [0, 2])
+def test_run_experiments_cli_cost_schedule(
+    tmpdir, tracking_uri, workers, pilot_runs
+):
+    config_dir = tmpdir / 'tiny-cost'
+    config_dir.mkdir()
+    for idx, section_length in enumerate([1, 3]):
+        board = dict(
+            tiny_config['board'], main_board_section_length=section_length
+        )
+        with open(config_dir / f'{idx}.json', 'w') as fp:
+            json.dump(dict(tiny_config, board=board, n_runs=6), fp)
+
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(config_dir), '--workers', str(workers),
+        '--results_dir', str(tmpdir / 'results'), '--schedule', 'cost',
+        '--pilot_runs', str(pilot_runs)
+    ])
+    assert result.exit_code == 0, result.output
+    data = ResultsStore(tmpdir / 'results').load()
+    runs = sorted(zip(data['config_hash'], data['run_idx']))
+    assert len(runs) == len(set(runs)) == 12
+    assert (data['seconds'] > 0).all()
+
+
+def test_run_experiments_cli_budget_serve(tmpdir):
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(tmpdir), '--budget', '20', '--serve', 'localhost:0'
+    ])
+    assert result.exit_code != 0
+    assert '--budget' in result.output
+
+
+def test_run_experiments_cli_pilot_runs_serve(tmpdir):
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(tmpdir), '--schedule', 'cost', '--pilot_runs', '2',
+        '--serve', 'localhost:0'
+    ])
+    assert result.exit_code != 0
+    assert '--pilot_runs' in result.output
+
+
+def test_run_experiments_cli_distributed(tmpdir, tracking_uri):
+    config_dir = tmpdir / 'tiny-distributed'
+    config_dir.mkdir()
+    with open(config_dir / '0.json', 'w') as fp:
+        json.dump(tiny_config, fp)
+
+    result = CliRunner().invoke(run_experiments, [
+        '--config_dir', str(config_dir), '--serve', 'localhost:0',
+        '--local_workers', '2'
+    ])
+    assert result.exit_code == 0, result.output
+    assert result.output.count('--authkey=') == 1
+
+    runs = mlflow.search_runs(experiment_names=['tiny-distributed'])
+    assert len(runs) == tiny_config['n_runs']
+
+
+sweep_spec = dict(
+    lineups=[['RandomPlayer', 'FurthestAlongPlayer']], seatings='rotations',
+    board=dict(
+        main_board_section_length=[1, 2], pieces_per_player=1,
+        number_of_dice_faces=6
+    ),
+    n_runs=3
+)
+
+
+def test_sweep_cli(tmpdir, tracking_uri):
+    spec_path = tmpdir / 'tiny-sweep.json'
+    with open(spec_path, 'w') as fp:
+        json.dump(sweep_spec, fp)
+
+    result = CliRunner().invoke(sweep, [
+        '--spec_path', str(spec_path), '--count'
+    ])
+    assert result.exit_code == 0, result.output
+    assert result.output.strip() == '4'
+
+    output_path = tmpdir / 'tiny-sweep.jsonl'
+    result = CliRunner().invoke(sweep, [
+        '--spec_path', str(spec_path), '--output_path', str(output_path)
+    ])
+    assert result.exit_code == 0, result.output
+    assert len(list(iter_experiment_variables(output_path))) == 4
+
+    result = CliRunner().invoke(cli, [
+        'sweep', '--spec_path', str(spec_path), '--workers', '2',
+        '--results_dir', str(tmpdir / 'results')
+    ])
+    assert result.exit_code == 0, result.output
+    data = ResultsStore(tmpdir / 'results').load()
+    assert len(data['run_idx']) == 4 * 3
+    assert len(set(data['config_hash'])) == 4
+    runs = mlflow.search_runs(experiment_names=['tiny-sweep'])
+    assert len(runs) == 4 * 3
+
+    result = CliRunner().invoke(replay_run, [
+        '--config_path', str(spec_path), '--config_idx', '3', '--run_idx', '1'
+    ])
+    assert result.exit_code == 0, result.output
+    replayed = json.loads(result.output)
+    run = runs[
+        (runs['params.run_idx'] == '1')
+        & (runs['params.config_hash'] == replayed['config_hash'])
+    ]
+    assert run['params.seed'].item() == str(replayed['seed'])
+
+
+def test_replay_run_cli_invalid_config_idx(tmpdir):
+    config_dir = tmpdir / 'tiny-replay'
+    config_dir.mkdir()
+    with open(config_dir / '0.json', 'w') as fp:
+        json.dump(tiny_config, fp)
+    result = CliRunner().invoke(replay_run, [
+        '--config_path', str(config_dir / '0.json'), '--config_idx', '1',
+        '--run_idx', '0'
+    ])
+    assert result.exit_code == 2
+    assert 'No configuration 1' in result.output
+
+
+def test_sweep_cli_invalid_spec(tmpdir):
+    spec_path = tmpdir / 'not-a-sweep.json'
+    with open(spec_path, 'w') as fp:
+        json.dump(tiny_config, fp)
+    result = CliRunner().invoke(sweep, ['--spec_path', str(spec_path)])
+    assert result.exit_code != 0
+
+
+def test_get_experiment_name(tmpdir):
+    config_dir = tmpdir / 'exp.v2'
+    config_dir.mkdir()
+    assert get_experiment_name(config_dir) == 'exp.v2'
+    assert get_experiment_name(tmpdir / 'sweep.v2.jsonl') == 'sweep.v2'
+
+
+@pytest.mark.parametrize('agent_name', [
+    'Player', 'HumanPlayer', 'GameStatistics', 'Client', 'Nope'
+])
+def test_get_agent_class_unknown(agent_name):
+    with pytest.raises(ValueError, match='must be one of'):
+        get_agent_class(agent_name)
+
+
+def test_get_agent_class():
+    assert get_agent_class('RandomPlayer') is RandomPlayer
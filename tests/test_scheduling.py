@@ -0,0 +1,127 @@
+"""Tests for scheduling games across configurations"""
+import pytest
+
+from clovek_ne_jezi_se.scheduling import (
+    AdaptiveAllocator, get_cost_ordered_chunks, get_game_costs,
+    get_heuristic_game_cost
+)
+from clovek_ne_jezi_se.seeding import get_config_hash
+
+
+def get_experiment_variables(name, n_runs=100):
+    config = dict(players=[dict(name=name), dict(name='other')], n_runs=n_runs)
+    return dict(config=config, n_runs=n_runs, experiment_name='exp')
+
+
+def play_chunks(allocator, winner_idxs, **kwargs):
+    """Finish each chunk as soon as it is allocated."""
+    for config, run_idxs, _, _ in allocator.iter_chunks(**kwargs):
+        winner_idx = winner_idxs[config['players'][0]['name']]
+        for run_idx in run_idxs:
+            allocator.update(config, dict(
+                config_hash=get_config_hash(config), run_idx=run_idx,
+                winner_idx=winner_idx if winner_idx >= 0 else run_idx % 2
+            ))
+
+
+def test_adaptive_allocator_budget():
+    experiment_group_variables = [
+        get_experiment_variables('settled'),
+        get_experiment_variables('uncertain'),
+    ]
+    allocator = AdaptiveAllocator(
+        experiment_group_variables, budget=100, chunk_size=5, min_runs=10
+    )
+    play_chunks(allocator, dict(settled=0, uncertain=-1))
+    assert allocator.n_allocated == 100
+
+    n_settled, n_uncertain = [
+        allocator.get_n_allocated(get_config_hash(variables['config']))
+        for variables in experiment_group_variables
+    ]
+    assert n_settled >= 10
+    assert n_uncertain > n_settled
+
+
+def test_adaptive_allocator_run_caps_and_skip():
+    experiment_group_variables = [
+        dict(get_experiment_variables('a', n_runs=4), run_idxs=[1, 3]),
+        get_experiment_variables('b', n_runs=7),
+        get_experiment_variables('c', n_runs=100),
+    ]
+    allocator = AdaptiveAllocator(
+        experiment_group_variables, budget=1000, chunk_size=3, min_runs=2
+    )
+    chunks = []
+    for chunk in allocator.iter_chunks(
+        skip_chunk=lambda chunk: chunk[0]['players'][0]['name'] == 'c'
+    ):
+        chunks.append(chunk)
+        for run_idx in chunk[1]:
+            allocator.update(chunk[0], dict(
+                config_hash=get_config_hash(chunk[0]), run_idx=run_idx,
+                winner_idx=0
+            ))
+
+    run_idxs = {}
+    for config, chunk_run_idxs, _, _ in chunks:
+        run_idxs.setdefault(config['players'][0]['name'], []).extend(
+            chunk_run_idxs
+        )
+    assert run_idxs == dict(a=[1, 3], b=list(range(7)))
+
+
+def get_board_variables(section_length, n_runs):
+    board = dict(
+        main_board_section_length=section_length, pieces_per_player=1,
+        number_of_dice_faces=6
+    )
+    variables = get_experiment_variables(str(section_length), n_runs)
+    variables['config']['board'] = board
+    return variables
+
+
+def test_get_heuristic_game_cost():
+    costs = [
+        get_heuristic_game_cost(get_board_variables(length, 1)['config'])
+        for length in [1, 2, 4]
+    ]
+    assert costs == sorted(costs)
+
+
+def test_get_game_costs():
+    short, long = get_board_variables(1, 10), get_board_variables(4, 10)
+    short_hash = get_config_hash(short['config'])
+    long_hash = get_config_hash(long['config'])
+    costs = get_game_costs([short, long], {short_hash: 0.5})
+    assert costs[short_hash] == 0.5
+    assert costs[long_hash] == pytest.approx(
+        0.5 * get_heuristic_game_cost(long['config'])
+        / get_heuristic_game_cost(short['config'])
+    )
+    assert get_game_costs([short, long], {long_hash: 2., short_hash: 3.}) \
+        == {long_hash: 2., short_hash: 3.}
+
+
+def test_get_cost_ordered_chunks():
+    short, long = get_board_variables(1, 4), get_board_variables(1, 40)
+    long['config']['players'][0]['name'] = 'long'
+    long_hash = get_config_hash(long['config'])
+    short_hash = get_config_hash(short['config'])
+    chunks = get_cost_ordered_chunks(
+        [short, long], {short_hash: 1., long_hash: 10.}, workers=2,
+        chunks_per_worker=2
+    )
+    chunk_costs = [
+        len(run_idxs) * (10. if config is long['config'] else 1.)
+        for config, run_idxs, _, _ in chunks
+    ]
+    assert chunk_costs == sorted(chunk_costs, reverse=True)
+    assert max(chunk_costs) <= (4 + 400) / 4
+    assert chunks[0][0] is long['config']
+
+    long_run_idxs = [
+        run_idx for config, run_idxs, _, _ in chunks
+        if config is long['config'] for run_idx in run_idxs
+    ]
+    assert sorted(long_run_idxs) == list(range(40))
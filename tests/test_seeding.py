@@ -0,0 +1,23 @@
+"""Tests for reproducible seeding"""
+from clovek_ne_jezi_se.seeding import get_config_hash, get_run_seed, derive_seeds
+
+
+def test_get_config_hash():
+    config = dict(players=[dict(name='red')], board=dict(a=1), n_runs=2)
+    reordered = dict(n_runs=5, board=dict(a=1), players=[dict(name='red')])
+    assert get_config_hash(config) == get_config_hash(reordered)
+    assert get_config_hash(config) != get_config_hash(dict(config, board={}))
+
+
+def test_get_run_seed():
+    seeds = [get_run_seed('exp', 'abc', run_idx) for run_idx in range(10)]
+    assert len(set(seeds)) == 10
+    assert seeds[3] == get_run_seed('exp', 'abc', 3)
+    assert seeds[3] != get_run_seed('other-exp', 'abc', 3)
+    assert seeds[3] != get_run_seed('exp', 'abd', 3)
+
+
+def test_derive_seeds():
+    seeds = derive_seeds(123, 3)
+    assert len(set(seeds)) == 3
+    assert seeds == derive_seeds(123, 3)
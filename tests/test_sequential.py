@@ -0,0 +1,70 @@
+"""Tests for sequential stopping rules"""
+import numpy as np
+import pytest
+
+from clovek_ne_jezi_se.sequential import (
+    DirichletStoppingRule, SequentialStopper
+)
+
+
+def test_dirichlet_stopping_rule_likelihood_ratio():
+    rule = DirichletStoppingRule(
+        2, likelihood_ratio_threshold=0.01, min_games=5
+    )
+    assert rule.get_log_likelihood_ratio() == pytest.approx(0.)
+    for _ in range(4):
+        rule.update(0)
+    assert rule.get_stop_reason() is None
+
+    n_games = 4
+    while rule.get_stop_reason() is None:
+        rule.update(0)
+        n_games += 1
+    assert n_games < 30
+    assert rule.get_log_likelihood_ratio() <= np.log(0.01)
+    assert 'likelihood ratio' in rule.get_stop_reason()
+
+
+def test_dirichlet_stopping_rule_equal_win_rates():
+    rule = DirichletStoppingRule(
+        2, likelihood_ratio_threshold=0.01, precision=0.05
+    )
+    for idx in range(200):
+        rule.update(idx % 2)
+        assert 'likelihood ratio' not in (rule.get_stop_reason() or '')
+    assert rule.get_log_likelihood_ratio() == pytest.approx(0.)
+    assert 'posterior std' in rule.get_stop_reason()
+
+
+def test_dirichlet_stopping_rule_no_winner():
+    rule = DirichletStoppingRule(3, precision=0.1, min_games=1)
+    rule.update(-1)
+    assert rule.n_games == 1
+    assert list(rule.counts) == [0, 0, 0]
+
+
+@pytest.mark.parametrize('prior', [1., 2.])
+def test_dirichlet_stopping_rule_null_win_rates(prior):
+    rule = DirichletStoppingRule(
+        2, likelihood_ratio_threshold=0.01, prior=prior,
+        null_win_rates=[0.9, 0.1]
+    )
+    for _ in range(9):
+        rule.update(0)
+    rule.update(1)
+    assert rule.get_log_likelihood_ratio() > np.log(0.5)
+
+
+def test_sequential_stopper():
+    stopper = SequentialStopper(likelihood_ratio_threshold=0.01, min_games=5)
+    config = dict(players=[{}, {}, {}])
+    reasons = [
+        stopper.update(config, dict(config_hash='aaa', winner_idx=2))
+        for _ in range(30)
+    ]
+    assert stopper.is_stopped('aaa')
+    assert not stopper.is_stopped('bbb')
+    assert sum(reason is not None for reason in reasons) == 1
+    assert stopper.get_n_games('aaa') == reasons.index(
+        next(reason for reason in reasons if reason is not None)
+    ) + 1
@@ -0,0 +1,63 @@
+"""Tests for expanding sweep specifications"""
+import types
+
+import pytest
+
+from clovek_ne_jezi_se.run_experiments import (
+    set_config_defaults, validate_config
+)
+from clovek_ne_jezi_se.seeding import get_config_hash
+from clovek_ne_jezi_se.sweep import count_sweep, expand_sweep, is_sweep_spec
+
+
+spec = dict(
+    lineups=[
+        ['RandomPlayer', 'FurthestAlongPlayer'],
+        ['RandomPlayer', 'RandomPlayer', 'FurthestAlongPlayer'],
+    ],
+    board=dict(
+        main_board_section_length=[1, 2, 4], pieces_per_player=[1, 4],
+        number_of_dice_faces=6
+    ),
+    n_runs=10, max_turns=100
+)
+
+
+@pytest.mark.parametrize('seatings,n_seatings,n_distinct_lineups', [
+    (None, [1, 1], 2), ('fixed', [1, 1], 2), ('rotations', [2, 3], 5),
+    ('permutations', [2, 6], 5)
+])
+def test_expand_sweep(seatings, n_seatings, n_distinct_lineups):
+    sweep_spec = spec if seatings is None else dict(spec, seatings=seatings)
+    assert is_sweep_spec(sweep_spec)
+    configs = expand_sweep(sweep_spec)
+    assert isinstance(configs, types.GeneratorType)
+    configs = list(configs)
+    assert len(configs) == count_sweep(sweep_spec) == 6 * sum(n_seatings)
+
+    for config in configs:
+        validate_config(set_config_defaults(config))
+        assert config['n_runs'] == 10
+        assert config['max_turns'] == 100
+        assert config['board']['number_of_dice_faces'] == 6
+    assert {
+        config['board']['main_board_section_length'] for config in configs
+    } == {1, 2, 4}
+    lineups = {
+        tuple(player['agent'] for player in config['players'])
+        for config in configs
+    }
+    assert ('RandomPlayer', 'FurthestAlongPlayer') in lineups
+    assert len(lineups) == n_distinct_lineups
+    # Seatings of lineups with repeated agents may coincide
+    assert len({get_config_hash(config) for config in configs}) \
+        == 6 * n_distinct_lineups
+
+
+def test_expand_sweep_invalid_seatings():
+    with pytest.raises(ValueError):
+        list(expand_sweep(dict(spec, seatings='shuffled')))
+
+
+def test_is_sweep_spec():
+    assert not is_sweep_spec(dict(players=[], board={}, n_runs=1))
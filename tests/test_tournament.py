@@ -0,0 +1,66 @@
+"""Tests for tournaments of agents"""
+import pytest
+
+from clovek_ne_jezi_se.tournament import (
+    EloRatings, get_lineups, get_lineup_config, iter_round_robin_rounds,
+    sort_round_results
+)
+
+
+def test_elo_ratings():
+    ratings = EloRatings(['a', 'b', 'c'])
+    assert ratings.get_expected_score('a', 'b') == pytest.approx(0.5)
+    ratings.update(('a', 'b'), 0)
+    assert ratings.ratings['a'] == pytest.approx(1508.)
+    assert ratings.ratings['b'] == pytest.approx(1492.)
+    ratings.update(('c', 'b', 'a'), -1)
+    assert ratings.n_games == dict(a=2, b=2, c=1)
+    assert ratings.ratings['c'] == 1500.
+    ratings.update(('c', 'b', 'a'), 0)
+    assert ratings.get_ranking()[0] == 'c'
+    assert sum(ratings.ratings.values()) == pytest.approx(4500.)
+
+
+def test_could_change_ranking():
+    ratings = EloRatings(['a', 'b', 'c'], k_factor=16.)
+    ratings.ratings.update(a=1700., b=1500., c=1300.)
+    assert not ratings.could_change_ranking(('a', 'c'), 1)
+    assert ratings.could_change_ranking(('a', 'b'), 20)
+    ratings.ratings['b'] = 1690.
+    assert ratings.could_change_ranking(('a', 'b'), 1)
+
+
+def test_get_lineups():
+    assert get_lineups(['a', 'b', 'c'], 2) == [
+        ('a', 'b'), ('a', 'c'), ('b', 'a'), ('b', 'c'), ('c', 'a'), ('c', 'b')
+    ]
+    with pytest.raises(ValueError):
+        get_lineups(['a', 'b'], 3)
+
+
+def test_iter_round_robin_rounds():
+    experiment_group_variables = [
+        dict(config=get_lineup_config(lineup, {}, n_runs), n_runs=n_runs,
+             experiment_name='t')
+        for lineup, n_runs in [(('a', 'b'), 5), (('b', 'a'), 3)]
+    ]
+    rounds = list(iter_round_robin_rounds(
+        experiment_group_variables, 2,
+        skip_chunk=lambda chunk: chunk[1].start == 2
+        and chunk[0]['players'][0]['agent'] == 'b'
+    ))
+    assert [
+        [(chunk[0]['players'][0]['agent'], list(chunk[1])) for chunk in chunks]
+        for chunks in rounds
+    ] == [[('a', [0, 1]), ('b', [0, 1])], [('a', [2, 3])], [('a', [4])]]
+
+
+def test_sort_round_results():
+    results = [
+        ({}, dict(config_hash=config_hash, run_idx=run_idx))
+        for config_hash, run_idx in [('b', 1), ('a', 1), ('b', 0), ('a', 0)]
+    ]
+    assert [
+        (result['config_hash'], result['run_idx'])
+        for _, result in sort_round_results(results, dict(a=0, b=1))
+    ] == [('a', 0), ('b', 0), ('a', 1), ('b', 1)]
@@ -0,0 +1,79 @@
+"""Tests for batched mlflow logging"""
+import pytest
+import mlflow
+from mlflow.tracking import MlflowClient
+
+from clovek_ne_jezi_se.tracking import (
+    BatchedMlflowLogger, join_seed, split_seed
+)
+
+
+@pytest.fixture
+def experiment_id(tmpdir, monkeypatch):
+    """Create mlflow experiment tracked in temporary directory"""
+    monkeypatch.setenv('MLFLOW_ALLOW_FILE_STORE', 'true')
+    mlflow.set_tracking_uri('file:' + str(tmpdir / 'mlruns'))
+    return MlflowClient().create_experiment('batched')
+
+
+def get_result(config_hash, run_idx):
+    return dict(
+        config_hash=config_hash, run_idx=run_idx, winner_idx=run_idx % 2,
+        n_plays=10 + run_idx, seed=2 ** 63 + run_idx, metrics=dict(captures_0=run_idx)
+    )
+
+
+def test_batched_mlflow_logger(experiment_id):
+    with BatchedMlflowLogger(experiment_id, batch_size=5) as batched_logger:
+        for run_idx in range(7):
+            for config_hash in ['aaa', 'bbb']:
+                batched_logger.log_result(
+                    get_result(config_hash, run_idx), dict(agents='x,y')
+                )
+
+    client = MlflowClient()
+    runs = client.search_runs([experiment_id])
+    assert len(runs) == 2
+    for run in runs:
+        assert run.info.status == 'FINISHED'
+        assert run.data.params['agents'] == 'x,y'
+        assert run.data.params['config_hash'] in {'aaa', 'bbb'}
+        history = client.get_metric_history(run.info.run_id, 'n_plays')
+        assert sorted((m.step, m.value) for m in history) \
+            == [(run_idx, 10 + run_idx) for run_idx in range(7)]
+        seed_highs, seed_lows = [
+            {
+                metric.step: metric.value
+                for metric in client.get_metric_history(run.info.run_id, key)
+            }
+            for key in ['seed_high', 'seed_low']
+        ]
+        assert [
+            join_seed(seed_highs[run_idx], seed_lows[run_idx])
+            for run_idx in range(7)
+        ] == [2 ** 63 + run_idx for run_idx in range(7)]
+
+
+def test_batched_mlflow_logger_flush(experiment_id):
+    with BatchedMlflowLogger(
+        experiment_id, batch_size=1000, flush_seconds=3600.
+    ) as batched_logger:
+        batched_logger.log_result(get_result('aaa', 0), dict(agents='x,y'))
+        batched_logger.flush()
+        client = MlflowClient()
+        run, = client.search_runs([experiment_id])
+        assert [
+            metric.value
+            for metric in client.get_metric_history(run.info.run_id, 'n_plays')
+        ] == [10]
+
+
+def test_batched_mlflow_logger_batch_size(experiment_id):
+    with pytest.raises(ValueError):
+        BatchedMlflowLogger(experiment_id, batch_size=1001)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2 ** 32, 2 ** 64 - 1])
+def test_split_seed(seed):
+    assert all(float(part) == part for part in split_seed(seed))
+    assert join_seed(*split_seed(seed)) == seed